@@ -1,3 +1,3 @@
-del llm_out\*.txt
+del llm_out\video-requests.log llm_out\video-requests.log.1
 python src/faketerm.py
 pause
\ No newline at end of file
@@ -0,0 +1,87 @@
+/*
+ * frotz's interpreter core driven line by line, to record the reference
+ * transcript of selftest.z3 (selftest-frotz.txt) independently of
+ * src/zmachine.py. Built against the frotz 2.44 sources shipped in
+ * jericho 3.3.1 (frotz/), whose dumb front end collects the text in a
+ * buffer instead of drawing a screen:
+ *
+ *   cd frotz && make library
+ *   cp src/frotz_common.a common.a && ar x common.a main.o
+ *   objcopy --redefine-sym main=frotz_original_main main.o && ar r common.a main.o
+ *   cc -Isrc/common -o frotz_reference frotz_reference.c src/interface/frotz_interface.o \
+ *      src/interface/md5.o src/games/*.o common.a src/frotz_dumb.a src/blorblib.a
+ *
+ * Usage: frotz_reference -w 75 -s SEED story.z3 < inputs
+ * One input line per read; "cmd<TAB>file" answers SAVE/RESTORE with file
+ * (jericho's frotz takes the save file name from f_setup instead of
+ * asking). After the opening and after each input, everything the game
+ * printed is written out followed by a line "@@"; the V3 status line is
+ * drawn into the same text, right after the ">" prompt of the next read.
+ */
+#include <stdio.h>
+#include <string.h>
+#include "frotz.h"
+
+extern void os_process_arguments(int argc, char *argv[]);
+extern void load_story(char *s);
+extern void init_memory(void);
+extern void init_undo(void);
+extern void zstep(void);
+extern char *dumb_get_screen(void);
+extern void dumb_clear_screen(void);
+extern void dumb_set_next_action(char *s);
+extern zbyte next_opcode;
+extern zbyte get_next_opcode(void);
+
+/* Opcodes the driver stops at: sread and read_char wait for input, quit ends the game. */
+#define OP_SREAD 228
+#define OP_READ_CHAR 246
+#define OP_QUIT 186
+
+static void run_to_read(void)
+{
+    while (next_opcode != OP_SREAD && next_opcode != OP_READ_CHAR && next_opcode != OP_QUIT)
+        zstep();
+}
+
+static void show(void)
+{
+    fputs(dumb_get_screen(), stdout);
+    printf("\n@@\n");
+    fflush(stdout);
+    dumb_clear_screen();
+}
+
+int main(int argc, char *argv[])
+{
+    char line[512];
+
+    os_init_setup();
+    os_process_arguments(argc, argv);
+    load_story(argv[argc - 1]);
+    init_buffer();
+    init_err();
+    init_memory();
+    init_process();
+    init_sound();
+    os_init_screen();
+    init_undo();
+    z_restart();
+    next_opcode = get_next_opcode();
+    run_to_read();
+    show();
+    while (next_opcode != OP_QUIT && fgets(line, sizeof line, stdin)) {
+        char *tab = strchr(line, '\t');
+        if (tab) {
+            *tab = '\0';
+            tab[strcspn(tab + 1, "\n") + 1] = '\0';
+            f_setup.save_name = strdup(tab + 1);
+            strcat(line, "\n");
+        }
+        dumb_set_next_action(line);
+        zstep();
+        run_to_read();
+        show();
+    }
+    return 0;
+}
@@ -14,6 +14,9 @@ const PREFILL_VIDEO_QUEUE = false
 const LLM_OUT_RELATIVE_PATH = "../llm_out"
 const LLM_OUT_OVERRIDE = ""
 const LLM_POLL_INTERVAL = 0.5
+# faketerm sends each request as "<id>\t<filename>" over UDP and appends it to the journal.
+const VIEWER_UDP_PORT = 47731
+const VIDEO_REQUEST_JOURNAL = "video-requests.log"
 const SUBTITLE_FONT_PATH = "res://fonts/RobotoCondensed-Regular.ttf"
 const SUBTITLE_FONT_SIZE = 36
 const SUBTITLE_SHADOW_OFFSET_RATIO = 0.1
@@ -35,7 +38,9 @@ var current_is_noise := false
 var rng := RandomNumberGenerator.new()
 var llm_out_dir := ""
 var llm_poll_elapsed := 0.0
-var last_llm_file := ""
+var udp_server := PacketPeerUDP.new()
+var journal_offset := -1
+var last_request_id := 0
 
 func _ready() -> void:
 	_apply_window_settings()
@@ -45,6 +50,7 @@ func _ready() -> void:
 	rng.randomize()
 	_scan_video_folder()
 	llm_out_dir = _resolve_llm_out_dir()
+	_open_request_channel()
 	call_deferred("_update_video_cover")
 	subtitle_panel.visible = false
 	_apply_subtitle_style()
@@ -155,6 +161,7 @@ func _apply_subtitle_layout() -> void:
 	subtitle_shadow_label.offset_bottom = shadow_offset
 
 func _process(delta: float) -> void:
+	_poll_udp_requests()
 	_poll_llm_out(delta)
 	if subtitles.is_empty():
 		return
@@ -417,6 +424,32 @@ func _resolve_llm_out_dir() -> String:
 		base_dir = OS.get_executable_path().get_base_dir()
 	return base_dir.path_join(LLM_OUT_RELATIVE_PATH).simplify_path()
 
+func _open_request_channel() -> void:
+	var err = udp_server.bind(VIEWER_UDP_PORT, "127.0.0.1")
+	if err != OK:
+		push_warning("Unable to listen on UDP port %d, using the journal only" % VIEWER_UDP_PORT)
+	# Requests already in the journal belong to an earlier run.
+	journal_offset = _journal_length()
+
+func _journal_path() -> String:
+	return llm_out_dir.path_join(VIDEO_REQUEST_JOURNAL)
+
+func _journal_length() -> int:
+	if llm_out_dir == "":
+		return 0
+	var file = FileAccess.open(_journal_path(), FileAccess.READ)
+	if file == null:
+		return 0
+	return file.get_length()
+
+func _poll_udp_requests() -> void:
+	if not udp_server.is_bound():
+		return
+	while udp_server.get_available_packet_count() > 0:
+		var packet = udp_server.get_packet().get_string_from_utf8()
+		for line in packet.split("\n"):
+			_handle_video_request(line)
+
 func _poll_llm_out(delta: float) -> void:
 	llm_poll_elapsed += delta
 	if llm_poll_elapsed < LLM_POLL_INTERVAL:
@@ -424,41 +457,37 @@ func _poll_llm_out(delta: float) -> void:
 	llm_poll_elapsed = 0.0
 	if llm_out_dir == "":
 		return
-	var latest = _find_latest_llm_file()
-	if latest == "" or latest == last_llm_file:
+	var file = FileAccess.open(_journal_path(), FileAccess.READ)
+	if file == null:
+		return
+	var length = file.get_length()
+	if length < journal_offset:
+		# faketerm rotated the journal: read the new one from the start.
+		journal_offset = 0
+	if length == journal_offset:
+		return
+	file.seek(journal_offset)
+	var chunk = file.get_buffer(length - journal_offset)
+	# Leave a partially written last line for the next poll.
+	var end = chunk.rfind(10)
+	if end == -1:
+		return
+	journal_offset += end + 1
+	for line in chunk.slice(0, end).get_string_from_utf8().split("\n"):
+		_handle_video_request(line)
+
+func _handle_video_request(line: String) -> void:
+	var parts = line.strip_edges().split("\t")
+	if parts.size() != 2 or not parts[0].is_valid_int():
+		return
+	# The UDP datagram and the journal line carry the same id: play it once.
+	var request_id = parts[0].to_int()
+	if request_id <= last_request_id:
 		return
-	last_llm_file = latest
-	var next_video = _read_llm_video_request(latest)
+	last_request_id = request_id
+	var next_video = parts[1].strip_edges()
 	if next_video == "":
 		return
 	enqueue_video(next_video)
 	if not video_player.is_playing():
 		_play_next_from_queue()
-
-func _find_latest_llm_file() -> String:
-	var dir = DirAccess.open(llm_out_dir)
-	if dir == null:
-		return ""
-	dir.list_dir_begin()
-	var latest_name = ""
-	var name = dir.get_next()
-	while name != "":
-		if not dir.current_is_dir():
-			if name > latest_name:
-				latest_name = name
-		name = dir.get_next()
-	dir.list_dir_end()
-	if latest_name == "":
-		return ""
-	return llm_out_dir.path_join(latest_name)
-
-func _read_llm_video_request(path: String) -> String:
-	var file = FileAccess.open(path, FileAccess.READ)
-	if file == null:
-		return ""
-	var text = file.get_as_text()
-	for line in text.split("\n"):
-		var cleaned = line.strip_edges()
-		if cleaned != "":
-			return cleaned
-	return ""
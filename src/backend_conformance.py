@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Replay the walkthrough through the frotz backend (the reference) and the
+in-process Z-machine with the same random seed, and diff the clean text
+and status bar of every step.
+"""
+
+import argparse
+import difflib
+import os
+import shutil
+import sys
+import time
+
+import faketerm
+from game_session import make_game_session
+from zmachine_session import STORY_PATH
+
+DEFAULT_SEED = 1234
+MAX_DIFFS_SHOWN = 10
+
+
+def play(backend, commands, story_path, seed, timeout, frotz="frotz"):
+    """[(label, text, status bar)] for the opening, the intro and each command, and the seconds it took."""
+    if backend == "zmachine":
+        session = make_game_session(backend, story_path=story_path, seed=seed, turn_timeout=timeout)
+    else:
+        session = make_game_session(backend, command=f"{frotz} -p {story_path}", seed=seed, turn_timeout=timeout)
+    steps = []
+    started = time.perf_counter()
+    try:
+        session.start()
+        steps.append(("start", session.text, session.status_bar))
+        if session.at_intro:
+            session.send("")
+            steps.append(("intro", session.text, session.status_bar))
+        for index, raw_cmd in enumerate(commands):
+            if not session.alive:
+                break
+            cmd = faketerm.enhance_game_command(raw_cmd)
+            # Same line faketerm sends.
+            session.send(" " + cmd)
+            steps.append((f"step {index} {cmd}", session.text, session.status_bar))
+    finally:
+        session.close()
+    return steps, time.perf_counter() - started
+
+
+def status_fields(status):
+    if not status:
+        return None
+    return status["title"], status["score"], status["moves"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff the walkthrough output of the frotz and Z-machine backends.")
+    parser.add_argument("--story", default=STORY_PATH, help="Story file")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Random seed given to both backends")
+    parser.add_argument("--steps", type=int, default=0, help="Only replay the first N commands (0 = all)")
+    parser.add_argument("--timeout", type=float, default=faketerm.GAME_TURN_TIMEOUT_SEC, help="Per-read timeout")
+    parser.add_argument("--frotz", default="frotz", help="frotz executable for the reference backend")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.story):
+        print(f"Story file not found: {args.story} (run src/get_game.py)", file=sys.stderr)
+        return 1
+    if shutil.which(args.frotz) is None:
+        print(f"{args.frotz} was not found on PATH; it is the reference backend.", file=sys.stderr)
+        return 1
+    commands = faketerm.plundered_hearts_commands
+    if args.steps:
+        commands = commands[: args.steps]
+
+    reference, reference_sec = play("frotz", commands, args.story, args.seed, args.timeout, args.frotz)
+    candidate, candidate_sec = play("zmachine", commands, args.story, args.seed, args.timeout)
+    print(f"frotz:    {len(reference)} reads in {reference_sec:.2f}s")
+    print(f"zmachine: {len(candidate)} reads in {candidate_sec:.2f}s")
+
+    mismatches = 0
+    for (label, expected, expected_status), (_, text, status) in zip(reference, candidate):
+        same_status = status_fields(expected_status) == status_fields(status)
+        if text == expected and same_status:
+            continue
+        mismatches += 1
+        if mismatches > MAX_DIFFS_SHOWN:
+            continue
+        print(f"\n--- {label}")
+        if not same_status:
+            print(f"status: frotz {status_fields(expected_status)} / zmachine {status_fields(status)}")
+        diff = difflib.unified_diff(expected.splitlines(), text.splitlines(), "frotz", "zmachine", lineterm="")
+        print("\n".join(list(diff)[2:]))
+    if len(reference) != len(candidate):
+        mismatches += 1
+        print(f"\nThe backends stopped after {len(reference)} and {len(candidate)} reads.")
+    compared = min(len(reference), len(candidate))
+    print(f"\n{compared - min(mismatches, compared)}/{compared} reads identical")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
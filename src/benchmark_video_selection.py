@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Measure per-turn video selection latency for the real and synthetic catalogs."""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+from video_catalog import VideoCatalog, load_video_catalog, normalize_rows
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(__file__), "..", "assets", "abriggs-itw-embeddings.json")
+DEFAULT_SIZES = [10_000, 100_000]
+DEFAULT_RUNS = 200
+
+
+def synthetic_catalog(size, dim, rng):
+    vectors = rng.standard_normal((size, dim), dtype=np.float32)
+    matrix, _ = normalize_rows(vectors)
+    entries = [
+        {"filename": f"synthetic_{idx:06d}.ogv", "sequence_title": None, "duration_sec": 30.0}
+        for idx in range(size)
+    ]
+    return VideoCatalog(entries, matrix)
+
+
+def legacy_select(vector, catalog_rows, recent, last_video):
+    """The former pure-Python loop: cosine per clip, full sort, then exclusions."""
+    vector_norm = math.sqrt(sum(value * value for value in vector))
+    scored = []
+    for idx, (row, row_norm) in enumerate(catalog_rows):
+        dot = 0.0
+        for i in range(len(vector)):
+            dot += vector[i] * row[i]
+        scored.append((dot / (vector_norm * row_norm), idx))
+    scored.sort(reverse=True)
+    for _, idx in scored:
+        if idx != last_video and idx not in recent:
+            return idx
+    return scored[0][1]
+
+
+def time_selection(catalog, queries, recent_size):
+    recent = [entry["filename"] for entry in catalog.entries[:recent_size]]
+    last_video = catalog.entries[-1]["filename"]
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        catalog.select(query, recent, last_video)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def report(label, samples):
+    samples = sorted(samples)
+    p50 = samples[len(samples) // 2] * 1e6
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1e6
+    mean = sum(samples) / len(samples) * 1e6
+    print(f"{label:<28} mean {mean:10.1f} us   p50 {p50:10.1f} us   p95 {p95:10.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark select_best_video on growing catalogs.")
+    parser.add_argument("-c", "--catalog", default=DEFAULT_CATALOG_PATH, help="Embeddings JSON")
+    parser.add_argument(
+        "-s",
+        "--sizes",
+        type=int,
+        nargs="*",
+        default=DEFAULT_SIZES,
+        help="Synthetic catalog sizes",
+    )
+    parser.add_argument("-n", "--runs", type=int, default=DEFAULT_RUNS, help="Selections per catalog")
+    parser.add_argument("--seed", type=int, default=1987)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    started = time.perf_counter()
+    catalog = load_video_catalog(args.catalog)
+    load_ms = (time.perf_counter() - started) * 1000.0
+    if not len(catalog):
+        print(f"No embeddings found in {args.catalog}", file=sys.stderr)
+        return 1
+    dim = catalog.dim
+    print(f"Real catalog: {len(catalog)} clips x {dim} dims, loaded in {load_ms:.1f} ms")
+
+    queries = rng.standard_normal((args.runs, dim), dtype=np.float32)
+    report(f"numpy {len(catalog)} clips", time_selection(catalog, queries, len(catalog) // 3))
+
+    rows = [(row.tolist(), 1.0) for row in catalog.matrix]
+    legacy_queries = [query.tolist() for query in queries[: max(1, args.runs // 10)]]
+    legacy_samples = []
+    for query in legacy_queries:
+        t0 = time.perf_counter()
+        legacy_select(query, rows, set(range(len(rows) // 3)), len(rows) - 1)
+        legacy_samples.append(time.perf_counter() - t0)
+    report(f"legacy loop {len(catalog)} clips", legacy_samples)
+
+    for size in args.sizes:
+        t0 = time.perf_counter()
+        synthetic = synthetic_catalog(size, dim, rng)
+        build_ms = (time.perf_counter() - t0) * 1000.0
+        # Keep a realistic history: the installation only remembers clips it played.
+        report(f"numpy {size} clips", time_selection(synthetic, queries, min(size // 3, 500)))
+        print(f"{'':<28} (synthetic matrix built in {build_ms:.0f} ms, {synthetic.matrix.nbytes / 1e6:.0f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,8 +1,14 @@
+import hashlib
 import os
 import sys
+from collections import OrderedDict
+from itertools import groupby
 
 import pygame
 
+from c64screen import ScreenModel
+from clock import RealClock
+
 # Toggle for Windows "always on top" behavior.
 ENABLE_ALWAYS_ON_TOP = True
 ALWAYS_ON_TOP_REFRESH_MS = 1000
@@ -26,6 +32,21 @@ C64_BLACK = (0, 0, 0)
 C64_BORDER_COLOR = C64_BLUE
 BORDER_THICKNESS = 64
 
+# Charset sprite sheets: 16 x 16 glyphs in character-code order (code = row * 16 + column),
+# up to one cell (8x10) each; 8x8 glyphs are centered. Packed atlases are cached as PNG.
+CHARSET_GRID = 16
+CHARSET_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "cache")
+CHARSET_CACHE_VERSION = 1
+
+# Final upscale filter: "smooth" (bilinear, the original look) or "nearest" (crisp pixels, cheapest).
+SCALE_FILTERS = ("smooth", "nearest")
+DEFAULT_SCALE_FILTER = "smooth"
+
+# Tinted glyph sets kept per foreground color (least recently used ones are dropped).
+GLYPH_CACHE_MAX_COLORS = 16
+# Foreground colors tinted at startup so their first use does not stall typing.
+GLYPH_PREWARM_COLORS = (C64_WHITE,)
+
 class C64Renderer:
     def __init__(
         self,
@@ -40,10 +61,21 @@ class C64Renderer:
         window_size=None,
         window_position=None,
         borderless=False,
+        incremental=True,
+        screen=None,
+        headless=False,
+        scale_filter=DEFAULT_SCALE_FILTER,
+        gpu_present=False,
+        clock=None,
     ):
         if pygame is None:
             raise ImportError("pygame is required for the C64 renderer. Install pygame to enable it.")
 
+        # Headless: frames are composed on an off-screen surface and never shown,
+        # so benchmarks and exports run without a window or a real display.
+        self.headless = bool(headless)
+        if self.headless:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
         pygame.init()
         pygame.display.set_caption("Plundered Hearts - C64 view")
 
@@ -56,6 +88,8 @@ class C64Renderer:
             self.always_on_top = ENABLE_ALWAYS_ON_TOP
         else:
             self.always_on_top = bool(always_on_top)
+        if self.headless:
+            self.always_on_top = False
         self.display_size = self._get_display_size(self.display_index)
         self.fps = fps
         try:
@@ -94,32 +128,70 @@ class C64Renderer:
             window_flags = 0
         if self.borderless and not self.fullscreen:
             window_flags |= pygame.NOFRAME
-        if self.window_position and not self.fullscreen:
+        if self.window_position and not self.fullscreen and not self.headless:
             self._set_window_position_env(self.window_position)
-        self.window = self._create_window(window_flags)
+        # With gpu_present the final scale/blit goes through pygame's SDL2 texture
+        # renderer; self.window is then None and frames are presented as textures.
+        self._gpu_renderer = None
+        self._gpu_texture = None
+        self.scale_filter = scale_filter if scale_filter in SCALE_FILTERS else DEFAULT_SCALE_FILTER
+        self.window = None
+        if gpu_present and not self.headless:
+            self._create_gpu_window()
+        if self._gpu_renderer is None:
+            self.window = self._create_window(window_flags)
         if self.always_on_top:
             self._topmost_applied = False
             self._prime_always_on_top()
         else:
             self._next_topmost_check_ms = None
         self.clock = pygame.time.Clock()
+        # Frame pacing follows the installation clock (faster, or unpaced when instant).
+        self.timebase = clock or RealClock()
 
         self.logical_surface = pygame.Surface((LOGICAL_WIDTH, LOGICAL_HEIGHT), pygame.SRCALPHA).convert_alpha()
+        # Presentation: the target rectangle and the scaled destination are set up once.
+        self.target_rect = self._compute_target_rect()
+        self._scaled_surface = self._create_scaled_surface()
+        self._draw_static_border()
 
-        self.cursor_x = 0
-        self.cursor_y = 0  # Content row index; status bar is separate.
         self.status_text = ""
         self.status_bar_bg = C64_LIGHT_BLUE
         self.content_rows = C64_ROWS - C64_STATUS_ROWS
-        self.buffer = [[" "] * C64_COLS for _ in range(self.content_rows)]
         self.default_fg = C64_LIGHT_GRAY
         self.default_bg = C64_BLUE
-        self.row_fg_colors = [self.default_fg] * self.content_rows
-        self.row_bg_colors = [self.default_bg] * self.content_rows
-        self.glyphs = self._load_font(font_path)
+        # Character grid; a shared one is filled (and published) by another process (see renderer_process.py).
+        self._owns_screen = screen is None
+        if screen is None:
+            screen = ScreenModel(C64_COLS, self.content_rows, default_fg=self.default_fg, default_bg=self.default_bg)
+        self.screen = screen
+        self._glyph_atlas = self._load_font(font_path)
+        self._glyph_rects = self._glyph_cell_rects()
+        self.glyphs = self._glyphs_from_atlas(self._glyph_atlas)
+        # Fully transparent glyphs (spaces) are never blitted.
+        self._blank_codes = frozenset(
+            code for code, glyph in self.glyphs.items() if not glyph.get_bounding_rect().width
+        )
         self.default_glyph = self._render_pattern(self._fallback_pattern("?"))
-        self._glyph_cache = {self.default_fg: self.glyphs}
-        self._default_glyph_cache = {self.default_fg: self.default_glyph}
+        self._glyph_cache = OrderedDict({self.default_fg: self.glyphs})
+        self._default_glyph_cache = OrderedDict({self.default_fg: self.default_glyph})
+        self.prewarm_colors(GLYPH_PREWARM_COLORS)
+
+        # Dirty tracking: rows whose version stamp differs from the drawn one are
+        # redrawn, and the scaled frame is reused as long as nothing changed.
+        self.incremental = bool(incremental)
+        self._content_surface = self.logical_surface.subsurface(
+            pygame.Rect(0, C64_STATUS_ROWS * C64_CELL_SIZE_V, LOGICAL_WIDTH, self.content_rows * C64_CELL_SIZE_V)
+        )
+        self._drawn_versions = [-1] * self.content_rows
+        self._drawn_scrolls = self.screen.scrolls
+        self._drawn_seq = None
+        self._full_redraw = True
+        self._status_dirty = True
+        self._cursor_drawn = None
+        self.frames_rendered = 0
+        self.frames_composed = 0
+        self.rows_drawn = 0
 
     def _determine_scale(self, forced_scale, display_size=None):
         if forced_scale:
@@ -203,6 +275,10 @@ class C64Renderer:
         return None
 
     def _create_window(self, window_flags):
+        if self.headless:
+            # A display mode is still needed for convert()/convert_alpha().
+            pygame.display.set_mode((1, 1))
+            return pygame.Surface((self.window_width, self.window_height)).convert()
         try:
             if self.display_index is not None:
                 return pygame.display.set_mode(
@@ -214,6 +290,72 @@ class C64Renderer:
             pass
         return pygame.display.set_mode((self.window_width, self.window_height), window_flags)
 
+    def _create_gpu_window(self):
+        """Open the window through pygame._sdl2; leaves _gpu_renderer as None when that is not available."""
+        try:
+            from pygame._sdl2 import video
+        except ImportError:
+            print("pygame._sdl2 is not available, presenting with surfaces.")
+            return
+        try:
+            # Hidden display mode, only so that convert()/convert_alpha() keep working.
+            pygame.display.set_mode((1, 1), pygame.HIDDEN)
+            if self.window_position and not self.fullscreen:
+                position = self.window_position
+            elif self.display_index is not None:
+                # SDL_WINDOWPOS_CENTERED_DISPLAY(index)
+                position = (0x2FFF0000 | self.display_index, 0x2FFF0000 | self.display_index)
+            else:
+                position = video.WINDOWPOS_CENTERED
+            window = video.Window(
+                "Plundered Hearts - C64 view",
+                size=(self.window_width, self.window_height),
+                position=position,
+                fullscreen=self.fullscreen,
+                borderless=self.borderless,
+                always_on_top=self.always_on_top,
+            )
+            # Texture filtering follows the scale filter; the hint is read when textures are created.
+            os.environ["SDL_RENDER_SCALE_QUALITY"] = "nearest" if self.scale_filter == "nearest" else "linear"
+            renderer = video.Renderer(window)
+            texture = video.Texture(renderer, (LOGICAL_WIDTH, LOGICAL_HEIGHT), streaming=True)
+        except Exception as exc:
+            print(f"SDL2 texture renderer unavailable ({exc}), presenting with surfaces.")
+            return
+        # The SDL2 window sets its own always-on-top flag; the Win32 refresh only sees the display module window.
+        self.always_on_top = False
+        self._gpu_window = window
+        self._gpu_renderer = renderer
+        self._gpu_texture = texture
+
+    def _compute_target_rect(self):
+        x = self.render_offset_x + BORDER_THICKNESS
+        y = self.render_offset_y + BORDER_THICKNESS
+        if self.fit_to_display:
+            width = max(1, self.window_width - BORDER_THICKNESS * 2)
+            height = max(1, self.window_height - BORDER_THICKNESS * 2)
+        else:
+            width = LOGICAL_WIDTH * self.scale * self.output_scale
+            height = LOGICAL_HEIGHT * self.scale * self.output_scale
+        return pygame.Rect(x, y, width, height)
+
+    def _create_scaled_surface(self):
+        if self.window is None:
+            return None
+        if self.window.get_rect().contains(self.target_rect):
+            # Scale straight into the window; nothing else draws over the target area.
+            return self.window.subsurface(self.target_rect)
+        # Target larger than the window: scale off-screen and blit it clipped to the inside of the border.
+        return pygame.Surface(self.target_rect.size, 0, self.window)
+
+    def _inner_rect(self):
+        frame_rect = pygame.Rect(self.render_offset_x, self.render_offset_y, self.total_width, self.total_height)
+        return frame_rect.inflate(-BORDER_THICKNESS * 2, -BORDER_THICKNESS * 2)
+
+    def _draw_static_border(self):
+        if self.window is not None:
+            self.window.fill(C64_BORDER_COLOR)
+
     def _set_always_on_top(self):
         if not sys.platform.startswith("win"):
             return False
@@ -281,8 +423,96 @@ class C64Renderer:
         self._next_topmost_check_ms = now_ms + ALWAYS_ON_TOP_REFRESH_MS
 
     def _load_font(self, font_path):
-        # Always use the built-in placeholder font to avoid external dependencies.
-        return self._build_placeholder_font()
+        """Packed glyph atlas for codes 0-255, from a charset sprite sheet or the built-in patterns."""
+        if font_path:
+            try:
+                return self._load_charset_atlas(font_path)
+            except (OSError, ValueError, pygame.error) as exc:
+                print(f"Unable to load charset {font_path} ({exc}), using the built-in font.")
+        patterns = self._build_placeholder_font()
+        cache_path = self._charset_cache_path(repr(patterns).encode("utf-8"))
+        atlas = self._load_cached_atlas(cache_path)
+        if atlas is None:
+            atlas = self._new_atlas()
+            for code, pattern in enumerate(patterns):
+                self._draw_pattern(atlas, self._glyph_cell_rect(code).topleft, pattern)
+            self._save_cached_atlas(cache_path, atlas)
+        return atlas
+
+    def _load_charset_atlas(self, font_path):
+        with open(font_path, "rb") as handle:
+            cache_path = self._charset_cache_path(handle.read())
+        atlas = self._load_cached_atlas(cache_path)
+        if atlas is not None:
+            return atlas
+        sheet = pygame.image.load(font_path)
+        width, height = sheet.get_size()
+        if width % CHARSET_GRID or height % CHARSET_GRID:
+            raise ValueError(f"{width}x{height} is not a {CHARSET_GRID}x{CHARSET_GRID} glyph grid")
+        glyph_w = width // CHARSET_GRID
+        glyph_h = height // CHARSET_GRID
+        if glyph_w > C64_CELL_SIZE_H or glyph_h > C64_CELL_SIZE_V:
+            raise ValueError(f"{glyph_w}x{glyph_h} glyphs do not fit {C64_CELL_SIZE_H}x{C64_CELL_SIZE_V} cells")
+        if not sheet.get_flags() & pygame.SRCALPHA:
+            # Opaque sheets: the top-left pixel is the background color.
+            sheet.set_colorkey(sheet.get_at((0, 0)))
+        lit = pygame.mask.from_surface(sheet).to_surface(
+            setcolor=(*C64_LIGHT_GRAY, 255), unsetcolor=(*C64_BLUE, 0)
+        )
+        atlas = self._new_atlas()
+        offset_x = (C64_CELL_SIZE_H - glyph_w) // 2
+        offset_y = (C64_CELL_SIZE_V - glyph_h) // 2
+        blits = []
+        for code in range(CHARSET_GRID * CHARSET_GRID):
+            column, row = code % CHARSET_GRID, code // CHARSET_GRID
+            cell = self._glyph_cell_rect(code)
+            area = pygame.Rect(column * glyph_w, row * glyph_h, glyph_w, glyph_h)
+            blits.append((lit, (cell.x + offset_x, cell.y + offset_y), area))
+        atlas.blits(blits, doreturn=False)
+        self._save_cached_atlas(cache_path, atlas)
+        return atlas
+
+    def _new_atlas(self):
+        size = (CHARSET_GRID * C64_CELL_SIZE_H, CHARSET_GRID * C64_CELL_SIZE_V)
+        atlas = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+        atlas.fill((*C64_BLUE, 0))
+        return atlas
+
+    def _charset_cache_path(self, source):
+        digest = hashlib.sha1(f"v{CHARSET_CACHE_VERSION}:".encode("ascii") + source).hexdigest()[:16]
+        return os.path.join(CHARSET_CACHE_DIR, f"c64-charset-{C64_CELL_SIZE_H}x{C64_CELL_SIZE_V}-{digest}.png")
+
+    def _load_cached_atlas(self, path):
+        if not os.path.exists(path):
+            return None
+        try:
+            atlas = pygame.image.load(path)
+        except pygame.error:
+            return None
+        if atlas.get_size() != (CHARSET_GRID * C64_CELL_SIZE_H, CHARSET_GRID * C64_CELL_SIZE_V):
+            return None
+        return atlas.convert_alpha()
+
+    def _save_cached_atlas(self, path, atlas):
+        partial = f"{path}.{os.getpid()}.png"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            pygame.image.save(atlas, partial)
+            os.replace(partial, path)
+        except (OSError, pygame.error) as exc:
+            print(f"Unable to cache the charset atlas: {exc}")
+
+    def _glyph_cell_rect(self, code):
+        column, row = code % CHARSET_GRID, code // CHARSET_GRID
+        return pygame.Rect(column * C64_CELL_SIZE_H, row * C64_CELL_SIZE_V, C64_CELL_SIZE_H, C64_CELL_SIZE_V)
+
+    def _glyph_cell_rects(self):
+        rects = {code: self._glyph_cell_rect(code) for code in range(CHARSET_GRID * CHARSET_GRID)}
+        rects[ord("’")] = rects[ord("'")]
+        return rects
+
+    def _glyphs_from_atlas(self, atlas):
+        return {code: atlas.subsurface(rect) for code, rect in self._glyph_rects.items()}
 
     def _fallback_pattern(self, char):
         patterns = {
@@ -845,91 +1075,87 @@ class C64Renderer:
             ],
         }
 
-        glyphs = {}
+        patterns = []
         for code in range(256):
             char = chr(code)
             upper_char = char.upper()
-            pattern = letters.get(upper_char) or self._fallback_pattern(char) or self._fallback_pattern("?")
-            glyphs[code] = self._render_pattern(pattern)
-        glyphs[ord("’")] = glyphs.get(ord("'"), self._render_pattern(self._fallback_pattern("'")))
-        return glyphs
+            patterns.append(letters.get(upper_char) or self._fallback_pattern(char) or self._fallback_pattern("?"))
+        return patterns
 
     def _render_pattern(self, pattern_lines):
         surface = pygame.Surface((C64_CELL_SIZE_H, C64_CELL_SIZE_V), pygame.SRCALPHA).convert_alpha()
         surface.fill((*C64_BLUE, 0))
+        self._draw_pattern(surface, (0, 0), pattern_lines)
+        return surface
+
+    def _draw_pattern(self, surface, origin, pattern_lines):
         top_margin = 1
         left_margin = 1
         for row_idx, line in enumerate(pattern_lines):
             for col_idx, char in enumerate(line):
                 if char != " ":
-                    surface.set_at((left_margin + col_idx, top_margin + row_idx), C64_LIGHT_GRAY)
-        return surface
+                    surface.set_at((origin[0] + left_margin + col_idx, origin[1] + top_margin + row_idx), C64_LIGHT_GRAY)
+
+    @property
+    def cursor_x(self):
+        return self.screen.cursor_x
+
+    @property
+    def cursor_y(self):
+        # Content row index; status bar is separate.
+        return self.screen.cursor_y
 
     def clear(self):
-        self.buffer = [[" "] * C64_COLS for _ in range(self.content_rows)]
-        self.cursor_x = 0
-        self.cursor_y = 0
-        self.row_fg_colors = [self.default_fg] * self.content_rows
-        self.row_bg_colors = [self.default_bg] * self.content_rows
-
-    def _newline(self):
-        self.cursor_x = 0
-        self.cursor_y += 1
-        if self.cursor_y >= self.content_rows:
-            self.buffer.pop(0)
-            self.buffer.append([" "] * C64_COLS)
-            self.row_fg_colors.pop(0)
-            self.row_bg_colors.pop(0)
-            self.row_fg_colors.append(self.default_fg)
-            self.row_bg_colors.append(self.default_bg)
-            self.cursor_y = self.content_rows - 1
+        self.screen.clear()
 
     def _glyph_for_char(self, char):
         code = ord(char) if char else ord("?")
         return self.glyphs.get(code, self.default_glyph)
 
-    def _set_row_style(self, row_index, fg_color=None, bg_color=None):
-        if fg_color is not None:
-            self.row_fg_colors[row_index] = fg_color
-        if bg_color is not None:
-            self.row_bg_colors[row_index] = bg_color
-
     def _tint_surface(self, surface, color):
-        tinted = pygame.Surface(surface.get_size(), pygame.SRCALPHA).convert_alpha()
-        width, height = surface.get_size()
-        for y in range(height):
-            for x in range(width):
-                if surface.get_at((x, y)).a:
-                    tinted.set_at((x, y), (*color, 255))
+        # Zero the RGB channels, then add the color; alpha (the glyph shape) is untouched.
+        tinted = surface.copy()
+        tinted.fill((0, 0, 0, 255), special_flags=pygame.BLEND_RGBA_MULT)
+        tinted.fill((*color[:3], 0), special_flags=pygame.BLEND_RGBA_ADD)
         return tinted
 
     def _tint_glyphs(self, color):
-        tinted = {}
-        for code, glyph in self.glyphs.items():
-            tinted[code] = self._tint_surface(glyph, color)
+        # The whole atlas is tinted at once; glyphs are subsurfaces of it.
+        return self._glyphs_from_atlas(self._tint_surface(self._glyph_atlas, color))
+
+    def _cached_tint(self, cache, key, build):
+        cached = cache.get(key)
+        if cached is not None:
+            cache.move_to_end(key)
+            return cached
+        tinted = build(key)
+        cache[key] = tinted
+        while len(cache) > GLYPH_CACHE_MAX_COLORS:
+            # The first entry is the default color; never evict it.
+            oldest = next(k for k in cache if k != self.default_fg)
+            del cache[oldest]
         return tinted
 
     def _get_glyphs_for_color(self, color):
         if color is None:
             return self.glyphs
-        key = tuple(color)
-        cached = self._glyph_cache.get(key)
-        if cached:
-            return cached
-        tinted = self._tint_glyphs(key)
-        self._glyph_cache[key] = tinted
-        return tinted
+        return self._cached_tint(self._glyph_cache, tuple(color), self._tint_glyphs)
 
     def _get_default_glyph_for_color(self, color):
         if color is None:
             return self.default_glyph
-        key = tuple(color)
-        cached = self._default_glyph_cache.get(key)
-        if cached:
-            return cached
-        tinted = self._tint_surface(self.default_glyph, key)
-        self._default_glyph_cache[key] = tinted
-        return tinted
+        return self._cached_tint(
+            self._default_glyph_cache,
+            tuple(color),
+            lambda key: self._tint_surface(self.default_glyph, key),
+        )
+
+    def prewarm_colors(self, colors):
+        """Tint the glyph sets for colors ahead of their first use."""
+        for color in colors:
+            if color is not None:
+                self._get_glyphs_for_color(color)
+                self._get_default_glyph_for_color(color)
 
     def process_events(self):
         for event in pygame.event.get():
@@ -938,111 +1164,176 @@ class C64Renderer:
                 sys.exit(0)
 
     def write(self, text, fg_color=None, bg_color=None):
-        for ch in text:
-            if ch == "\n":
-                self._newline()
-                if fg_color is not None or bg_color is not None:
-                    self._set_row_style(self.cursor_y, fg_color, bg_color)
-                continue
-            if ch == "\f":
-                self.clear()
-                if fg_color is not None or bg_color is not None:
-                    self._set_row_style(self.cursor_y, fg_color, bg_color)
-                continue
-            if fg_color is not None or bg_color is not None:
-                self._set_row_style(self.cursor_y, fg_color, bg_color)
-            sanitized = ch
-            if not sanitized.isprintable() or sanitized == "\r":
-                sanitized = " "
-            sanitized = sanitized.upper()
-            self.buffer[self.cursor_y][self.cursor_x] = sanitized
-            self.cursor_x += 1
-            if self.cursor_x >= C64_COLS:
-                self._newline()
-                if fg_color is not None or bg_color is not None:
-                    self._set_row_style(self.cursor_y, fg_color, bg_color)
+        self.screen.write(text, fg_color=fg_color, bg_color=bg_color)
 
     def set_status_bar(self, text):
         """Update the persistent status/title bar shown on the top row."""
-        self.status_text = (text or "").strip().upper()
+        text = (text or "").strip().upper()
+        if text != self.status_text:
+            self.status_text = text
+            self._status_dirty = True
 
     def set_status_bar_color(self, color):
-        if color:
+        if color and color != self.status_bar_bg:
             self.status_bar_bg = color
+            self._status_dirty = True
 
     def _draw_status_bar(self):
+        status_rect = pygame.Rect(0, 0, LOGICAL_WIDTH, C64_CELL_SIZE_V)
         if not self.status_text:
+            self.logical_surface.fill(C64_BLUE, status_rect)
             return
-        pygame.draw.rect(
-            self.logical_surface,
-            self.status_bar_bg,
-            pygame.Rect(0, 0, LOGICAL_WIDTH, C64_CELL_SIZE_V),
+        self.logical_surface.fill(self.status_bar_bg, status_rect)
+        self._blit_batch(
+            [
+                (self._glyph_for_char(ch), (x * C64_CELL_SIZE_H, 0))
+                for x, ch in enumerate(self.status_text[:C64_COLS])
+                if ord(ch) not in self._blank_codes
+            ]
         )
-        truncated = self.status_text[:C64_COLS].ljust(C64_COLS)
-        for x, ch in enumerate(truncated):
-            glyph = self._glyph_for_char(ch)
-            self.logical_surface.blit(glyph, (x * C64_CELL_SIZE_H, 0))
+
+    def _draw_row(self, y):
+        top = (y + C64_STATUS_ROWS) * C64_CELL_SIZE_V
+        screen = self.screen
+        x = 0
+        # One fill per run of cells sharing a background color.
+        for bg_index, run in groupby(screen.row_bg_indices(y)):
+            width = sum(1 for _ in run)
+            self.logical_surface.fill(
+                screen.palette_color(bg_index),
+                pygame.Rect(x * C64_CELL_SIZE_H, top, width * C64_CELL_SIZE_H, C64_CELL_SIZE_V),
+            )
+            x += width
+        glyph_sets = {}
+        blits = []
+        blank_codes = self._blank_codes
+        for x, (code, fg_index) in enumerate(zip(screen.row_codes(y), screen.row_fg_indices(y))):
+            if code in blank_codes:
+                continue
+            glyphs = glyph_sets.get(fg_index)
+            if glyphs is None:
+                glyphs = glyph_sets[fg_index] = self._get_glyphs_for_color(screen.palette_color(fg_index))
+            glyph = glyphs.get(code)
+            if glyph is None:
+                glyph = self._get_default_glyph_for_color(screen.palette_color(fg_index))
+            blits.append((glyph, (x * C64_CELL_SIZE_H, top)))
+        self._blit_batch(blits)
+        self.rows_drawn += 1
+
+    def _blit_batch(self, blits):
+        # fblits (pygame-ce) skips building the per-blit rect list; plain pygame has blits only.
+        fblits = getattr(self.logical_surface, "fblits", None)
+        if fblits is not None:
+            fblits(blits)
+        else:
+            self.logical_surface.blits(blits, doreturn=False)
 
     def _draw_buffer(self):
-        self.logical_surface.fill(C64_BLUE)
-        self._draw_status_bar()
-        for y, row in enumerate(self.buffer):
-            bg_color = self.row_bg_colors[y]
-            if bg_color != C64_BLUE:
-                pygame.draw.rect(
-                    self.logical_surface,
-                    bg_color,
-                    pygame.Rect(
-                        0,
-                        (y + C64_STATUS_ROWS) * C64_CELL_SIZE_V,
-                        LOGICAL_WIDTH,
-                        C64_CELL_SIZE_V,
-                    ),
-                )
-            glyphs = self._get_glyphs_for_color(self.row_fg_colors[y])
-            for x, ch in enumerate(row):
-                code = ord(ch) if ch else ord("?")
-                glyph = glyphs.get(code)
-                if glyph is None:
-                    glyph = self._get_default_glyph_for_color(self.row_fg_colors[y])
-                self.logical_surface.blit(
-                    glyph, (x * C64_CELL_SIZE_H, (y + C64_STATUS_ROWS) * C64_CELL_SIZE_V)
-                )
+        """Bring the logical surface up to date with the screen model; False if it is mid-update."""
+        screen = self.screen
+        seq = screen.seq
+        if seq & 1:
+            # The producer is writing; keep the previous frame rather than draw a torn one.
+            return False
+        scrolls = screen.scrolls
+        if not self.incremental:
+            self._full_redraw = True
+        if self._status_dirty or self._full_redraw:
+            self._draw_status_bar()
+            self._status_dirty = False
+        rows = self.content_rows
+        delta = scrolls - self._drawn_scrolls
+        if self._full_redraw or delta >= rows:
+            drawn = [-1] * rows
+        else:
+            drawn = self._drawn_versions
+            if delta:
+                # Drawn pixels move up with the model rows (and their version stamps).
+                self._content_surface.scroll(0, -delta * C64_CELL_SIZE_V)
+                drawn = drawn[delta:] + [-1] * delta
+            if self._cursor_drawn is not None:
+                # Erase the cursor block drawn on the previous frame.
+                cursor_row = self._cursor_drawn[1] - delta
+                if cursor_row >= 0:
+                    drawn[cursor_row] = -1
+        if seq != self._drawn_seq and screen.cursor_y < rows:
+            # Text typed on the cursor row is only stamped once the cursor leaves it (see c64screen.SEQ).
+            drawn[screen.cursor_y] = -1
+        for y in range(rows):
+            version = screen.row_version(y)
+            if version != drawn[y]:
+                self._draw_row(y)
+                drawn[y] = version
+        self._drawn_versions = drawn
+        self._drawn_scrolls = scrolls
+        self._drawn_seq = seq
+        self._cursor_drawn = None
+        # A write landed while drawing: some rows may be torn, redraw everything next frame.
+        self._full_redraw = screen.seq != seq
+        return True
 
     def render_frame(self, show_cursor=False):
+        if self._owns_screen:
+            self.screen.publish()
         self._refresh_always_on_top()
-        self._draw_buffer()
-        frame = self.logical_surface.copy()
-        if show_cursor:
+        self.frames_rendered += 1
+        cursor = (self.cursor_x, self.cursor_y) if show_cursor else None
+        unchanged = (
+            not self._full_redraw
+            and not self._status_dirty
+            and self.screen.seq == self._drawn_seq
+            and cursor == self._cursor_drawn
+        )
+        if (self.incremental and unchanged) or not self._draw_buffer():
+            # Nothing to compose: the window already shows the current frame.
+            self._present()
+            self.clock.tick(self.timebase.frame_rate(self.fps))
+            return
+        frame = self.logical_surface
+        if cursor is not None and cursor[0] < C64_COLS:
             cursor_color = C64_LIGHT_BLUE
             cursor_rect = (
-                self.cursor_x * C64_CELL_SIZE_H,
-                (self.cursor_y + C64_STATUS_ROWS) * C64_CELL_SIZE_V,
+                cursor[0] * C64_CELL_SIZE_H,
+                (cursor[1] + C64_STATUS_ROWS) * C64_CELL_SIZE_V,
                 C64_CELL_SIZE_H,
                 C64_CELL_SIZE_V,
             )
             pygame.draw.rect(frame, cursor_color, cursor_rect)
-        scaled_w = LOGICAL_WIDTH * self.scale * self.output_scale
-        scaled_h = LOGICAL_HEIGHT * self.scale * self.output_scale
-        scaled = pygame.transform.smoothscale(frame, (scaled_w, scaled_h)).convert_alpha()
-        if self.fit_to_display:
-            target_w = max(1, self.window_width - BORDER_THICKNESS * 2)
-            target_h = max(1, self.window_height - BORDER_THICKNESS * 2)
-            if scaled_w != target_w or scaled_h != target_h:
-                scaled = pygame.transform.smoothscale(scaled, (target_w, target_h)).convert_alpha()
-        self.window.fill(C64_BORDER_COLOR)
-        dest_x = self.render_offset_x + BORDER_THICKNESS
-        dest_y = self.render_offset_y + BORDER_THICKNESS
-        self.window.blit(scaled, (dest_x, dest_y))
-        if BORDER_THICKNESS > 0:
-            border_rect = pygame.Rect(
-                self.render_offset_x,
-                self.render_offset_y,
-                self.total_width,
-                self.total_height,
-            )
-            pygame.draw.rect(self.window, C64_BORDER_COLOR, border_rect, BORDER_THICKNESS)
-        pygame.display.flip()
+            self._cursor_drawn = cursor
+        self.frames_composed += 1
+        self._scale_frame(frame)
+        self._present()
         if self.always_on_top and not self._topmost_applied:
             self._prime_always_on_top()
-        self.clock.tick(self.fps)
+        self.clock.tick(self.timebase.frame_rate(self.fps))
+
+    def _scale_frame(self, frame):
+        """Scale the logical frame onto the target rectangle in one step, without new surfaces."""
+        if self._gpu_renderer is not None:
+            self._gpu_texture.update(frame)
+            return
+        size = self.target_rect.size
+        if self.scale_filter == "nearest":
+            pygame.transform.scale(frame, size, self._scaled_surface)
+        else:
+            pygame.transform.smoothscale(frame, size, self._scaled_surface)
+        if self._scaled_surface.get_parent() is None:
+            self.window.set_clip(self._inner_rect())
+            self.window.blit(self._scaled_surface, self.target_rect)
+            self.window.set_clip(None)
+
+    def _present(self):
+        if self._gpu_renderer is not None:
+            # The back buffer is undefined after present(), so border and frame are redrawn each time.
+            self._gpu_renderer.draw_color = C64_BORDER_COLOR + (255,)
+            self._gpu_renderer.clear()
+            self._gpu_texture.draw(dstrect=self.target_rect)
+            self._gpu_renderer.present()
+        elif not self.headless:
+            pygame.display.flip()
+
+    def close(self):
+        try:
+            pygame.quit()
+        except Exception:
+            pass
@@ -0,0 +1,492 @@
+import re
+import struct
+from multiprocessing import shared_memory
+
+# Header fields (uint32 each).
+# Odd while the producer is mutating the grid (seqlock); a row changed in a batch gets the
+# batch's odd SEQ as its version, so an unchanged SEQ means nothing to redraw. Text typed on
+# the cursor row is not stamped until the cursor leaves it: the renderer redraws the cursor
+# row whenever SEQ has moved.
+SEQ = 0
+SCROLLS = 1  # Number of rows scrolled off the top since creation.
+CURSOR_X = 2
+CURSOR_Y = 3
+SHOW_CURSOR = 4
+QUIT = 5  # Set by either side to stop the renderer process / the installation.
+RING_HEAD = 6  # Commands written by the producer.
+RING_TAIL = 7  # Commands consumed by the renderer.
+READY = 8  # Set by the renderer process once its window is up.
+ORIGIN = 9  # Physical row holding the top screen row; scrolling just moves it.
+PALETTE_COUNT = 10
+HEADER_FIELDS = 16
+
+PALETTE_SIZE = 64
+RING_SLOTS = 32
+RING_SLOT_SIZE = 128
+CMD_STATUS_TEXT = 1
+CMD_STATUS_COLOR = 2
+CMD_PREWARM_COLOR = 3
+
+_CONTROL_SPLIT = re.compile(r"([\n\f])")
+
+
+def _encode_char(ch):
+    if not ch.isprintable() or ch == "\r":
+        return " "
+    upper = ch.upper()
+    if len(upper) == 1:
+        ch = upper
+    if ch == "’":
+        ch = "'"
+    # Glyphs only exist for Latin-1 codes; anything else shows as "?".
+    return ch if ord(ch) < 256 else "?"
+
+
+class _CharTable(dict):
+    """str.translate table, filled on first use of each code point."""
+
+    def __missing__(self, code):
+        value = _encode_char(chr(code))
+        self[code] = value
+        return value
+
+
+_CHAR_TABLE = _CharTable()
+# The same mapping as a bytes.translate table, for text that is all Latin-1.
+_BYTE_TABLE = bytes(ord(_encode_char(chr(code))) for code in range(256))
+
+
+def encode_text(text):
+    """Screen codes (Latin-1 bytes) for a run of text without control characters."""
+    try:
+        return text.encode("latin-1").translate(_BYTE_TABLE)
+    except UnicodeEncodeError:
+        return text.translate(_CHAR_TABLE).encode("latin-1")
+
+
+class ScreenModel:
+    """
+    Character grid of the C64 screen in one flat buffer: header, per-row version
+    stamps, chars, per-cell fg/bg palette indices, the palette and a small
+    command ring. Rows form a ring (ORIGIN) so scrolling is O(1). The buffer
+    can be a shared memory block so a renderer process can draw it without copies.
+    """
+
+    def __init__(self, cols, rows, buf=None, default_fg=(202, 202, 202), default_bg=(64, 49, 141), shm=None):
+        self.cols = cols
+        self.rows = rows
+        self.default_fg = tuple(default_fg)
+        self.default_bg = tuple(default_bg)
+        self.shm = shm
+        fresh = buf is None
+        if fresh:
+            buf = bytearray(self.buffer_size(cols, rows))
+        view = memoryview(buf)
+        offset = 0
+        self.header = view[offset : offset + HEADER_FIELDS * 4].cast("I")
+        offset += HEADER_FIELDS * 4
+        self.versions = view[offset : offset + rows * 4].cast("I")
+        offset += rows * 4
+        self.chars = view[offset : offset + rows * cols]
+        offset += rows * cols
+        self.fg = view[offset : offset + rows * cols]
+        offset += rows * cols
+        self.bg = view[offset : offset + rows * cols]
+        offset += rows * cols
+        self.palette = view[offset : offset + PALETTE_SIZE * 3]
+        offset += PALETTE_SIZE * 3
+        self.ring = view[offset : offset + RING_SLOTS * RING_SLOT_SIZE]
+        self._palette_index = {}
+        self._fallback_index = {}
+        self._blank_chars = b" " * cols
+        self._default_fg_index = 0
+        self._default_bg_index = 0
+        self._fills = {}
+        # Last (fg, bg) colors written and their palette indices; the style the rest of the cursor row already has.
+        self._last_fg = None
+        self._last_bg = None
+        self._last_style = None
+        self._row_style = None
+        # Per physical row: None in the default colors (no reset needed), the (fg, bg) indices painted
+        # across its whole width, or () for anything else.
+        self._row_colors = [()] * rows
+        # Producer-side copies of the header fields, published by publish(); a batch is open while _seq
+        # is odd, and _moved once the cursor row, origin or scrolls have changed in it.
+        self._moved = False
+        self._seq = self.header[SEQ]
+        self._cursor_x = self.header[CURSOR_X]
+        self._cursor_y = self.header[CURSOR_Y]
+        self._origin = self.header[ORIGIN]
+        self._scrolls = self.header[SCROLLS]
+        self._row = (self._origin + self._cursor_y) % rows  # Physical row of the cursor.
+        if fresh:
+            self.reset()
+
+    @staticmethod
+    def buffer_size(cols, rows):
+        return HEADER_FIELDS * 4 + rows * 4 + rows * cols * 3 + PALETTE_SIZE * 3 + RING_SLOTS * RING_SLOT_SIZE
+
+    @classmethod
+    def create_shared(cls, cols, rows, **kwargs):
+        shm = shared_memory.SharedMemory(create=True, size=cls.buffer_size(cols, rows))
+        model = cls(cols, rows, shm.buf, shm=shm, **kwargs)
+        model.reset()
+        return model
+
+    @classmethod
+    def attach(cls, name, cols, rows, **kwargs):
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(cols, rows, shm.buf, shm=shm, **kwargs)
+
+    def close(self, unlink=False):
+        if self.shm is None:
+            return
+        # Views must be released before the mapping can be closed.
+        for view in (self.header, self.versions, self.chars, self.fg, self.bg, self.palette, self.ring):
+            view.release()
+        self.shm.close()
+        if unlink:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+        self.shm = None
+
+    # Producer side ------------------------------------------------------
+
+    def reset(self):
+        """Start a fresh palette with the default colors and clear the grid."""
+        self.header[PALETTE_COUNT] = 0
+        self._palette_index = {}
+        self._fallback_index = {}
+        self._last_fg = self._last_bg = None
+        self._row_colors = [()] * self.rows
+        self._default_fg_index = self.color_index(self.default_fg)
+        self._default_bg_index = self.color_index(self.default_bg, background=True)
+        self.clear()
+        self.publish()
+
+    def color_index(self, color, background=False):
+        """
+        Palette index for an RGB color, added on first use. Once the palette is
+        full, new colors get the default background or foreground index.
+        """
+        key = tuple(color[:3])
+        index = self._palette_index.get(key)
+        if index is not None:
+            return index
+        count = self.header[PALETTE_COUNT]
+        if count >= PALETTE_SIZE:
+            # Remembered per kind: the same color may also be asked for as the other one.
+            index = self._fallback_index.get((key, background))
+            if index is None:
+                kind = "background" if background else "foreground"
+                print(f"Screen palette full, drawing {key} with the default {kind} color.")
+                index = self._default_bg_index if background else self._default_fg_index
+                self._fallback_index[(key, background)] = index
+            return index
+        index = count
+        self.palette[index * 3 : index * 3 + 3] = bytes(key)
+        self.header[PALETTE_COUNT] = count + 1
+        self._palette_index[key] = index
+        return index
+
+    def _style(self, fg_color, bg_color):
+        """(fg, bg) palette indices, None for a color left as is; write() reuses them while the colors stay the same."""
+        self._last_fg = None if fg_color is None else tuple(fg_color)
+        self._last_bg = None if bg_color is None else tuple(bg_color)
+        self._last_style = (
+            None if fg_color is None else self.color_index(fg_color),
+            None if bg_color is None else self.color_index(bg_color, background=True),
+        )
+        return self._last_style
+
+    def _begin(self):
+        # Changes pile up with SEQ odd until the next publish(): one seqlock round per frame, not per write.
+        if not self._seq & 1:
+            self.header[SEQ] = self._seq = self._seq + 1
+
+    def publish(self):
+        """Hand the changes since the last call to the renderer: cursor, origin and scrolls, then SEQ even again."""
+        seq = self._seq
+        if seq & 1:
+            header = self.header
+            header[CURSOR_X] = self._cursor_x
+            if self._moved:
+                # Only after a newline or a clear: a typed word leaves them as they are.
+                header[CURSOR_Y] = self._cursor_y
+                header[ORIGIN] = self._origin
+                header[SCROLLS] = self._scrolls
+                self._moved = False
+            header[SEQ] = self._seq = seq + 1
+
+    def _stamp(self, physical_row):
+        self.versions[physical_row] = self._seq
+
+    def _reset_row(self, physical_row):
+        cols = self.cols
+        start = physical_row * cols
+        self.chars[start : start + cols] = self._blank_chars
+        if self._row_colors[physical_row] is not None:
+            self.fg[start : start + cols] = self._fill(self._default_fg_index)
+            self.bg[start : start + cols] = self._fill(self._default_bg_index)
+            self._row_colors[physical_row] = None
+        self.versions[physical_row] = self._seq
+
+    def _style_rest_of_row(self, style):
+        # Color from the cursor to the right edge, so a styled line reads as a full-width bar.
+        if style == self._row_style:
+            # Already colored from an earlier cursor position on this row.
+            return
+        self._row_style = style
+        physical = self._row
+        cursor_x = self._cursor_x
+        if cursor_x == 0:
+            if self._row_colors[physical] == style:
+                # A recycled row that already has these colors, typically the previous screenful of the same text.
+                return
+            self._row_colors[physical] = () if None in style else style
+        else:
+            self._row_colors[physical] = ()
+        fg_index, bg_index = style
+        start = physical * self.cols + cursor_x
+        end = (physical + 1) * self.cols
+        if fg_index is not None:
+            self.fg[start:end] = self._fill(fg_index)[: end - start]
+        if bg_index is not None:
+            self.bg[start:end] = self._fill(bg_index)[: end - start]
+        self._stamp(physical)
+
+    def _fill(self, index):
+        """A full row of one palette index, kept per index."""
+        fill = self._fills.get(index)
+        if fill is None:
+            fill = self._fills[index] = bytes((index,)) * self.cols
+        return fill
+
+    def _newline(self, style=None):
+        # The row being left may hold unstamped typed text.
+        self.versions[self._row] = self._seq
+        self._cursor_x = 0
+        self._row_style = None
+        self._moved = True
+        cursor_y = self._cursor_y + 1
+        if cursor_y < self.rows:
+            self._cursor_y = cursor_y
+            self._row = (self._origin + cursor_y) % self.rows
+        else:
+            # The old top row becomes the new (blank) bottom row.
+            row = self._origin
+            self._origin = row + 1 if row + 1 < self.rows else 0
+            self._scrolls += 1
+            self._row = row
+            # _reset_row(row), inlined: every line of typed text ends here once the screen is full.
+            cols = self.cols
+            start = row * cols
+            self.chars[start : start + cols] = self._blank_chars
+            if self._row_colors[row] is not None:
+                # A style with both colors repaints the whole row just below.
+                if style is None or None in style:
+                    self.fg[start : start + cols] = self._fill(self._default_fg_index)
+                    self.bg[start : start + cols] = self._fill(self._default_bg_index)
+                    self._row_colors[row] = None
+            self.versions[row] = self._seq
+        if style is not None:
+            self._style_rest_of_row(style)
+
+    def _clear(self):
+        self._origin = 0
+        for physical_row in range(self.rows):
+            self._reset_row(physical_row)
+        self._cursor_x = 0
+        self._cursor_y = 0
+        self._row = 0
+        self._moved = True
+        self._row_style = None
+
+    def clear(self):
+        self._begin()
+        self._clear()
+
+    def _write_codes(self, data, style):
+        """Copy screen codes (encode_text) at the cursor one row slice at a time, wrapping at the right edge."""
+        if style is not None:
+            self._style_rest_of_row(style)
+        cols = self.cols
+        while data:
+            cursor_x = self._cursor_x
+            count = cols - cursor_x
+            physical = self._row
+            start = physical * cols + cursor_x
+            if len(data) < count:
+                self.chars[start : start + len(data)] = data
+                self._stamp(physical)
+                self._cursor_x = cursor_x + len(data)
+                return
+            self.chars[start : start + count] = data[:count]
+            self._stamp(physical)
+            data = data[count:]
+            self._newline(style)
+
+    def write(self, text, fg_color=None, bg_color=None):
+        if fg_color is None and bg_color is None:
+            style = None
+        elif fg_color == self._last_fg and bg_color == self._last_bg:
+            style = self._last_style
+        else:
+            style = self._style(fg_color, bg_color)
+        if text.isprintable():
+            try:
+                data = text.encode("latin-1").translate(_BYTE_TABLE)
+            except UnicodeEncodeError:
+                data = encode_text(text)
+            cursor_x = self._cursor_x
+            end_x = cursor_x + len(data)
+            if end_x < self.cols and (style is None or style == self._row_style):
+                # Typing fast path, inlined: a word that fits on the current row, in colors the row already has.
+                if not self._seq & 1:
+                    self.header[SEQ] = self._seq = self._seq + 1
+                row_start = self._row * self.cols
+                self.chars[row_start + cursor_x : row_start + end_x] = data
+                self._cursor_x = end_x
+                return
+            if data:
+                self._begin()
+                self._write_codes(data, style)
+            return
+        if "\f" in text:
+            self._write_pages(text, style)
+            return
+        # A word chunk ending its line (e.g. "deck.\n\n   "): one split, no regex, and the same inlined copy
+        # for each piece that fits its row.
+        if not self._seq & 1:
+            self.header[SEQ] = self._seq = self._seq + 1
+        newline = False
+        for line in text.split("\n"):
+            if newline:
+                self._newline(style)
+            newline = True
+            if not line:
+                continue
+            try:
+                data = line.encode("latin-1").translate(_BYTE_TABLE)
+            except UnicodeEncodeError:
+                data = encode_text(line)
+            cursor_x = self._cursor_x
+            end_x = cursor_x + len(data)
+            if end_x < self.cols and (style is None or style == self._row_style):
+                row_start = self._row * self.cols
+                self.chars[row_start + cursor_x : row_start + end_x] = data
+                self._cursor_x = end_x
+            else:
+                self._write_codes(data, style)
+
+    def _write_pages(self, text, style):
+        """Text with form feeds: each one clears the screen."""
+        self._begin()
+        for part in _CONTROL_SPLIT.split(text):
+            if part == "\n":
+                self._newline(style)
+            elif part == "\f":
+                self._clear()
+                if style is not None:
+                    self._style_rest_of_row(style)
+            elif part:
+                self._write_codes(encode_text(part), style)
+
+    def set_show_cursor(self, show):
+        self.header[SHOW_CURSOR] = 1 if show else 0
+
+    def push_command(self, op, payload=b""):
+        """Queue a command for the renderer; False if the ring is full."""
+        payload = bytes(payload)[: RING_SLOT_SIZE - 2]
+        head = self.header[RING_HEAD]
+        if head - self.header[RING_TAIL] >= RING_SLOTS:
+            return False
+        slot = (head % RING_SLOTS) * RING_SLOT_SIZE
+        self.ring[slot] = op
+        self.ring[slot + 1] = len(payload)
+        self.ring[slot + 2 : slot + 2 + len(payload)] = payload
+        self.header[RING_HEAD] = head + 1
+        return True
+
+    # Consumer side ------------------------------------------------------
+
+    def pop_commands(self):
+        commands = []
+        tail = self.header[RING_TAIL]
+        head = self.header[RING_HEAD]
+        while tail != head:
+            slot = (tail % RING_SLOTS) * RING_SLOT_SIZE
+            size = self.ring[slot + 1]
+            commands.append((self.ring[slot], bytes(self.ring[slot + 2 : slot + 2 + size])))
+            tail += 1
+        self.header[RING_TAIL] = tail
+        return commands
+
+    @property
+    def seq(self):
+        return self.header[SEQ]
+
+    @property
+    def scrolls(self):
+        return self.header[SCROLLS]
+
+    @property
+    def cursor_x(self):
+        return self.header[CURSOR_X]
+
+    @property
+    def cursor_y(self):
+        return self.header[CURSOR_Y]
+
+    @property
+    def show_cursor(self):
+        return bool(self.header[SHOW_CURSOR])
+
+    @property
+    def quit_requested(self):
+        return bool(self.header[QUIT])
+
+    def request_quit(self):
+        self.header[QUIT] = 1
+
+    @property
+    def ready(self):
+        return bool(self.header[READY])
+
+    def set_ready(self):
+        self.header[READY] = 1
+
+    def _physical(self, row_index):
+        return (self.header[ORIGIN] + row_index) % self.rows
+
+    def row_version(self, row_index):
+        return self.versions[self._physical(row_index)]
+
+    def _row_slice(self, view, row_index):
+        start = self._physical(row_index) * self.cols
+        return view[start : start + self.cols]
+
+    def row_codes(self, row_index):
+        return self._row_slice(self.chars, row_index)
+
+    def row_fg_indices(self, row_index):
+        return self._row_slice(self.fg, row_index)
+
+    def row_bg_indices(self, row_index):
+        return self._row_slice(self.bg, row_index)
+
+    def palette_color(self, index):
+        return tuple(self.palette[index * 3 : index * 3 + 3])
+
+    def row_text(self, row_index):
+        return bytes(self.row_codes(row_index)).decode("latin-1")
+
+
+def pack_color(color):
+    return struct.pack("BBB", *color[:3])
+
+
+def unpack_color(payload):
+    return struct.unpack("BBB", payload[:3])
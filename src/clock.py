@@ -0,0 +1,72 @@
+import math
+import time
+
+
+class RealClock:
+    """Wall-clock time: what visitors see."""
+
+    speed = 1.0
+
+    def now(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def frame_rate(self, fps):
+        """Rate to hand to pygame's Clock.tick() for a display running at fps (0 = unpaced)."""
+        return fps
+
+
+class AcceleratedClock(RealClock):
+    """Time runs speed times faster: sleeps are shortened and now() advances accordingly."""
+
+    def __init__(self, speed):
+        self.speed = float(speed)
+        self._origin = time.monotonic()
+
+    def now(self):
+        return self._origin + (time.monotonic() - self._origin) * self.speed
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds / self.speed)
+
+    def frame_rate(self, fps):
+        return fps * self.speed if fps else 0
+
+
+class InstantClock(RealClock):
+    """Sleeps return at once and only move the clock forward; real elapsed time still counts."""
+
+    speed = math.inf
+
+    def __init__(self):
+        self._skipped = 0.0
+
+    def now(self):
+        return time.monotonic() + self._skipped
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self._skipped += seconds
+
+    def frame_rate(self, fps):
+        return 0
+
+
+def make_clock(mode="real"):
+    """Clock for a mode: "real", "instant", or an acceleration factor ("x10", "x100")."""
+    mode = str(mode or "real").strip().lower()
+    if mode == "real":
+        return RealClock()
+    if mode == "instant":
+        return InstantClock()
+    try:
+        speed = float(mode[1:] if mode.startswith("x") else mode)
+    except ValueError:
+        raise ValueError(f"Unknown clock mode: {mode!r}")
+    if speed <= 0:
+        raise ValueError(f"Clock speed must be positive: {mode!r}")
+    return RealClock() if speed == 1 else AcceleratedClock(speed)
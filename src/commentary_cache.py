@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import random
+import tempfile
+import time
+
+CACHE_VERSION = 1
+DEFAULT_MAX_VARIANTS = 4
+DEFAULT_FRESH_CHANCE = 0.2
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_MAX_AGE_SEC = 30 * 24 * 3600
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+# New variants are written out in batches; flush() writes the rest (loop restart, exit).
+DEFAULT_SAVE_EVERY = 10
+
+
+def commentary_cache_key(model, prompt, options=None):
+    payload = json.dumps(
+        {"model": model, "options": options or {}, "prompt": prompt},
+        sort_keys=True,
+        ensure_ascii=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CommentaryCache:
+    """
+    On-disk pool of LLM commentaries keyed by model/options/prompt hash.
+    Each key keeps up to max_variants lines so repeated loops can replay them.
+    """
+
+    def __init__(
+        self,
+        path,
+        max_variants=DEFAULT_MAX_VARIANTS,
+        fresh_chance=DEFAULT_FRESH_CHANCE,
+        max_entries=DEFAULT_MAX_ENTRIES,
+        max_age_sec=DEFAULT_MAX_AGE_SEC,
+        max_bytes=DEFAULT_MAX_BYTES,
+        save_every=DEFAULT_SAVE_EVERY,
+    ):
+        self.path = path
+        self.max_variants = max(1, int(max_variants))
+        self.fresh_chance = min(1.0, max(0.0, float(fresh_chance)))
+        self.max_entries = max_entries
+        self.max_age_sec = max_age_sec
+        self.max_bytes = max_bytes
+        self.save_every = max(1, int(save_every))
+        self.entries = self._load()
+        self.lookups = 0
+        self.hits = 0
+        self.unsaved = 0
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        except Exception as exc:
+            print(f"Ignoring unreadable commentary cache {self.path}: {exc}")
+            return {}
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return {}
+        entries = data.get("entries")
+        if not isinstance(entries, dict):
+            return {}
+        return entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def wants_fresh(self, key):
+        """True when the caller should generate a new line instead of replaying one."""
+        self.lookups += 1
+        entry = self.entries.get(key)
+        if not entry or not entry.get("variants"):
+            return True
+        return random.random() < self.fresh_chance
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if not entry or not entry.get("variants"):
+            return None
+        self.hits += 1
+        entry["last_used"] = time.time()
+        return random.choice(entry["variants"])["text"]
+
+    def add(self, key, text):
+        text = (text or "").strip()
+        if not text:
+            return False
+        now = time.time()
+        entry = self.entries.setdefault(key, {"variants": [], "last_used": now})
+        entry["last_used"] = now
+        if any(variant["text"] == text for variant in entry["variants"]):
+            return False
+        entry["variants"].append({"text": text, "created": now})
+        if len(entry["variants"]) > self.max_variants:
+            # Drop the oldest variants first.
+            entry["variants"] = entry["variants"][-self.max_variants:]
+        self.evict(now)
+        self.unsaved += 1
+        if self.unsaved >= self.save_every:
+            self.save()
+        return True
+
+    def flush(self):
+        """Write the variants added since the last save, if any."""
+        if self.unsaved:
+            self.save()
+
+    def stats_summary(self):
+        if not self.lookups:
+            return "Commentary cache: no lookups."
+        return (
+            f"Commentary cache: {self.hits} of {self.lookups} commentaries replayed "
+            f"({self.hits / self.lookups * 100.0:.0f}%), {len(self.entries)} prompts"
+        )
+
+    def evict(self, now=None):
+        now = time.time() if now is None else now
+        if self.max_age_sec:
+            expired = [
+                key
+                for key, entry in self.entries.items()
+                if now - entry.get("last_used", 0.0) > self.max_age_sec
+            ]
+            for key in expired:
+                del self.entries[key]
+        if self.max_entries and len(self.entries) > self.max_entries:
+            for key in self._keys_by_age()[: len(self.entries) - self.max_entries]:
+                del self.entries[key]
+
+    def _keys_by_age(self):
+        return sorted(self.entries, key=lambda key: self.entries[key].get("last_used", 0.0))
+
+    def _serialize(self):
+        payload = {"version": CACHE_VERSION, "entries": self.entries}
+        return json.dumps(payload, ensure_ascii=True, separators=(",", ":"))
+
+    def save(self):
+        self.unsaved = 0
+        serialized = self._serialize()
+        while self.max_bytes and len(serialized) > self.max_bytes and self.entries:
+            # Drop the least recently used tenth and try again.
+            oldest = self._keys_by_age()
+            for key in oldest[: max(1, len(oldest) // 10)]:
+                del self.entries[key]
+            serialized = self._serialize()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # Write next to the target then swap, so a crash never leaves a truncated cache.
+        fd, tmp_path = tempfile.mkstemp(prefix=".commentary-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(serialized)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception as exc:
+            print(f"Unable to write commentary cache: {exc}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
@@ -7,6 +7,8 @@ import os
 import re
 import sys
 
+from video_catalog import is_binary_catalog_path, load_catalog_metadata, write_catalog_metadata
+
 TIMECODE_RE = re.compile(
     r"^\s*\d{1,2}:\d{2}:\d{2}[.,]\d{1,3}\s*,\s*\d{1,2}:\d{2}:\d{2}[.,]\d{1,3}\s*$"
 )
@@ -76,7 +78,7 @@ def main():
         "-i",
         "--input",
         default=os.path.join("assets", "abriggs-itw-embeddings.json"),
-        help="Path to abriggs-itw-embeddings.json",
+        help="Path to abriggs-itw-embeddings.json, or a binary catalog (.npy / .meta.json)",
     )
     parser.add_argument(
         "-s",
@@ -87,7 +89,7 @@ def main():
     parser.add_argument(
         "-o",
         "--output",
-        help="Output JSON path (defaults to overwrite input)",
+        help="Output path (defaults to overwrite input; binary catalogs only rewrite the .meta.json sidecar)",
     )
     args = parser.parse_args()
 
@@ -98,7 +100,13 @@ def main():
         print(f"Subtitles folder not found: {args.subtitles_dir}", file=sys.stderr)
         return 1
 
-    data = load_embeddings(args.input)
+    binary = is_binary_catalog_path(args.input)
+    if binary:
+        # Durations live in the small sidecar; the vector block is left untouched.
+        meta = load_catalog_metadata(args.input)
+        data = meta.get("entries") or []
+    else:
+        data = load_embeddings(args.input)
     updated = 0
     missing = 0
 
@@ -121,7 +129,10 @@ def main():
         updated += 1
 
     output_path = args.output or args.input
-    write_embeddings(output_path, data)
+    if binary:
+        write_catalog_metadata(output_path, meta)
+    else:
+        write_embeddings(output_path, data)
     print(f"Updated {updated} entries. Missing {missing}. Wrote: {output_path}")
     return 0
 
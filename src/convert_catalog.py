@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Convert the interview embeddings between JSON and the binary (.npy + .meta.json) catalog."""
+
+import argparse
+import json
+import os
+import sys
+
+from video_catalog import (
+    CATALOG_DTYPES,
+    binary_catalog_paths,
+    catalog_to_items,
+    is_binary_catalog_path,
+    load_binary_catalog,
+    write_binary_catalog,
+)
+
+DEFAULT_MODEL = "embeddinggemma:300m"
+DEFAULT_INPUT_PATH = os.path.join("assets", "abriggs-itw-embeddings.json")
+# Binary back to JSON goes next to the source JSON, not over it: the float32/float16 vectors are rounded.
+ROUNDTRIP_SUFFIX = ".roundtrip.json"
+
+
+def json_to_binary(input_path, output_path, model, dtype):
+    with open(input_path, "r", encoding="utf-8") as handle:
+        items = json.load(handle)
+    if not isinstance(items, list):
+        raise ValueError("Embeddings JSON must be a list.")
+    count = write_binary_catalog(output_path, items, model=model, dtype=dtype)
+    npy_path, meta_path = binary_catalog_paths(output_path)
+    print(f"Wrote {count} clips: {npy_path} ({os.path.getsize(npy_path)} bytes) + {meta_path}")
+
+
+def binary_to_json(input_path, output_path):
+    items = catalog_to_items(load_binary_catalog(input_path))
+    with open(output_path, "w", encoding="utf-8") as handle:
+        json.dump(items, handle, ensure_ascii=True, indent=2)
+    print(f"Wrote {len(items)} clips: {output_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert abriggs-itw-embeddings between JSON and the memory-mapped binary catalog."
+    )
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default=DEFAULT_INPUT_PATH,
+        help="Embeddings JSON, or a binary catalog (.npy / .meta.json) to convert back",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help=f"Output path (defaults to the input path with the other format's extension, {ROUNDTRIP_SUFFIX} for JSON)",
+    )
+    parser.add_argument(
+        "-m",
+        "--model",
+        default=DEFAULT_MODEL,
+        help="Embedding model name recorded in the sidecar",
+    )
+    parser.add_argument(
+        "--dtype",
+        choices=CATALOG_DTYPES,
+        default="float32",
+        help="Vector block precision",
+    )
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"Catalog not found: {args.input}", file=sys.stderr)
+        return 1
+    if is_binary_catalog_path(args.input):
+        output = args.output or os.path.splitext(binary_catalog_paths(args.input)[0])[0] + ROUNDTRIP_SUFFIX
+        binary_to_json(args.input, output)
+    else:
+        output = args.output or binary_catalog_paths(args.input)[0]
+        json_to_binary(args.input, output, args.model, args.dtype)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,169 @@
+import queue
+import threading
+import time
+
+_END = object()
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def wait_until(deadline, poll=None, poll_interval=0.01):
+    """Sleep until the monotonic deadline while calling poll() (e.g. the pygame event pump)."""
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        if poll:
+            poll()
+        time.sleep(min(poll_interval, remaining))
+
+
+class BackgroundCall:
+    """
+    Run func in a daemon thread so the caller can stop waiting at any time.
+    Threads cannot be killed: on_cancel is what makes an abandoned call
+    actually stop (e.g. closing its connection).
+    """
+
+    def __init__(self, func, on_cancel=None):
+        self.result = None
+        self.error = None
+        self.cancelled = threading.Event()
+        self._on_cancel = on_cancel
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(func,), daemon=True)
+        self._thread.start()
+
+    def _run(self, func):
+        try:
+            self.result = func()
+        except Exception as exc:
+            self.error = exc
+        finally:
+            self._done.set()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, deadline, poll=None, poll_interval=0.01):
+        """True once the call finished, False if the deadline passed first."""
+        while not self._done.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if poll:
+                poll()
+            self._done.wait(min(poll_interval, remaining))
+        return True
+
+    def cancel(self):
+        _cancel(self.cancelled, self._on_cancel)
+
+
+def _cancel(cancelled, on_cancel):
+    if cancelled.is_set():
+        return
+    cancelled.set()
+    if on_cancel:
+        try:
+            on_cancel()
+        except Exception as exc:
+            print(f"Cancel failed: {exc}")
+
+
+def call_with_deadline(func, deadline, poll=None, retries=0, backoff=0.5, label="call", on_cancel=None):
+    """
+    Call func() in a worker thread until it succeeds, retrying failures with
+    exponential backoff, without going past the monotonic deadline.
+    on_cancel is called when an attempt is abandoned at the deadline.
+    Returns (True, result) or (False, None).
+    """
+    attempt = 0
+    while True:
+        if deadline - time.monotonic() <= 0:
+            print(f"{label} skipped, its deadline has passed")
+            return False, None
+        call = BackgroundCall(func, on_cancel)
+        if not call.wait(deadline, poll):
+            call.cancel()
+            print(f"{label} exceeded its deadline")
+            return False, None
+        if call.error is None:
+            return True, call.result
+        attempt += 1
+        if attempt > retries:
+            print(f"{label} failed: {call.error}")
+            return False, None
+        delay = backoff * (2 ** (attempt - 1))
+        if time.monotonic() + delay >= deadline:
+            print(f"{label} failed, no time left to retry: {call.error}")
+            return False, None
+        print(f"{label} failed ({call.error}), retry #{attempt} in {delay:.1f}s")
+        wait_until(time.monotonic() + delay, poll)
+
+
+class BackgroundStream:
+    """
+    Consume an iterator (e.g. a streamed chat response) in a daemon thread.
+    on_cancel must unblock a thread waiting for the next item (e.g. by
+    closing the connection), otherwise it only stops at the next item.
+    """
+
+    def __init__(self, make_iterator, on_cancel=None):
+        self.error = None
+        self.cancelled = threading.Event()
+        self._on_cancel = on_cancel
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, args=(make_iterator,), daemon=True)
+        self._thread.start()
+
+    def _run(self, make_iterator):
+        iterator = None
+        try:
+            iterator = make_iterator()
+            for item in iterator:
+                if self.cancelled.is_set():
+                    break
+                self._queue.put(item)
+        except Exception as exc:
+            self.error = exc
+        finally:
+            close = getattr(iterator, "close", None)
+            if close:
+                try:
+                    # Closing the generator also closes the underlying HTTP response.
+                    close()
+                except Exception:
+                    pass
+            self._queue.put(_END)
+
+    def items(self, first_deadline, idle_timeout, poll=None, poll_interval=0.01):
+        """
+        Yield items as they arrive. The first one must come before first_deadline,
+        later ones within idle_timeout of the previous; otherwise the stream is
+        cancelled and DeadlineExceeded is raised.
+        """
+        deadline = first_deadline
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.cancel()
+                raise DeadlineExceeded()
+            if poll:
+                poll()
+            try:
+                item = self._queue.get(timeout=min(poll_interval, remaining))
+            except queue.Empty:
+                continue
+            if item is _END:
+                if self.error is not None:
+                    raise self.error
+                return
+            yield item
+            deadline = time.monotonic() + idle_timeout
+
+    def cancel(self):
+        _cancel(self.cancelled, self._on_cancel)
@@ -6,13 +6,19 @@ import json
 import os
 import re
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import ollama
 
+from video_catalog import is_binary_catalog_path, write_binary_catalog
+
 DEFAULT_MODEL = "embeddinggemma:300m" # "qwen3-embedding"
 DEFAULT_TITLE_MODEL = "ministral-3:14b"
 DEFAULT_INPUT_DIR = os.path.join("godot-viewer", "video")
 DEFAULT_OUTPUT_PATH = os.path.join("assets", "abriggs-itw-embeddings.json")
+DEFAULT_BATCH_SIZE = 16
+DEFAULT_JOBS = 4
 
 TIMECODE_RE = re.compile(
     r"^\s*\d{1,2}:\d{2}:\d{2}[.,]\d{1,3}\s*,\s*\d{1,2}:\d{2}:\d{2}[.,]\d{1,3}\s*$"
@@ -74,27 +80,66 @@ def build_title(text, model):
     return (response.message.content or "").strip()
 
 
-def embed_files(paths, model, title_model):
-    results = []
-    total = len(paths)
-    for idx, path in enumerate(paths, start=1):
+def embed_batches(texts, model, batch_size):
+    """Embed texts with one request per batch, keeping input order."""
+    vectors = []
+    batch_size = max(1, batch_size)
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        response = ollama.embed(model=model, input=batch)
+        embeddings = response.get("embeddings") or []
+        if len(embeddings) != len(batch):
+            raise RuntimeError(f"Expected {len(batch)} embeddings, got {len(embeddings)}")
+        vectors.extend(embeddings)
+        print(f"Embedded {min(start + batch_size, len(texts))}/{len(texts)}")
+    return vectors
+
+
+def embed_files(paths, model, title_model, batch_size=DEFAULT_BATCH_SIZE, jobs=DEFAULT_JOBS):
+    timings = {}
+    started = time.perf_counter()
+    sources = []
+    for path in paths:
         text = extract_plain_text(path)
         if not text:
             print(f"Skipping empty text: {path}")
             continue
-        response = ollama.embeddings(model=model, prompt=text)
-        sequence_title = build_title(text, title_model)
+        sources.append((path, text))
+    timings["extract"] = time.perf_counter() - started
+    texts = [text for _, text in sources]
+
+    # Titles run on a bounded pool while the embedding batches go out.
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        title_futures = [pool.submit(build_title, text, title_model) for text in texts]
+        t0 = time.perf_counter()
+        vectors = embed_batches(texts, model, batch_size)
+        timings["embeddings"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        titles = []
+        for idx, ((path, _), future) in enumerate(zip(sources, title_futures), start=1):
+            titles.append(future.result())
+            print(f"Titled {idx}/{len(sources)}: {os.path.basename(path)}")
+        timings["titles_wait"] = time.perf_counter() - t0
+
+    results = []
+    for (path, _), vector, sequence_title in zip(sources, vectors, titles):
         filename = os.path.basename(path)
         if filename.lower().endswith(".txt"):
             filename = filename[:-4] + ".ogv"
         results.append(
             {
                 "filename": filename,
-                "embedding": response.get("embedding"),
+                "embedding": vector,
                 "sequence_title": sequence_title,
             }
         )
-        print(f"Embedded {idx}/{total}: {os.path.basename(path)}")
+    timings["total"] = time.perf_counter() - started
+    print(
+        f"Timing: {len(results)} files, extract {timings['extract']:.2f}s, "
+        f"embeddings {timings['embeddings']:.2f}s (batch {batch_size}), "
+        f"titles +{timings['titles_wait']:.2f}s after embeddings (jobs {jobs}), "
+        f"total {timings['total']:.2f}s"
+    )
     return results
 
 
@@ -112,7 +157,7 @@ def main():
         "-o",
         "--output",
         default=DEFAULT_OUTPUT_PATH,
-        help="Output JSON path",
+        help="Output JSON path, or a .npy path to write the binary catalog",
     )
     parser.add_argument("-m", "--model", default=DEFAULT_MODEL, help="Ollama embedding model")
     parser.add_argument(
@@ -121,6 +166,20 @@ def main():
         default=DEFAULT_TITLE_MODEL,
         help="Ollama model for sequence titles",
     )
+    parser.add_argument(
+        "-b",
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Transcripts embedded per request",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help="Concurrent title requests",
+    )
     args = parser.parse_args()
 
     files = list_text_files(args.input_dir)
@@ -128,12 +187,16 @@ def main():
         print(f"No .txt files found in {args.input_dir}", file=sys.stderr)
         return 1
 
-    results = embed_files(files, args.model, args.title_model)
+    results = embed_files(files, args.model, args.title_model, args.batch_size, args.jobs)
     if not results:
         print("No embeddings generated.", file=sys.stderr)
         return 1
 
     os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    if is_binary_catalog_path(args.output):
+        write_binary_catalog(args.output, results, model=args.model)
+        print(f"Wrote binary catalog: {args.output}")
+        return 0
     with open(args.output, "w", encoding="utf-8") as handle:
         json.dump(results, handle, ensure_ascii=True, indent=2)
 
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Capture the game text of every ending. The walkthrough is played once
+and saved (checkpoints.py) at each decision point; every branch then
+runs in its own game process from a pool: restore the decision point,
+play the branch's commands instead of the walkthrough's, go on with the
+rest of the walkthrough until the game ends. Each branch is written like
+a walkthrough_runner variant, passages deduplicated:
+assets/game-raw-output-ending-NAME.json and assets/game-steps-ending-NAME.json.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import faketerm
+from checkpoints import CHECKPOINT_BACKENDS, CHECKPOINT_DIR, CheckpointStore
+from game_session import GAME_BACKENDS
+from walkthrough_runner import CORPUS_DIR, DEFAULT_BACKEND, corpus_entries, open_session, play_walkthrough, write_variant
+from zmachine_session import STORY_PATH
+
+DEFAULT_JOBS = os.cpu_count() or 1
+# Infocom's closing question: the game is over.
+ENDING_MARKER = "RESTART, RESTORE, or QUIT"
+# Decision points. At the `occurrence`-th walkthrough command equal to "at", "play" is sent instead;
+# with "rejoin" (the default) the rest of the walkthrough follows. A branch is reported unverified
+# until its spec says "verified": true, once someone has read the ending it produces; none of these has.
+DEFAULT_BRANCHES = [
+    {"name": "lafond-yes", "at": "lafond, no", "play": ["lafond, yes"]},
+    {"name": "crulley-no-fight", "at": "kill crulley", "play": ["z"]},
+    {"name": "nicholas-no", "at": "nicholas, yes", "play": ["nicholas, no"]},
+    {"name": "crulley-not-shot", "at": "fire pistol at crulley", "play": ["z", "z", "z"]},
+]
+MAIN_BRANCH = "walkthrough"
+
+
+def load_branches(path):
+    with open(path, "r", encoding="utf-8") as handle:
+        branches = json.load(handle)
+    if not isinstance(branches, list):
+        raise ValueError(f"{path}: expected a list of branches")
+    return branches
+
+
+def decision_step(branch, commands):
+    """Walkthrough index of the branch's decision point, or None if the walkthrough has no such command."""
+    wanted = faketerm.enhance_game_command(branch["at"])
+    seen = 0
+    for index, cmd in enumerate(commands):
+        if faketerm.enhance_game_command(cmd) == wanted:
+            seen += 1
+            if seen == branch.get("occurrence", 1):
+                return index
+    return None
+
+
+def branch_commands(branch, step, commands):
+    rest = list(commands[step + 1 :]) if branch.get("rejoin", True) else []
+    return list(commands[:step]) + list(branch["play"]) + rest
+
+
+def play_main(session, commands, decisions, checkpoints):
+    """Play the whole walkthrough, saving a checkpoint (if any) at each decision step on the way; returns (steps, ending)."""
+    steps = []
+    start = 0
+    saved = None
+    for step in sorted(set(decisions)) + [len(commands)]:
+        chunk, ending = play_walkthrough(session, commands[:step], start)
+        if saved and chunk:
+            # SAVE printed its own answer: keep the passage the walkthrough showed at this prompt.
+            chunk[0]["passage"], chunk[0]["status"] = saved
+        steps.extend(chunk)
+        start = step
+        if len(steps) < step or not session.at_prompt:
+            break
+        saved = None
+        if checkpoints is not None and step < len(commands) and not checkpoints.has(step, commands):
+            saved = (session.text, session.status_bar)
+            checkpoints.save(session, step, commands)
+    return steps, ending
+
+
+def run_branch(branch, step, commands, checkpoint_dir, backend, story_path, seed, timeout, frotz):
+    """Play one branch in this process from its decision checkpoint, if any; returns its steps (picklable, for the pool)."""
+    started = time.perf_counter()
+    checkpoints = CheckpointStore(checkpoint_dir, interval=0) if checkpoint_dir else None
+    session = open_session(backend, story_path, seed, timeout, frotz)
+    try:
+        session.start()
+        if session.at_intro:
+            session.send("")
+        restored = (
+            checkpoints is not None
+            and checkpoints.has(step, commands)
+            and session.restore_game(checkpoints.path(step))
+        )
+        if not restored:
+            play_walkthrough(session, commands[:step])
+        played = branch_commands(branch, step, commands)
+        steps, ending = play_walkthrough(session, played, step, stop_text=ENDING_MARKER)
+        ended = not session.alive or ENDING_MARKER in ending
+        stats = session.stats_summary()
+    finally:
+        session.close()
+    return {
+        "name": branch["name"],
+        "steps": steps,
+        "ending": ending,
+        "ended": ended,
+        "commands": len(played),
+        "restored": restored,
+        "seconds": time.perf_counter() - started,
+        "stats": stats,
+    }
+
+
+def branch_result(result, branch, decision, main, backend, story_path, seed):
+    """A branch as a walkthrough_runner result: the walkthrough up to its decision point, then its own steps."""
+    steps = result["steps"]
+    if result["restored"] and steps and decision < len(main["steps"]):
+        # RESTORE printed its own answer: the passage at the decision point is the walkthrough's.
+        steps[0]["passage"] = main["steps"][decision]["passage"]
+        steps[0]["status"] = main["steps"][decision]["status"]
+    return {
+        "name": f"ending-{result['name']}",
+        "story": os.path.basename(story_path),
+        "backend": backend,
+        "seed": seed,
+        "decision": decision,
+        "intro": main["intro"],
+        "steps": main["steps"][:decision] + steps,
+        "ending": result["ending"],
+        "commands": result["commands"],
+        "complete": result["ended"],
+        "verified": bool(branch.get("verified", False)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Capture the game text of every ending, one process per branch.")
+    parser.add_argument("--branches", help="JSON list of branches (default: DEFAULT_BRANCHES, unverified)")
+    parser.add_argument("--story", default=STORY_PATH, help="Story file")
+    parser.add_argument("--backend", choices=GAME_BACKENDS, default=DEFAULT_BACKEND, help="Game backend")
+    parser.add_argument("--seed", type=int, default=faketerm.GAME_RANDOM_SEED, help="Random seed for the game")
+    parser.add_argument("--timeout", type=float, default=faketerm.GAME_TURN_TIMEOUT_SEC, help="Per-read timeout")
+    parser.add_argument("--frotz", default="frotz", help="frotz executable for the frotz backend")
+    parser.add_argument("--checkpoints", default=CHECKPOINT_DIR, help="Where the decision points are saved")
+    parser.add_argument("-o", "--output-dir", default=CORPUS_DIR, help="Where the corpus files are written")
+    parser.add_argument("-j", "--jobs", type=int, default=DEFAULT_JOBS, help="Worker processes")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.story):
+        print(f"Story file not found: {args.story} (run src/get_game.py)", file=sys.stderr)
+        return 1
+    if args.backend == "frotz" and shutil.which(args.frotz) is None:
+        print(f"{args.frotz} was not found on PATH.", file=sys.stderr)
+        return 1
+    commands = list(faketerm.plundered_hearts_commands)
+    branches = load_branches(args.branches) if args.branches else DEFAULT_BRANCHES
+    if not args.branches:
+        print("Using DEFAULT_BRANCHES: their decision points have not been checked against the game's endings.")
+    failed = []
+    decisions = {}
+    for branch in branches:
+        step = decision_step(branch, commands)
+        if step is None:
+            print(f"{branch['name']}: {branch['at']!r} is not in the walkthrough, skipped.")
+            failed.append(branch["name"])
+            continue
+        decisions[branch["name"]] = step
+
+    started = time.perf_counter()
+    checkpoint_dir = args.checkpoints if args.backend in CHECKPOINT_BACKENDS else None
+    if checkpoint_dir is None:
+        print(f"Checkpoints are off with the {args.backend} backend: every branch replays the walkthrough.")
+    checkpoints = CheckpointStore(checkpoint_dir, interval=0) if checkpoint_dir else None
+    session = open_session(args.backend, args.story, args.seed, args.timeout, args.frotz)
+    try:
+        session.start()
+        intro = session.text if session.at_intro else ""
+        if session.at_intro:
+            session.send("")
+        steps, ending = play_main(session, commands, decisions.values(), checkpoints)
+    finally:
+        session.close()
+    main_result = {
+        "name": f"ending-{MAIN_BRANCH}",
+        "story": os.path.basename(args.story),
+        "backend": args.backend,
+        "seed": args.seed,
+        "decision": None,
+        "intro": intro,
+        "steps": steps,
+        "ending": ending,
+        "commands": len(commands),
+        "complete": len(steps) == len(commands),
+    }
+    print(f"{MAIN_BRANCH}: {len(steps)}/{len(commands)} steps in {time.perf_counter() - started:.2f}s")
+    if not main_result["complete"]:
+        failed.append(MAIN_BRANCH)
+
+    todo = [branch for branch in branches if decisions.get(branch["name"], len(steps)) < len(steps)]
+    for branch in branches:
+        if branch["name"] in decisions and branch not in todo:
+            print(f"{branch['name']}: the walkthrough stopped before step {decisions[branch['name']]}, skipped.")
+            failed.append(branch["name"])
+    options = (commands, checkpoint_dir, args.backend, args.story, args.seed, args.timeout, args.frotz)
+    jobs = max(1, min(args.jobs, len(todo)))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(run_branch, branch, decisions[branch["name"]], *options) for branch in todo]
+        results = [future.result() for future in futures]
+
+    main_entries = corpus_entries(main_result["intro"], main_result["steps"])
+    write_variant(main_result, args.output_dir)
+    by_name = {branch["name"]: branch for branch in todo}
+    for result in results:
+        decision = decisions[result["name"]]
+        branch = branch_result(
+            result, by_name[result["name"]], decision, main_result, args.backend, args.story, args.seed
+        )
+        raw_path, _ = write_variant(branch, args.output_dir)
+        entries = corpus_entries(branch["intro"], branch["steps"])
+        new = len(set(entries) - set(main_entries))
+        state = "ending reached" if branch["complete"] else "no ending"
+        if not branch["verified"]:
+            state += " (unverified branch)"
+        if not branch["complete"]:
+            failed.append(result["name"])
+        print(
+            f"{result['name']}: from step {decision}, {len(branch['steps'])} steps, {len(entries)} passages "
+            f"({new} not in the walkthrough), {state}, {result['seconds']:.2f}s -> {raw_path}"
+        )
+        print(f"  {result['stats']}")
+    print(f"{len(results) + 1} branches in {time.perf_counter() - started:.2f}s on {jobs} processes")
+    if failed:
+        print(f"No ending captured for: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
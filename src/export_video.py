@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Export a full playthrough as a video, faster than real time.
+
+The C64 renderer runs headless on a virtual clock: typing delays and
+render_frame ticks advance the clock instead of sleeping, and frames are
+piped to ffmpeg at fixed timestamps. The walkthrough is split into segments
+rendered by parallel worker processes, then joined with ffmpeg's concat
+demuxer (no re-encode).
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import faketerm
+from c64renderer import C64Renderer
+from playback_bundle import load_playback_bundle
+from precompute_bundle import load_walkthrough_passages
+
+EXPORT_FPS = 50
+# faketerm drives the renderer at 50 fps: every render_frame call takes one tick.
+RENDER_FRAME_SEC = 1 / 50.0
+DEFAULT_OUTPUT = "pllmdered-playthrough.mp4"
+DEFAULT_JOBS = os.cpu_count() or 1
+# Segments per worker; smaller segments balance the load better across workers.
+SEGMENTS_PER_JOB = 2
+FFMPEG_VIDEO_ARGS = ["-c:v", "libx264", "-preset", "veryfast", "-crf", "18", "-pix_fmt", "yuv420p"]
+PASSAGE_TYPING = dict(base_delay=1 / 60.0, min_delay=1 / 240.0, max_delay=1 / 30.0, beep=False, word_mode=True)
+RESTART_MESSAGE = "Congratulations, you just finished pLLMdered_hearts.\nThe installation will now restart."
+
+
+def build_timeline(raw_output_path, bundle_path=None):
+    """One entry per walkthrough step: game passage, bundled commentary / video title, command."""
+    bundle = load_playback_bundle(bundle_path) if bundle_path else None
+    catalog = faketerm.load_video_embeddings(faketerm.VIDEO_EMBEDDINGS_PATH) if bundle else []
+    timeline = []
+    for step in load_walkthrough_passages(raw_output_path, faketerm.plundered_hearts_commands):
+        passage = step["passage"]
+        entry = {
+            "step": step["step"],
+            "cmd": step["cmd"],
+            "text": passage["prev_output"].strip() if passage else "",
+            "commentary": None,
+            "video": None,
+        }
+        bundle_step = bundle.find(step["step"], step["cmd"], passage["key"] if passage else None) if bundle else None
+        if bundle_step:
+            entry["commentary"] = bundle_step.get("commentary") or None
+            video = faketerm.find_video_entry(catalog, bundle_step.get("video"))
+            if video:
+                entry["video"] = {
+                    "title": video.get("sequence_title") or video["filename"],
+                    "duration": faketerm._get_video_duration(video),
+                }
+        timeline.append(entry)
+    return timeline
+
+
+def split_segments(timeline, count):
+    """Split the step indices into count contiguous ranges of about the same amount of text."""
+    weights = [len(entry["text"]) + len(entry["commentary"] or "") + len(entry["cmd"]) + 1 for entry in timeline]
+    total = sum(weights)
+    count = max(1, min(count, len(timeline)))
+    segments = []
+    start = 0
+    done = 0
+    for index, weight in enumerate(weights):
+        done += weight
+        if len(segments) < count - 1 and done >= total * (len(segments) + 1) / count:
+            segments.append((start, index + 1))
+            start = index + 1
+    segments.append((start, len(timeline)))
+    return [segment for segment in segments if segment[0] < segment[1]]
+
+
+class FrameRecorder:
+    """
+    Renderer front end for type_to_renderer on a virtual clock. Frames are
+    written to sink at fixed 1/fps timestamps; while recording is off (the
+    part of the playthrough before this worker's segment) the screen is only
+    brought up to date and the clock advanced, without composing frames.
+    """
+
+    def __init__(self, renderer, sink=None, fps=EXPORT_FPS, frame_sec=RENDER_FRAME_SEC):
+        self.renderer = renderer
+        self.sink = sink
+        self.fps = fps
+        self.frame_sec = frame_sec
+        self.time = 0.0
+        self.recording = False
+        self.frames_written = 0
+        self.first_frame = 0
+        self._frame = None
+        self._frame_composed = None
+
+    def start_recording(self):
+        # Continue on the global frame grid so segments join without drift.
+        self.recording = True
+        self.frames_written = int(self.time * self.fps)
+        self.first_frame = self.frames_written
+
+    def write(self, text, fg_color=None, bg_color=None):
+        self.renderer.write(text, fg_color=fg_color, bg_color=bg_color)
+
+    def render_frame(self, show_cursor=False):
+        if self.recording:
+            self.renderer.render_frame(show_cursor=show_cursor)
+        self.sleep(self.frame_sec)
+
+    def sleep(self, seconds):
+        self.time += seconds
+        if not self.recording:
+            return
+        due = int(self.time * self.fps)
+        if due <= self.frames_written:
+            return
+        if self._frame is None or self._frame_composed != self.renderer.frames_composed:
+            self._frame = pygame.image.tobytes(self.renderer.window, "RGB")
+            self._frame_composed = self.renderer.frames_composed
+        for _ in range(due - self.frames_written):
+            self.sink.write(self._frame)
+        self.frames_written = due
+
+
+def play_step(recorder, entry, state):
+    """What faketerm shows for one walkthrough step when replaying a bundle."""
+    sleep = recorder.sleep
+    if entry["text"]:
+        faketerm.type_to_renderer(recorder, entry["text"] + "\n", sleep=sleep, **PASSAGE_TYPING)
+    else:
+        recorder.render_frame()
+    if entry["commentary"]:
+        faketerm.type_labeled_line(recorder, faketerm.AI_COMMENT_LABEL, entry["commentary"], sleep=sleep)
+    if entry["video"]:
+        state["pending_video"] = entry["video"]
+    # Video titles follow the clip cooldown, on the virtual clock.
+    video = state.get("pending_video")
+    if video and recorder.time >= state.get("next_video_time", 0.0):
+        faketerm.type_labeled_line(recorder, faketerm.AI_VIDEO_LABEL, video["title"], sleep=sleep)
+        state["next_video_time"] = recorder.time + video["duration"]
+        state["pending_video"] = None
+    faketerm.type_to_renderer(recorder, "\n>> " + entry["cmd"].strip() + "\n", beep=False, sleep=sleep)
+
+
+def ffmpeg_encoder(path, size, fps):
+    command = [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y",
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "rgb24",
+        "-s",
+        f"{size[0]}x{size[1]}",
+        "-r",
+        str(fps),
+        "-i",
+        "-",
+        *FFMPEG_VIDEO_ARGS,
+        path,
+    ]
+    return subprocess.Popen(command, stdin=subprocess.PIPE)
+
+
+def render_segment(timeline, start, end, path, fps, renderer_options):
+    """Worker: replay steps [0, end), recording [start, end) into path. Returns (frames, first frame)."""
+    renderer = C64Renderer(fps=0, headless=True, **renderer_options)
+    recorder = FrameRecorder(renderer, fps=fps)
+    state = {}
+    encoder = None
+    try:
+        for index in range(end):
+            if index == start:
+                encoder = ffmpeg_encoder(path, renderer.window.get_size(), fps)
+                recorder.sink = encoder.stdin
+                recorder.start_recording()
+            play_step(recorder, timeline[index], state)
+        if end == len(timeline):
+            faketerm.type_to_renderer(recorder, "\n" + RESTART_MESSAGE + "\n", sleep=recorder.sleep, **PASSAGE_TYPING)
+    finally:
+        if encoder is not None:
+            encoder.stdin.close()
+            encoder.wait()
+        renderer.close()
+    if encoder.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed on {path} (exit code {encoder.returncode})")
+    return recorder.frames_written - recorder.first_frame, recorder.first_frame
+
+
+def concat_segments(paths, output):
+    list_path = os.path.join(os.path.dirname(paths[0]), "segments.txt")
+    with open(list_path, "w", encoding="utf-8") as handle:
+        for path in paths:
+            handle.write(f"file '{os.path.basename(path)}'\n")
+    command = [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y",
+        "-f",
+        "concat",
+        "-safe",
+        "0",
+        "-i",
+        list_path,
+        "-c",
+        "copy",
+        output,
+    ]
+    return subprocess.run(command).returncode
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the playthrough as a video, rendered headless in parallel.")
+    parser.add_argument("-i", "--input", default=faketerm.RAW_OUTPUT_PATH, help="Game passages JSON")
+    parser.add_argument("-b", "--bundle", default=faketerm.PLAYBACK_BUNDLE_PATH, help="Playback bundle (commentary, videos)")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help="Output video path")
+    parser.add_argument("-j", "--jobs", type=int, default=DEFAULT_JOBS, help="Worker processes")
+    parser.add_argument("--fps", type=int, default=EXPORT_FPS, help="Output frame rate")
+    parser.add_argument("--steps", type=int, default=0, help="Only export the first N steps (0 = all)")
+    args = parser.parse_args()
+
+    if shutil.which("ffmpeg") is None:
+        print("ffmpeg was not found on PATH.", file=sys.stderr)
+        return 1
+    timeline = build_timeline(args.input, args.bundle if os.path.exists(args.bundle) else None)
+    if args.steps:
+        timeline = timeline[: args.steps]
+    if not any(entry["text"] for entry in timeline):
+        print(f"No game passages found in {args.input}", file=sys.stderr)
+        return 1
+    renderer_options = dict(
+        font_path=faketerm.C64_FONT_PATH,
+        output_scale=faketerm.C64_OUTPUT_SCALE,
+        fit_to_display=faketerm.C64_FIT_TO_DISPLAY,
+        window_size=faketerm.C64_WINDOW_SIZE,
+        scale_filter=faketerm.C64_SCALE_FILTER,
+    )
+    jobs = max(1, args.jobs)
+    segments = split_segments(timeline, jobs * SEGMENTS_PER_JOB)
+    print(f"Exporting {len(timeline)} steps in {len(segments)} segments on {jobs} workers")
+
+    started = time.perf_counter()
+    output = os.path.abspath(args.output)
+    work_dir = tempfile.mkdtemp(prefix=".export-", dir=os.path.dirname(output))
+    try:
+        paths = [os.path.join(work_dir, f"segment-{index:03d}.mp4") for index in range(len(segments))]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [
+                pool.submit(render_segment, timeline, start, end, path, args.fps, renderer_options)
+                for (start, end), path in zip(segments, paths)
+            ]
+            frames = 0
+            for index, future in enumerate(futures):
+                count, first = future.result()
+                frames += count
+                start, end = segments[index]
+                print(f"Segment {index + 1}/{len(segments)}: steps {start}-{end - 1}, {count} frames from {first / args.fps:.1f}s")
+        if concat_segments(paths, output) != 0:
+            print("ffmpeg could not join the segments.", file=sys.stderr)
+            return 1
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    elapsed = time.perf_counter() - started
+    duration = frames / args.fps
+    print(f"Wrote {output}: {duration:.0f}s of video in {elapsed:.0f}s ({duration / max(elapsed, 1e-9):.1f}x real time)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,19 +1,31 @@
+import functools
 import hashlib
 import json
-import math
 import os
 import re
+import socket
 import sys
 import time
 import unicodedata
 import subprocess
 
+import numpy as np
 import ollama
-import pexpect
 
 import pygame
 
 from c64renderer import C64Renderer
+from checkpoints import CHECKPOINT_BACKENDS, CHECKPOINT_DIR, CheckpointStore
+from clock import make_clock
+from renderer_process import RendererClient
+from commentary_cache import CommentaryCache, commentary_cache_key
+from deadline import BackgroundStream, DeadlineExceeded, call_with_deadline
+from game_session import make_game_session
+from playback_bundle import load_playback_bundle
+from video_catalog import binary_catalog_paths, load_video_catalog
+from warmup import run_warm_up
+from model_residency import ModelResidency
+from viewer_channel import VideoRequestChannel
 from knowledge_base import plundered_hearts_wiki, plundered_hearts_fandom
 
 # os.environ["OLLAMA_NO_CUDA"] = "1"
@@ -23,31 +35,122 @@ AI_COMMENT_LABEL = "MISTRAL COMMENTE:"
 AI_VIDEO_LABEL = "MAGNETO, JOUE LA BANDE:"
 AI_COMMENT_FG = (255, 255, 255)
 AI_COMMENT_BG = (0, 0, 0)
+# Shown while sounds, glyph tints, the interview text and the video catalog load in the background.
+INTRO_SCREEN_TEXT = (
+    "\n    **** PLLMDERED_HEARTS ****\n\n"
+    " 64K RAM SYSTEM  38911 BASIC BYTES FREE\n\n"
+    "READY.\n"
+    'LOAD "PLUNDERED HEARTS",8,1\n\n'
+    "SEARCHING FOR PLUNDERED HEARTS\n"
+    "LOADING\n"
+)
 LLM_MODEL = 'ministral-3:14b' # 'ministral-3:8b' # 'qwen2.5:7b' # 'ministral-3:14b'
+LLM_OPTIONS = {}  # Extra ollama options (temperature, seed...); part of the commentary cache key.
 ENABLE_LLM = True
+ENABLE_LLM_STREAMING = True  # Type commentary as tokens arrive; False uses the blocking ollama.chat path.
+GAME_TURN_TIMEOUT_SEC = 4.0  # Max wait for the game prompt after a command.
+# "frotz" (subprocess, the reference) or "zmachine" (in-process interpreter, src/zmachine.py).
+GAME_BACKEND = "frotz"
+GAME_RANDOM_SEED = None  # Fixed seed for the game's random numbers (frotz -s); None = random.
+CHECKPOINT_INTERVAL = 20  # Save the game every N walkthrough steps (0 = off; zmachine backend only), see src/checkpoints.py.
+# Walkthrough step each loop starts at: restores the nearest checkpoint, then plays the rest without display.
+START_AT_STEP = 0
+# "real", an acceleration such as "x10" / "x100", or "instant" (sleeps skipped) for soak and regression
+# runs. Typing, frame pacing and video cooldowns follow it; LLM budgets and game reads stay in real seconds.
+CLOCK_MODE = "real"
+LLM_TURN_BUDGET_SEC = 60.0  # Max wait for a commentary (first streamed token, or the full blocking answer).
+LLM_STALL_TIMEOUT_SEC = 15.0  # Max gap between two streamed tokens.
+LLM_MAX_RETRIES = 2
+LLM_RETRY_BACKOFF_SEC = 1.0
+LLM_HTTP_TIMEOUT_SEC = 120.0  # Abandoned requests are closed by the HTTP client after this.
+EMBED_BUDGET_SEC = 10.0
+# Sent with every chat/embedding call; idle models are pinged before the server's timer runs out.
+LLM_KEEP_ALIVE = "15m"
+MODEL_KEEP_WARM_INTERVAL_SEC = 300.0
+ENABLE_COMMENTARY_CACHE = True
+COMMENTARY_CACHE_VARIANTS = 4  # Commentaries kept per prompt.
+COMMENTARY_CACHE_FRESH_CHANCE = 0.2  # Chance to ask the LLM again even when a cached line exists.
+COMMENTARY_CACHE_MAX_ENTRIES = 2000
+COMMENTARY_CACHE_MAX_AGE_DAYS = 30
+ENABLE_PLAYBACK_BUNDLE = False  # Replay precomputed commentary/video choices (see precompute_bundle.py).
+PLAYBACK_LIVE_FALLBACK = True  # Ask the LLM live for turns missing from the bundle (needs ENABLE_LLM).
 ENABLE_RAW_OUTPUT = False
 ENABLE_C64_RENDERER = True
 ENABLE_KEYCLICK_BEEP = True
 ENABLE_GODOT_VIEWER = True
 ENABLE_C64_FULLSCREEN = False
+C64_RENDERER_PROCESS = True  # Draw in a separate process at a steady 50 fps, whatever the LLM/game side is doing.
 C64_DISPLAY_INDEX = 1  # 1-based display number (1, 2, 3); None uses the primary monitor.
 C64_WINDOW_UNDECORATED = True
 C64_WINDOW_SIZE = (1440, 1080)
 C64_WINDOW_POSITION = (0, 0)
 C64_OUTPUT_SCALE = 2
 C64_FIT_TO_DISPLAY = True
+C64_HEADLESS = False  # Compose frames off-screen without opening a window (benchmarks, no display).
+C64_SCALE_FILTER = "smooth"  # "smooth" or "nearest" (crisp, cheapest) for the final upscale.
+C64_GPU_PRESENT = False  # Scale and present through pygame's SDL2 texture renderer (falls back to surfaces).
 
-C64_FONT_PATH = None  # Using built-in fallback font; no external sprite sheet required.
+C64_FONT_PATH = None  # Charset sprite sheet (16x16 glyphs of 8x8 or 8x10, in character-code order); None uses the built-in font.
 KEY_AUDIO_DIR = os.path.join(os.path.dirname(__file__), "..", "assets", "audio")
 GODOT_VIEWER_PATH = os.path.join(os.path.dirname(__file__), "..", "bin", "itw-viewer.exe")
 RAW_OUTPUT_PATH = os.path.join(os.path.dirname(__file__), "..", "assets", "game-raw-output.json")
 VIDEO_EMBEDDINGS_PATH = os.path.join(os.path.dirname(__file__), "..", "assets", "abriggs-itw-embeddings.json")
 VIDEO_EMBED_MODEL = "embeddinggemma:300m"
 LLM_OUT_DIR = os.path.join(os.path.dirname(__file__), "..", "llm_out")
+# Clip requests go to the Godot viewer over UDP and into an append-only journal it tails.
+VIEWER_UDP_ADDRESS = ("127.0.0.1", 47731)
+VIDEO_REQUEST_JOURNAL_PATH = os.path.join(LLM_OUT_DIR, "video-requests.log")
+VIDEO_REQUEST_JOURNAL_MAX_BYTES = 64 * 1024
+COMMENTARY_CACHE_PATH = os.path.join(os.path.dirname(__file__), "..", "cache", "commentary-cache.json")
+PLAYBACK_BUNDLE_PATH = os.path.join(os.path.dirname(__file__), "..", "assets", "playback-bundle.json")
+NEXT_MOVE_SEPARATOR = "\nYour next move will be : "
 
 if ENABLE_RAW_OUTPUT and ENABLE_LLM:
     raise ValueError("ENABLE_RAW_OUTPUT requires ENABLE_LLM to be False.")
 
+llm_client = ollama.Client(timeout=LLM_HTTP_TIMEOUT_SEC)
+model_residency = None
+
+
+def _abortable_llm_client():
+    """
+    A client of its own for one chat request, and abort() which shuts its
+    sockets down: a request given up at the deadline stops there instead of
+    keeping Ollama busy until LLM_HTTP_TIMEOUT_SEC.
+    """
+    streams = []
+    aborted = []
+
+    def shut_down(stream):
+        sock = stream.get_extra_info("socket")
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def trace(event, info):
+        if event == "connection.connect_tcp.complete":
+            streams.append(info["return_value"])
+            if aborted:
+                shut_down(info["return_value"])
+
+    def on_request(request):
+        request.extensions["trace"] = trace
+
+    def abort():
+        aborted.append(True)
+        for stream in list(streams):
+            shut_down(stream)
+
+    client = ollama.Client(timeout=LLM_HTTP_TIMEOUT_SEC, event_hooks={"request": [on_request]})
+    return client, abort
+
+
+def _observe_model(model, response, label):
+    if model_residency is not None:
+        model_residency.observe(model, response, label)
+
 def llm_response_is_valid(llm_commentary):
     if llm_commentary is None:
         return False
@@ -92,56 +195,11 @@ def sanitize_renderer_text(text):
     ascii_text = normalized.encode("ascii", "ignore").decode("ascii")
     return ascii_text.replace(placeholder, "'")
 
-# Match ANSI escape sequences like ESC[31m or ESC[2J
-ansi_escape = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
-# Match cursor position commands like [24d (often without ESC, incomplete sequences)
-cursor_directives = re.compile(r'\[\d{1,3}d')
-# Match charset switch like ESC(A or ESC(B
-charset_switch = re.compile(r'\x1b\([A-B]')
-# Match title/score bar lines that contain score and moves.
-status_bar_re = re.compile(r".*Score:\s*\d+.*Moves:\s*\d+", re.IGNORECASE)
-LAST_STATUS_BAR = ""
-
-# Escape sequences that usually correspond to "clear screen", "move cursor", etc.
-line_breaking_escapes = re.compile(r'\x1b\[[0-9;]*([HJfABCD])')
-
-def clean_output(text):
-    global LAST_STATUS_BAR
-    # Replace certain ANSI codes with newlines (those likely to imply line moves)
-    def replace_with_newline(match):
-        command = match.group(1)
-        if command in ['H', 'f', 'A', 'B', 'C', 'D']:
-            return '\n'
-        return ''
-
-    text = line_breaking_escapes.sub(replace_with_newline, text)
-    # Remove charset switch sequences
-    text = charset_switch.sub('', text)
-    # Remove cursor directives like [24d
-    text = cursor_directives.sub('', text)
-    # Remove remaining ANSI escape codes
-    text = ansi_escape.sub('', text)
-
-    # Remove status/title bar and lines containing only a number (like score or parser noise)
-    lines = text.strip().splitlines()
-    filtered = []
-    for line in lines:
-        stripped = line.strip()
-        if status_bar_re.search(stripped):
-            LAST_STATUS_BAR = stripped
-            if "Plundered Hearts" in LAST_STATUS_BAR:
-                LAST_STATUS_BAR = LAST_STATUS_BAR.replace("Plundered Hearts", "PLLMDERED_HEARTS")
-            continue
-        if stripped.isdigit():
-            continue
-        filtered.append(line)
-    # Remove repeated empty lines
-    clean_lines = []
-    for i, line in enumerate(filtered):
-        if line.strip() == '' and (i == 0 or filtered[i - 1].strip() == ''):
-            continue
-        clean_lines.append(line)
-    return '\n'.join(clean_lines).strip()
+def _status_bar_text(session):
+    status = session.status_bar if session else None
+    if not status:
+        return ""
+    return status["text"].replace("Plundered Hearts", "PLLMDERED_HEARTS")
 
 _KEY_SOUNDS = []
 _BUZZ_SOUNDS = []
@@ -231,11 +289,18 @@ def _start_godot_viewer():
 
 def _exit_immediately():
     try:
-        if child is not None:
-            child.terminate(force=True)
+        if commentary_cache is not None:
+            commentary_cache.flush()
+    except Exception:
+        pass
+    try:
+        if game_session is not None:
+            game_session.close()
     except Exception:
         pass
     try:
+        if renderer is not None:
+            renderer.close()
         pygame.quit()
     except Exception:
         pass
@@ -245,6 +310,11 @@ def _exit_immediately():
 def _handle_quit_shortcut():
     if not renderer or pygame is None:
         return
+    if isinstance(renderer, RendererClient):
+        # The renderer process owns the window and its events.
+        if renderer.quit_requested:
+            _exit_immediately()
+        return
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             _exit_immediately()
@@ -268,9 +338,25 @@ def _status_with_ai_thinking(text):
     return f"{new_prefix}{suffix}"
 
 
-def type_to_renderer(
+def _sleep_with_events(delay):
+    if delay <= 0:
+        return
+    end_time = clock.now() + delay
+    while clock.now() < end_time:
+        _handle_quit_shortcut()
+        remaining = end_time - clock.now()
+        if remaining <= 0:
+            break
+        clock.sleep(min(0.01, max(0.0, remaining)))
+
+
+def _split_typing_chunks(text, word_mode=False):
+    return re.findall(r"\n|\S+\s*|\s+", text) if word_mode else list(text)
+
+
+def _type_chunks(
     renderer,
-    text,
+    chunks,
     base_delay=0.015,
     min_delay=0.075,
     max_delay=0.20,
@@ -278,26 +364,12 @@ def type_to_renderer(
     word_mode=False,
     fg_color=None,
     bg_color=None,
+    prev=" ",
+    keep_cursor=False,
+    sleep=None,
 ):
-    """
-    Simulate typing to the renderer: emit characters one by one with a delay
-    proportional to ASCII distance from the previous character.
-    """
-    if not renderer or text is None:
-        return
-    def _sleep_with_events(delay):
-        if delay <= 0:
-            return
-        end_time = time.time() + delay
-        while time.time() < end_time:
-            _handle_quit_shortcut()
-            remaining = end_time - time.time()
-            if remaining <= 0:
-                break
-            time.sleep(min(0.01, max(0.0, remaining)))
-    prev = " "
-    chunks = re.findall(r"\n|\S+\s*|\s+", text) if word_mode else list(text)
     # Show cursor ahead of each chunk, and keep it after each chunk except the final one.
+    sleep = sleep or _sleep_with_events
     total_chunks = len([c for c in chunks if c])
     typed = 0
     for chunk in chunks:
@@ -308,7 +380,7 @@ def type_to_renderer(
             renderer.render_frame(show_cursor=True)
         renderer.write(chunk, fg_color=fg_color, bg_color=bg_color)
         typed += 1
-        renderer.render_frame(show_cursor=typed < total_chunks)
+        renderer.render_frame(show_cursor=keep_cursor or typed < total_chunks)
         # Use the last non-newline character of the chunk to keep delays consistent.
         ch = next((c for c in reversed(chunk) if c not in "\r\n"), " ")
         if not ch.strip():
@@ -322,8 +394,213 @@ def type_to_renderer(
             else:
                 _play_key_beep(ch)
         if chunk not in ["\n", ">"]:
-            _sleep_with_events(delay)
+            sleep(delay)
         prev = ch
+    return prev
+
+
+def _restore_status_bar(renderer, status_color, status_text):
+    if renderer and status_color:
+        renderer.set_status_bar_color(status_color)
+        if status_text:
+            renderer.set_status_bar(status_text)
+        renderer.render_frame()
+
+
+def type_to_renderer(
+    renderer,
+    text,
+    base_delay=0.015,
+    min_delay=0.075,
+    max_delay=0.20,
+    beep=True,
+    word_mode=False,
+    fg_color=None,
+    bg_color=None,
+    sleep=None,
+):
+    """
+    Simulate typing to the renderer: emit characters one by one with a delay
+    proportional to ASCII distance from the previous character.
+    sleep(delay) replaces the real-time wait (e.g. a virtual clock for video export).
+    """
+    if not renderer or text is None:
+        return
+    _type_chunks(
+        renderer,
+        _split_typing_chunks(text, word_mode),
+        base_delay=base_delay,
+        min_delay=min_delay,
+        max_delay=max_delay,
+        beep=beep,
+        word_mode=word_mode,
+        fg_color=fg_color,
+        bg_color=bg_color,
+        sleep=sleep,
+    )
+
+
+def type_labeled_line(renderer, label, text, sleep=None):
+    """Type an AI line ("> LABEL text") in the comment colors, followed by a plain newline."""
+    cleaned = sanitize_renderer_text(text or "").strip()
+    line = "\n> " + label + (" " + cleaned if cleaned else "")
+    type_to_renderer(
+        renderer,
+        line,
+        base_delay=1 / 60.0,
+        min_delay=1 / 240.0,
+        max_delay=1 / 30.0,
+        beep=False,
+        word_mode=True,
+        fg_color=AI_COMMENT_FG,
+        bg_color=AI_COMMENT_BG,
+        sleep=sleep,
+    )
+    type_newline(renderer, sleep=sleep)
+
+
+def type_newline(renderer, sleep=None):
+    type_to_renderer(
+        renderer,
+        "\n",
+        base_delay=1 / 60.0,
+        min_delay=1 / 240.0,
+        max_delay=1 / 30.0,
+        beep=False,
+        word_mode=True,
+        sleep=sleep,
+    )
+
+
+def _llm_messages(prompt):
+    return [{
+        'role': 'user',
+        'content': prompt
+        }]
+
+
+def stream_commentary_to_renderer(renderer, prompt, on_first_token=None, deadline=None):
+    """
+    Stream the LLM commentary and type it word by word while tokens arrive.
+    Returns (raw commentary, complete): commentary is None when nothing was
+    received so the caller can fall back to the blocking path, complete is
+    False when the deadline cut the comment short.
+    """
+    if deadline is None:
+        deadline = time.monotonic() + LLM_TURN_BUDGET_SEC
+    typing_args = dict(
+        base_delay=1 / 60.0,
+        min_delay=1 / 240.0,
+        max_delay=1 / 30.0,
+        beep=False,
+        word_mode=True,
+        fg_color=AI_COMMENT_FG,
+        bg_color=AI_COMMENT_BG,
+    )
+    raw_parts = []
+    pending = ""
+    started = False
+    prev = " "
+    complete = True
+    client, abort = _abortable_llm_client()
+    stream = BackgroundStream(
+        lambda: client.chat(
+            model=LLM_MODEL,
+            messages=_llm_messages(prompt),
+            options=LLM_OPTIONS or None,
+            stream=True,
+            keep_alive=LLM_KEEP_ALIVE,
+        ),
+        on_cancel=abort,
+    )
+    try:
+        for part in stream.items(deadline, LLM_STALL_TIMEOUT_SEC, poll=_handle_quit_shortcut):
+            if part.done:
+                # Only the final chunk carries the timings.
+                _observe_model(LLM_MODEL, part, "chat stream")
+            token = part.message.content or ""
+            if not token:
+                continue
+            raw_parts.append(token)
+            cleaned = sanitize_renderer_text(token)
+            if not started:
+                # Mirror the blocking path, which strips the comment before display.
+                cleaned = cleaned.lstrip()
+                if not cleaned:
+                    continue
+                started = True
+                if on_first_token:
+                    on_first_token()
+                if renderer:
+                    prev = _type_chunks(
+                        renderer,
+                        _split_typing_chunks("\n> " + AI_COMMENT_LABEL + " ", True),
+                        prev=prev,
+                        keep_cursor=True,
+                        **typing_args,
+                    )
+            pending += cleaned
+            chunks = _split_typing_chunks(pending, True)
+            # The last chunk may still grow (unfinished word or trailing spaces).
+            pending = chunks.pop() if chunks else ""
+            if renderer and chunks:
+                prev = _type_chunks(renderer, chunks, prev=prev, keep_cursor=True, **typing_args)
+    except DeadlineExceeded:
+        complete = False
+        print("LLM streaming timed out" + (", keeping the partial comment." if started else "."))
+    except Exception as exc:
+        complete = False
+        print(f"LLM streaming failed: {exc}")
+    finally:
+        client.close()
+    if not started:
+        return None, False
+    if renderer:
+        final_chunks = _split_typing_chunks(pending.rstrip(), True)
+        if final_chunks:
+            _type_chunks(renderer, final_chunks, prev=prev, **typing_args)
+        else:
+            renderer.render_frame()
+    return "".join(raw_parts), complete
+
+
+def request_commentary(prompt, deadline):
+    """Blocking chat call bounded by deadline and retried with backoff; None on failure."""
+    client, abort = _abortable_llm_client()
+    try:
+        ok, response = call_with_deadline(
+            lambda: client.chat(
+                model=LLM_MODEL,
+                messages=_llm_messages(prompt),
+                options=LLM_OPTIONS or None,
+                keep_alive=LLM_KEEP_ALIVE,
+            ),
+            deadline,
+            poll=_handle_quit_shortcut,
+            retries=LLM_MAX_RETRIES,
+            backoff=LLM_RETRY_BACKOFF_SEC,
+            label="LLM chat",
+            on_cancel=abort,
+        )
+    finally:
+        client.close()
+    if not ok:
+        return None
+    _observe_model(LLM_MODEL, response, "chat")
+    return response.message.content
+
+
+def fallback_commentary(commentary_cache, cache_key, bundle, step_index, cmd, passage_key):
+    """A line that is already available when live inference missed its deadline."""
+    if commentary_cache is not None and cache_key:
+        cached = commentary_cache.get(cache_key)
+        if cached:
+            return cached
+    if bundle is not None:
+        step = bundle.find(step_index, cmd, passage_key)
+        if step and step.get("commentary"):
+            return step["commentary"]
+    return None
 
 
 def _sha_text(text):
@@ -362,106 +639,52 @@ def update_raw_output(data, cleaned_text):
     return True
 
 
-def _vector_norm(vector):
-    return math.sqrt(sum(value * value for value in vector))
-
-
-def _cosine_similarity(a_vec, a_norm, b_vec, b_norm):
-    if a_norm <= 0.0 or b_norm <= 0.0:
-        return -1.0
-    if len(a_vec) != len(b_vec):
-        return -1.0
-    dot = 0.0
-    for i in range(len(a_vec)):
-        dot += a_vec[i] * b_vec[i]
-    return dot / (a_norm * b_norm)
-
-
 def load_video_embeddings(path):
-    if not os.path.exists(path):
-        return []
-    try:
-        with open(path, "r", encoding="utf-8") as handle:
-            data = json.load(handle)
-        if not isinstance(data, list):
-            return []
-    except Exception:
-        return []
+    # Prefer the memory-mapped binary catalog next to the JSON when it is up to date.
+    binary_path, meta_path = binary_catalog_paths(path)
+    if os.path.exists(binary_path) and os.path.exists(meta_path):
+        if not os.path.exists(path) or os.path.getmtime(meta_path) >= os.path.getmtime(path):
+            catalog = load_video_catalog(binary_path)
+            if len(catalog):
+                return catalog
+        else:
+            print(f"Binary catalog {binary_path} is older than {path}; using the JSON.")
+    return load_video_catalog(path)
 
-    entries = []
-    for item in data:
-        if not isinstance(item, dict):
-            continue
-        filename = item.get("filename")
-        embedding = item.get("embedding")
-        sequence_title = item.get("sequence_title")
-        duration_raw = item.get("duration_sec")
-        duration_sec = None
-        if duration_raw is not None:
-            try:
-                duration_sec = float(duration_raw)
-            except (TypeError, ValueError):
-                duration_sec = None
-        if not filename or not isinstance(embedding, list):
-            continue
-        vector = [float(value) for value in embedding]
-        norm = _vector_norm(vector)
-        if norm <= 0.0:
-            continue
-        entries.append(
-            {
-                "filename": filename,
-                "sequence_title": sequence_title,
-                "duration_sec": duration_sec,
-                "embedding": vector,
-                "norm": norm,
-            }
-        )
-    return entries
+
+def find_video_entry(catalog, filename):
+    if not filename or not catalog:
+        return None
+    return catalog.find(filename)
 
 
 def embed_commentary_text(text):
     text = (text or "").strip()
     if not text:
         return None, 0.0
-    try:
-        response = ollama.embeddings(model=VIDEO_EMBED_MODEL, prompt=text)
-    except Exception as exc:
-        print(f"Embedding failed: {exc}")
+    ok, response = call_with_deadline(
+        # /api/embed (normalized vectors, like the catalog) reports load_duration; /api/embeddings does not.
+        lambda: llm_client.embed(model=VIDEO_EMBED_MODEL, input=text, keep_alive=LLM_KEEP_ALIVE),
+        time.monotonic() + EMBED_BUDGET_SEC,
+        poll=_handle_quit_shortcut,
+        retries=1,
+        backoff=LLM_RETRY_BACKOFF_SEC,
+        label="Embedding",
+    )
+    if not ok:
         return None, 0.0
-    vector = response.get("embedding")
+    _observe_model(VIDEO_EMBED_MODEL, response, "embedding")
+    vector = response.embeddings[0] if response.embeddings else None
     if not isinstance(vector, list):
         return None, 0.0
-    vector = [float(value) for value in vector]
-    return vector, _vector_norm(vector)
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector, float(np.linalg.norm(vector))
 
 
 def select_best_video(comment_vector, comment_norm, catalog, recent, last_video):
-    if not catalog or comment_vector is None:
+    if not catalog or comment_vector is None or comment_norm <= 0.0:
         return None
-    scored = []
-    for item in catalog:
-        score = _cosine_similarity(comment_vector, comment_norm, item["embedding"], item["norm"])
-        scored.append((score, item))
-    scored.sort(reverse=True)
-
-    for _, item in scored:
-        var_filename = item["filename"]
-        if var_filename == last_video:
-            continue
-        if var_filename in recent:
-            continue
-        return item
-
-    if recent:
-        recent.clear()
-        for _, item in scored:
-            var_filename = item["filename"]
-            if var_filename == last_video:
-                continue
-            return item
-
-    return scored[0][1] if scored else None
+    return catalog.select(comment_vector, recent, last_video)
 
 
 def record_video_choice(filename, catalog_size, recent):
@@ -485,37 +708,13 @@ def _get_video_duration(entry):
 def maybe_emit_video_request(renderer, entry, recent, last_played, next_allowed, catalog_size):
     if not entry:
         return None, next_allowed, last_played
-    now = time.monotonic()
+    now = clock.now()
     if now < next_allowed:
         return entry, next_allowed, last_played
     next_video = entry["filename"]
     sequence_title = entry.get("sequence_title") or next_video
     if renderer and sequence_title:
-        cleaned_title = sanitize_renderer_text(sequence_title).strip()
-        if cleaned_title:
-            display_title = "\n> " + AI_VIDEO_LABEL + " " + cleaned_title
-        else:
-            display_title = "\n> " + AI_VIDEO_LABEL
-        type_to_renderer(
-            renderer,
-            display_title,
-            base_delay=1 / 60.0,
-            min_delay=1 / 240.0,
-            max_delay=1 / 30.0,
-            beep=False,
-            word_mode=True,
-            fg_color=AI_COMMENT_FG,
-            bg_color=AI_COMMENT_BG,
-        )
-        type_to_renderer(
-            renderer,
-            "\n",
-            base_delay=1 / 60.0,
-            min_delay=1 / 240.0,
-            max_delay=1 / 30.0,
-            beep=False,
-            word_mode=True,
-        )
+        type_labeled_line(renderer, AI_VIDEO_LABEL, sequence_title)
     write_llm_video_request(next_video)
     record_video_choice(next_video, catalog_size, recent)
     last_played = next_video
@@ -523,22 +722,23 @@ def maybe_emit_video_request(renderer, entry, recent, last_played, next_allowed,
     return None, next_allowed, last_played
 
 
+video_request_channel = None
+
+
 def write_llm_video_request(filename):
+    global video_request_channel
     if not filename:
         return
-    os.makedirs(LLM_OUT_DIR, exist_ok=True)
-    now = time.time()
-    stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(now))
-    millis = int((now - int(now)) * 1000)
-    out_name = f"{stamp}_{millis:03d}.txt"
-    out_path = os.path.join(LLM_OUT_DIR, out_name)
-    try:
-        with open(out_path, "w", encoding="utf-8") as handle:
-            handle.write(filename.strip() + "\n")
-    except Exception as exc:
-        print(f"Unable to write llm_out file: {exc}")
+    if video_request_channel is None:
+        video_request_channel = VideoRequestChannel(
+            VIDEO_REQUEST_JOURNAL_PATH,
+            udp_address=VIEWER_UDP_ADDRESS,
+            journal_max_bytes=VIDEO_REQUEST_JOURNAL_MAX_BYTES,
+        )
+    video_request_channel.send(filename)
 
 
+@functools.lru_cache(maxsize=None)
 def load_itw_redux():
     base_dir = os.path.dirname(__file__)
     src_path = os.path.join(base_dir, "..", "assets", "abriggs-itw-750-words.txt")
@@ -561,7 +761,7 @@ business software (such as Cornerstone), and her personal desire to write novels
 or technical detail, whatever seems relevant...
 Answer in TWO sentences, in neutral French, plain text, NO MARKDOWN, as a fleeting inner association.
 """
-    prompt += prev_output + "\nYour next move will be : " + cmd
+    prompt += prev_output + NEXT_MOVE_SEPARATOR + cmd
     return prompt
 
 
@@ -627,239 +827,360 @@ def enhance_game_command(cmd):
 
 # run frotz through a terminal emulator, using the ascii mode
 # child = pexpect.spawn("frotz -p roms/PLUNDERE.z3", encoding='utf-8', timeout=5)
-from pexpect.popen_spawn import PopenSpawn
+def _start_game_session():
+    session = make_game_session(
+        GAME_BACKEND,
+        seed=GAME_RANDOM_SEED,
+        turn_timeout=GAME_TURN_TIMEOUT_SEC,
+        poll=_handle_quit_shortcut,
+    )
+    return session, session.start()
+
+def fast_forward(session, start, stop, checkpoints=None):
+    """Play commands [start, stop) without display or commentary, saving due checkpoints; returns the step reached."""
+    step = start
+    while step < stop and session.alive and session.at_prompt:
+        if checkpoints is not None and checkpoints.wants(step, plundered_hearts_commands):
+            checkpoints.save(session, step, plundered_hearts_commands)
+        session.send(" " + enhance_game_command(plundered_hearts_commands[step]))
+        step += 1
+    return step
+
+
+def _restore_checkpoint(session, step, checkpoints):
+    found = checkpoints.nearest(step, plundered_hearts_commands) if checkpoints is not None else None
+    if found is None or not session.restore_game(checkpoints.path(found)):
+        return None
+    print(f"Restored the checkpoint of step {found}.")
+    return found
 
-def _start_game_process():
-    return PopenSpawn("frotz -p roms/PLUNDERE.z3", encoding='utf-8', timeout=5)
 
-child = None
+def _resume_game_session(session, restart_point, checkpoints):
+    """
+    The game at START_AT_STEP for a new walkthrough loop, as (session, raw
+    output, step, intro still to acknowledge). The running game goes back
+    through the in-memory restart point or a checkpoint; a new game is only
+    started when neither works.
+    """
+    step = max(0, min(START_AT_STEP, len(plundered_hearts_commands) - 1))
+    if session is not None and restart_point is not None:
+        session.restore(restart_point)
+        print(f"Restarting from the snapshot of step {step}.")
+        return session, session.text, step, False
+    if session is not None and session.alive:
+        found = _restore_checkpoint(session, step, checkpoints)
+        if found is not None:
+            reached = fast_forward(session, found, step, checkpoints)
+            if reached == step:
+                return session, session.text, step, False
+    if session is not None:
+        session.close()
+
+    session, raw_output = _start_game_session()
+    if step == 0:
+        return session, raw_output, 0, True
+    if session.at_intro:
+        session.send("")
+    found = _restore_checkpoint(session, step, checkpoints) or 0
+    reached = fast_forward(session, found, step, checkpoints)
+    print(f"Fast-forwarded from step {found} to step {reached}.")
+    return session, session.text, reached, False
+
+
+game_session = None
 
 renderer = None
-if ENABLE_C64_RENDERER:
-    try:
-        display_index = None
-        if C64_DISPLAY_INDEX:
-            try:
-                display_index = max(0, int(C64_DISPLAY_INDEX) - 1)
-            except (TypeError, ValueError):
-                display_index = None
-        renderer = C64Renderer(
-            font_path=C64_FONT_PATH,
-            fps=50,
-            fullscreen=ENABLE_C64_FULLSCREEN,
-            display_index=display_index,
-            window_size=C64_WINDOW_SIZE,
-            window_position=C64_WINDOW_POSITION,
-            borderless=C64_WINDOW_UNDECORATED,
-            output_scale=C64_OUTPUT_SCALE,
-            fit_to_display=C64_FIT_TO_DISPLAY,
-        )
-    except Exception as exc:
-        print(f"Unable to start C64 renderer: {exc}")
-        renderer = None
 
-_godot_viewer_process = _start_godot_viewer()
+commentary_cache = None
 
-raw_output_map = load_raw_output(RAW_OUTPUT_PATH) if ENABLE_RAW_OUTPUT else {}
-video_embeddings = load_video_embeddings(VIDEO_EMBEDDINGS_PATH) if ENABLE_LLM else []
-recent_videos = []
-last_video_played = None
-pending_video_entry = None
-next_allowed_video_time = 0.0
+clock = make_clock(CLOCK_MODE)
 
-restart_message = (
-    "Congratulations, you just finished pLLMdered_hearts.\n"
-    "The installation will now restart."
-)
 
-# Unified loop for reading, displaying, and responding.
-while True:  # for step, cmd in enumerate(plundered_hearts_commands):
-    child = _start_game_process()
-    prev_output = ""
-    prev_outputs = []
-    cmd_index = 0
-    prev_cmd = None
-    pending_intro_ack = True
-    last_cleaned = ""
-    LAST_STATUS_BAR = ""
-
-    while True:
-        _handle_quit_shortcut()
+def main():
+    global game_session, renderer, model_residency, commentary_cache
+    if ENABLE_C64_RENDERER:
+        try:
+            display_index = None
+            if C64_DISPLAY_INDEX:
+                try:
+                    display_index = max(0, int(C64_DISPLAY_INDEX) - 1)
+                except (TypeError, ValueError):
+                    display_index = None
+            renderer_class = RendererClient if C64_RENDERER_PROCESS else C64Renderer
+            renderer = renderer_class(
+                font_path=C64_FONT_PATH,
+                fps=50,
+                fullscreen=ENABLE_C64_FULLSCREEN,
+                display_index=display_index,
+                window_size=C64_WINDOW_SIZE,
+                window_position=C64_WINDOW_POSITION,
+                borderless=C64_WINDOW_UNDECORATED,
+                output_scale=C64_OUTPUT_SCALE,
+                fit_to_display=C64_FIT_TO_DISPLAY,
+                headless=C64_HEADLESS,
+                scale_filter=C64_SCALE_FILTER,
+                gpu_present=C64_GPU_PRESENT,
+                clock=clock,
+            )
+        except Exception as exc:
+            print(f"Unable to start C64 renderer: {exc}")
+            renderer = None
+    if renderer:
+        renderer.write(INTRO_SCREEN_TEXT)
+        renderer.render_frame()
+
+    _godot_viewer_process = _start_godot_viewer()
+
+    raw_output_map = load_raw_output(RAW_OUTPUT_PATH) if ENABLE_RAW_OUTPUT else {}
+    playback_bundle = load_playback_bundle(PLAYBACK_BUNDLE_PATH) if ENABLE_PLAYBACK_BUNDLE else None
+    if playback_bundle is not None:
+        print(f"Playback bundle: {len(playback_bundle)} steps from {PLAYBACK_BUNDLE_PATH}")
+    live_llm = ENABLE_LLM and (playback_bundle is None or PLAYBACK_LIVE_FALLBACK)
+    # Precomputed lines also serve as a fallback when live inference times out.
+    fallback_bundle = playback_bundle
+    if fallback_bundle is None and ENABLE_LLM:
+        fallback_bundle = load_playback_bundle(PLAYBACK_BUNDLE_PATH)
+    warm_up_tasks = []
+    if ENABLE_LLM:
+        model_residency = ModelResidency(
+            llm_client,
+            LLM_MODEL,
+            VIDEO_EMBED_MODEL,
+            keep_alive=LLM_KEEP_ALIVE,
+            ping_interval=MODEL_KEEP_WARM_INTERVAL_SEC,
+        )
+        warm_up_tasks.append(("models", model_residency.preload))
+    if ENABLE_KEYCLICK_BEEP:
+        warm_up_tasks.append(("sounds", _ensure_key_sounds_loaded))
+    if ENABLE_LLM:
+        warm_up_tasks.append(("interview", load_itw_redux))
+    if ENABLE_LLM or playback_bundle:
+        warm_up_tasks.append(("catalog", lambda: load_video_embeddings(VIDEO_EMBEDDINGS_PATH)))
+    warmed, _ = run_warm_up(warm_up_tasks, poll=_handle_quit_shortcut)
+    video_embeddings = warmed.get("catalog")
+    if video_embeddings is None:
+        video_embeddings = load_video_embeddings(VIDEO_EMBEDDINGS_PATH) if ENABLE_LLM or playback_bundle else []
+    if renderer:
+        renderer.clear()
+    commentary_cache = None
+    if ENABLE_LLM and ENABLE_COMMENTARY_CACHE:
+        commentary_cache = CommentaryCache(
+            COMMENTARY_CACHE_PATH,
+            max_variants=COMMENTARY_CACHE_VARIANTS,
+            fresh_chance=COMMENTARY_CACHE_FRESH_CHANCE,
+            max_entries=COMMENTARY_CACHE_MAX_ENTRIES,
+            max_age_sec=COMMENTARY_CACHE_MAX_AGE_DAYS * 24 * 3600,
+        )
+        print(f"Commentary cache: {len(commentary_cache)} prompts in {COMMENTARY_CACHE_PATH}")
+    recent_videos = []
+    last_video_played = None
+    pending_video_entry = None
+    next_allowed_video_time = 0.0
+
+    checkpoints = None
+    if (CHECKPOINT_INTERVAL or START_AT_STEP) and GAME_BACKEND in CHECKPOINT_BACKENDS:
+        checkpoints = CheckpointStore(CHECKPOINT_DIR, CHECKPOINT_INTERVAL)
+        print(f"Checkpoints: {len(checkpoints)} in {CHECKPOINT_DIR}")
+    elif CHECKPOINT_INTERVAL or START_AT_STEP:
+        print(f"Checkpoints are off with the {GAME_BACKEND} backend: each loop restarts it and replays to START_AT_STEP.")
+    # Snapshot of the game at START_AT_STEP, for restarts without a new game (backends with snapshots).
+    restart_point = None
+
+    restart_message = (
+        "Congratulations, you just finished pLLMdered_hearts.\n"
+        "The installation will now restart."
+    )
+
+    # Unified loop for reading, displaying, and responding.
+    while True:  # for step, cmd in enumerate(plundered_hearts_commands):
+        game_session, raw_output, cmd_index, pending_intro_ack = _resume_game_session(
+            game_session, restart_point, checkpoints
+        )
+        start_step = cmd_index
+        prev_output = ""
+        prev_outputs = []
+        prev_cmd = None
+        last_cleaned = ""
 
-        raw_output = ""
-        start_time = time.time()
-        timeout_seconds = 4
-        while time.time() - start_time < timeout_seconds:
-            try:
-                chunk = child.read_nonblocking(size=1024, timeout=0.3)
-                if not chunk:
-                    break
-                raw_output += chunk
-                if "***MORE***" in raw_output or  "[Press RETURN or ENTER to continue.]" in raw_output:
-                    raw_output = raw_output.replace("***MORE***", "")
-                    child.sendline("")
-                    continue
-                if ">" in raw_output:
-                    break
-            except pexpect.exceptions.TIMEOUT:
-                break
+        while True:
+            _handle_quit_shortcut()
+            if model_residency is not None:
+                model_residency.keep_warm()
+
+            if raw_output is None:
+                raw_output = game_session.read_until_prompt()
+
+            if raw_output:
+                cleaned = game_session.text
+                last_cleaned = cleaned
+                status_text = _status_bar_text(game_session)
+                if renderer and status_text:
+                    renderer.set_status_bar(status_text)
+                if renderer:
+                    if cleaned:
+                        type_to_renderer(
+                            renderer,
+                            cleaned + "\n",
+                            base_delay=1 / 60.0,
+                            min_delay=1 / 240.0,
+                            max_delay=1 / 30.0,
+                            beep=True,
+                            word_mode=True,
+                        )
+                    else:
+                        renderer.render_frame()
+                print(cleaned)
+                if cleaned:
+                    prev_outputs.append(cleaned)
+                    if len(prev_outputs) > 3:
+                        prev_outputs = prev_outputs[-3:]
+                    prev_output = "\n".join(prev_outputs)
+
+            if pending_intro_ack and (game_session.at_intro or not raw_output):
+                pending_intro_ack = False
+                raw_output = game_session.send("")
+                continue
 
-        if not raw_output and pending_intro_ack:
-            try:
-                child.expect("Press RETURN or ENTER to begin", timeout=1)
-                raw_output = (child.before or "") + (child.after or "")
-            except pexpect.exceptions.TIMEOUT:
-                pass
+            if not game_session.alive:
+                print("The game process exited, restarting.")
+                break
 
-        if raw_output:
-            cleaned = clean_output(raw_output)
-            last_cleaned = cleaned
-            if renderer and LAST_STATUS_BAR:
-                renderer.set_status_bar(LAST_STATUS_BAR)
-            if renderer:
-                if cleaned:
-                    type_to_renderer(
+            # Only proceed if the game shows a prompt and we still have commands to send.
+            if game_session.at_prompt and cmd_index < len(plundered_hearts_commands):
+                if restart_point is None and game_session.supports_snapshots and cmd_index == start_step:
+                    restart_point = game_session.snapshot()
+                if checkpoints is not None and checkpoints.wants(cmd_index, plundered_hearts_commands):
+                    checkpoints.save(game_session, cmd_index, plundered_hearts_commands)
+                cmd = enhance_game_command(plundered_hearts_commands[cmd_index]) # Sanitize game command (remove the game's shortcuts)
+
+                if ENABLE_RAW_OUTPUT and prev_output:
+                    if update_raw_output(raw_output_map, prev_output + NEXT_MOVE_SEPARATOR + cmd):
+                        write_raw_output(RAW_OUTPUT_PATH, raw_output_map)
+                    prev_output = ""
+
+                passage_key = _sha_text(last_cleaned.strip() + NEXT_MOVE_SEPARATOR + cmd)
+                playback_step = None
+                if playback_bundle is not None:
+                    playback_step = playback_bundle.find(cmd_index, cmd, passage_key)
+
+                if playback_step or live_llm:
+                    llm_commentary = None
+                    status_color = None
+                    status_text = None
+                    cache_key = None
+                    if playback_step:
+                        llm_commentary = playback_step.get("commentary") or ""
+                    elif commentary_cache is not None:
+                        prompt = build_prompt(prev_output, cmd)
+                        cache_key = commentary_cache_key(LLM_MODEL, prompt, LLM_OPTIONS)
+                        if not commentary_cache.wants_fresh(cache_key):
+                            llm_commentary = commentary_cache.get(cache_key)
+                    else:
+                        prompt = build_prompt(prev_output, cmd)
+                    from_cache = llm_commentary is not None
+                    if renderer and not from_cache:
+                        status_color = getattr(renderer, "status_bar_bg", None)
+                        status_text = _status_bar_text(game_session)
+                        if status_text:
+                            renderer.set_status_bar(_status_with_ai_thinking(status_text))
+                        renderer.set_status_bar_color((0, 0, 0))
+                        renderer.render_frame()
+                    streamed = False
+                    generated = False
+                    if not from_cache:
+                        deadline = time.monotonic() + LLM_TURN_BUDGET_SEC
+                        complete = True
+                        if ENABLE_LLM_STREAMING:
+                            llm_commentary, complete = stream_commentary_to_renderer(
+                                renderer,
+                                prompt,
+                                on_first_token=lambda: _restore_status_bar(renderer, status_color, status_text),
+                                deadline=deadline,
+                            )
+                            streamed = llm_commentary is not None
+                        if llm_commentary is None and deadline - time.monotonic() > 0:
+                            llm_commentary = request_commentary(prompt, deadline)
+                            complete = True
+                        # A comment cut short by the deadline is shown but never cached.
+                        generated = llm_commentary is not None and complete
+                        if llm_commentary is None:
+                            llm_commentary = fallback_commentary(
+                                commentary_cache, cache_key, fallback_bundle, cmd_index, cmd, passage_key
+                            )
+                            print("Using a fallback commentary." if llm_commentary else "Skipping commentary.")
+                    _restore_status_bar(renderer, status_color, status_text)
+                    if cache_key and generated:
+                        commentary_cache.add(cache_key, llm_commentary)
+                    next_video_entry = None
+                    if playback_step:
+                        next_video_entry = find_video_entry(video_embeddings, playback_step.get("video"))
+                    elif llm_commentary and video_embeddings:
+                        comment_vector, comment_norm = embed_commentary_text(llm_commentary)
+                        next_video_entry = select_best_video(
+                            comment_vector,
+                            comment_norm,
+                            video_embeddings,
+                            recent_videos,
+                            last_video_played,
+                        )
+                    if llm_commentary is not None:
+                        ai_thinking = llm_commentary + "\n"
+                        print("<AI thinks : '" + ai_thinking + "'>\n")
+                    if renderer and llm_commentary and not streamed:
+                        type_labeled_line(renderer, AI_COMMENT_LABEL, llm_commentary)
+                    elif renderer and llm_commentary:
+                        type_newline(renderer)
+                    if next_video_entry:
+                        pending_video_entry = next_video_entry
+                    pending_video_entry, next_allowed_video_time, last_video_played = maybe_emit_video_request(
                         renderer,
-                        cleaned + "\n",
-                        base_delay=1 / 60.0,
-                        min_delay=1 / 240.0,
-                        max_delay=1 / 30.0,
-                        beep=True,
-                        word_mode=True,
-                    )
-                else:
-                    renderer.render_frame()
-            print(cleaned)
-            if cleaned:
-                prev_outputs.append(cleaned)
-                if len(prev_outputs) > 3:
-                    prev_outputs = prev_outputs[-3:]
-                prev_output = "\n".join(prev_outputs)
-
-        if pending_intro_ack and ("Press RETURN or ENTER to begin" in raw_output or not raw_output):
-            child.sendline("")
-            pending_intro_ack = False
-            continue
-
-        # Only proceed if the game shows a prompt and we still have commands to send.
-        if ">" in raw_output and cmd_index < len(plundered_hearts_commands):
-            cmd = enhance_game_command(plundered_hearts_commands[cmd_index]) # Sanitize game command (remove the game's shortcuts)
-
-            if ENABLE_RAW_OUTPUT and prev_output:
-                if update_raw_output(raw_output_map, prev_output + "\nYour next move will be : " + cmd):
-                    write_raw_output(RAW_OUTPUT_PATH, raw_output_map)
-                prev_output = ""
-
-            if ENABLE_LLM:
-                prompt = build_prompt(prev_output, cmd)
-                llm_commentary = None
-                retry = 0
-                status_color = None
-                status_text = None
-                if renderer:
-                    status_color = getattr(renderer, "status_bar_bg", None)
-                    status_text = LAST_STATUS_BAR
-                    if status_text:
-                        renderer.set_status_bar(_status_with_ai_thinking(status_text))
-                    renderer.set_status_bar_color((0, 0, 0))
-                    renderer.render_frame()
-                while llm_commentary is None:
-                    response = ollama.chat(
-                        model=LLM_MODEL,
-                        messages=[{
-                            'role': 'user',
-                            'content': prompt
-                            }]
-                    )
-                    llm_commentary = response.message.content
-                    if retry > 0:
-                        print("Retry #" + str(retry))
-                    retry = retry + 1
-                if renderer and status_color:
-                    renderer.set_status_bar_color(status_color)
-                    if status_text:
-                        renderer.set_status_bar(status_text)
-                    renderer.render_frame()
-                next_video_entry = None
-                if llm_commentary and video_embeddings:
-                    comment_vector, comment_norm = embed_commentary_text(llm_commentary)
-                    next_video_entry = select_best_video(
-                        comment_vector,
-                        comment_norm,
-                        video_embeddings,
+                        pending_video_entry,
                         recent_videos,
                         last_video_played,
+                        next_allowed_video_time,
+                        len(video_embeddings),
                     )
-                ai_thinking = llm_commentary + "\n"
-                print("<AI thinks : '" + ai_thinking + "'>\n")
-                if renderer and llm_commentary:
-                    cleaned_comment = sanitize_renderer_text(llm_commentary).strip()
-                    if cleaned_comment:
-                        display_comment = "\n> " + AI_COMMENT_LABEL + " " + cleaned_comment
-                    else:
-                        display_comment = "\n> " + AI_COMMENT_LABEL
-                    type_to_renderer(
-                        renderer,
-                        display_comment,
-                        base_delay=1 / 60.0,
-                        min_delay=1 / 240.0,
-                        max_delay=1 / 30.0,
-                        beep=False,
-                        word_mode=True,
-                        fg_color=AI_COMMENT_FG,
-                        bg_color=AI_COMMENT_BG,
-                    )
-                    type_to_renderer(
-                        renderer,
-                        "\n",
-                        base_delay=1 / 60.0,
-                        min_delay=1 / 240.0,
-                        max_delay=1 / 30.0,
-                        beep=False,
-                        word_mode=True,
-                    )
-                if next_video_entry:
-                    pending_video_entry = next_video_entry
-                pending_video_entry, next_allowed_video_time, last_video_played = maybe_emit_video_request(
-                    renderer,
-                    pending_video_entry,
-                    recent_videos,
-                    last_video_played,
-                    next_allowed_video_time,
-                    len(video_embeddings),
-                )
-            display_cmd = ">> " + cmd.strip()
-            print(display_cmd + "\n")
-            if renderer:
-                type_to_renderer(renderer, "\n" + display_cmd + "\n", beep=True)
-            child.sendline(" " + cmd)
-            prev_cmd = cmd
-            cmd_index += 1
-
-        pending_video_entry, next_allowed_video_time, last_video_played = maybe_emit_video_request(
-            renderer,
-            pending_video_entry,
-            recent_videos,
-            last_video_played,
-            next_allowed_video_time,
-            len(video_embeddings),
-        )
-
-        if cmd_index >= len(plundered_hearts_commands):
-            break
+                display_cmd = ">> " + cmd.strip()
+                print(display_cmd + "\n")
+                if renderer:
+                    type_to_renderer(renderer, "\n" + display_cmd + "\n", beep=True)
+                raw_output = game_session.send(" " + cmd)
+                prev_cmd = cmd
+                cmd_index += 1
+            else:
+                raw_output = None
+
+            pending_video_entry, next_allowed_video_time, last_video_played = maybe_emit_video_request(
+                renderer,
+                pending_video_entry,
+                recent_videos,
+                last_video_played,
+                next_allowed_video_time,
+                len(video_embeddings),
+            )
+
+            if cmd_index >= len(plundered_hearts_commands):
+                break
 
-    print(restart_message)
-    if renderer:
-        type_to_renderer(
-            renderer,
-            "\n" + restart_message + "\n",
-            base_delay=1 / 60.0,
-            min_delay=1 / 240.0,
-            max_delay=1 / 30.0,
-            beep=True,
-            word_mode=True,
-        )
-    try:
-        child.terminate(force=True)
-    except Exception:
-        pass
+        print(restart_message)
+        if renderer:
+            type_to_renderer(
+                renderer,
+                "\n" + restart_message + "\n",
+                base_delay=1 / 60.0,
+                min_delay=1 / 240.0,
+                max_delay=1 / 30.0,
+                beep=True,
+                word_mode=True,
+            )
+        print(game_session.stats_summary())
+        if commentary_cache is not None:
+            print(commentary_cache.stats_summary())
+            commentary_cache.flush()
+        if model_residency is not None:
+            print(model_residency.summary())
+            model_residency.keep_warm()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import os
+import time
+
+import pexpect
+from pexpect.popen_spawn import PopenSpawn
+
+from terminal_parser import TerminalParser, passage_text
+
+GAME_COMMAND = "frotz -p roms/PLUNDERE.z3"
+PROMPT_MARKER = ">"
+INTRO_MARKER = "Press RETURN or ENTER to begin"
+# Asked by the SAVE and RESTORE commands: dumb frotz's "Please enter a filename [story.qzl]: ", curses frotz's
+# "Enter a file name." then 'Default is "story.qzl": '. The game answers "Failed." when a restore did not work.
+FILENAME_PROMPTS = ("Please enter a filename", 'Default is "')
+RESTORE_FAILED_MARKER = "Failed."
+GAME_BACKENDS = ("frotz", "zmachine")
+
+
+class GameSession:
+    """
+    One frotz process driven turn by turn.
+    Output goes through a TerminalParser as it arrives: paging prompts are
+    answered on the fly, reading stops as soon as the input prompt shows up,
+    and the clean text and latest status bar of each read are kept in
+    text / lines / status_bar. save_game()/restore_game() go through the
+    game's own SAVE and RESTORE commands and Quetzal files.
+    """
+
+    supports_snapshots = False
+
+    def __init__(
+        self,
+        command=GAME_COMMAND,
+        turn_timeout=4.0,
+        settle_time=0.3,
+        poll=None,
+        poll_interval=0.005,
+        seed=None,
+    ):
+        if command and seed is not None:
+            # frotz -s: fixed seed for the game's random numbers.
+            program, _, arguments = command.partition(" ")
+            command = f"{program} -s {seed} {arguments}"
+        self.command = command
+        self.turn_timeout = turn_timeout
+        self.settle_time = settle_time
+        self.poll = poll
+        self.poll_interval = poll_interval
+        self.process = None
+        self.at_prompt = False
+        self.at_intro = False
+        self.alive = False
+        self.lines = []
+        self.text = ""
+        self.status_bar = None
+        self.last_turn = {}
+        self.turns = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+
+    def start(self):
+        """Spawn the game and return its output up to the intro screen or the first prompt."""
+        self.process = PopenSpawn(self.command, encoding="utf-8", timeout=5)
+        self.alive = True
+        return self.read_until_prompt()
+
+    def send(self, cmd, timeout=None, expect=None):
+        """Send one line and return the game output up to the next prompt."""
+        self.sendline(cmd)
+        return self.read_until_prompt(timeout, expect)
+
+    def sendline(self, line=""):
+        self.at_prompt = False
+        self.at_intro = False
+        self.process.sendline(line)
+
+    def read_until_prompt(self, timeout=None, expect=None):
+        """
+        Read until the prompt (or the intro screen) is printed, answering
+        MORE/RETURN paging along the way. Gives up after timeout seconds, or
+        settle_time after the last chunk if a prompt marker was seen somewhere
+        other than at the end. expect, a tuple of markers, also ends the read
+        as soon as the unfinished line contains one (a prompt that is not ">").
+        The waits are in real seconds whatever CLOCK_MODE says: the game
+        process answers in its own time.
+        Returns the raw output; the clean text is in self.text.
+        """
+        timeout = self.turn_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        output = ""
+        parser = TerminalParser()
+        lines = []
+        pages = 0
+        first_byte = None
+        last_chunk = started
+        marker_seen = False
+        self.at_prompt = False
+        self.at_intro = False
+        timed_out = False
+
+        while self.alive:
+            try:
+                # PopenSpawn drains its reader queue without blocking; the timeout only has to be > 0.
+                chunk = self.process.read_nonblocking(size=4096, timeout=self.poll_interval)
+            except pexpect.exceptions.EOF:
+                self.alive = False
+                break
+            except pexpect.exceptions.TIMEOUT:
+                chunk = ""
+            now = time.monotonic()
+            if chunk:
+                if first_byte is None:
+                    first_byte = now - started
+                last_chunk = now
+                output += chunk
+                new_lines = len(lines)
+                for kind, value in parser.feed(chunk):
+                    if kind == "line":
+                        lines.append(value)
+                    elif kind == "status":
+                        self.status_bar = value
+                    else:
+                        pages += 1
+                        self.process.sendline("")
+                if INTRO_MARKER in parser.line or any(INTRO_MARKER in line for line in lines[new_lines:]):
+                    self.at_intro = True
+                    break
+                if expect and any(marker in parser.line for marker in expect):
+                    self.at_prompt = True
+                    break
+                if PROMPT_MARKER in chunk:
+                    marker_seen = True
+                # Whitespace-only chunks cannot end on the prompt, so the last chunk is enough.
+                if chunk.rstrip().endswith(PROMPT_MARKER):
+                    self.at_prompt = True
+                    break
+                continue
+            if marker_seen and now - last_chunk >= self.settle_time:
+                self.at_prompt = True
+                break
+            if now >= deadline:
+                timed_out = True
+                break
+            if self.poll:
+                self.poll()
+            time.sleep(self.poll_interval)
+
+        for kind, value in parser.flush():
+            if kind == "line":
+                lines.append(value)
+            elif kind == "status":
+                self.status_bar = value
+        self.lines = lines
+        self.text = passage_text(lines)
+
+        waited = time.monotonic() - started
+        self.last_turn = {
+            "wait": waited,
+            "first_byte": first_byte,
+            "pages": pages,
+            "chars": len(output),
+            "timed_out": timed_out,
+        }
+        self.turns += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        if timed_out:
+            self.timeouts += 1
+        return output
+
+    def save_game(self, path):
+        """Save the game to a Quetzal file with its SAVE command; True if the file was written."""
+        if os.path.exists(path):
+            # frotz would ask whether to overwrite it.
+            os.remove(path)
+        return self._answer_file_prompt("save", path) and os.path.exists(path)
+
+    def restore_game(self, path):
+        """Go back to a save_game() file with the RESTORE command; True if the game took it."""
+        if not os.path.exists(path) or not self._answer_file_prompt("restore", path):
+            return False
+        return RESTORE_FAILED_MARKER not in self.text
+
+    def _answer_file_prompt(self, cmd, path):
+        self.send(cmd, expect=FILENAME_PROMPTS)
+        if not any(marker in self.text for marker in FILENAME_PROMPTS):
+            # Whatever the game asked instead, a blank answer keeps the next command from being taken for it.
+            self.send("")
+            return False
+        # frotz refuses file names over 80 characters: relative paths stay short.
+        self.send(os.path.relpath(path))
+        return self.at_prompt
+
+    def stats_summary(self):
+        if not self.turns:
+            return "Game session: no turns read."
+        return (
+            f"Game session: {self.turns} reads, mean wait {self.total_wait / self.turns * 1000.0:.0f} ms, "
+            f"max {self.max_wait * 1000.0:.0f} ms, {self.timeouts} timeouts"
+        )
+
+    def close(self):
+        self.alive = False
+        if self.process is None:
+            return
+        # PopenSpawn has no terminate(); go through the underlying Popen.
+        try:
+            self.process.proc.kill()
+            self.process.proc.wait(timeout=2)
+        except Exception:
+            pass
+
+
+def make_game_session(backend="frotz", **options):
+    """
+    A game backend: GameSession (frotz subprocess, the reference) or
+    ZMachineSession (in-process interpreter). Both take turn_timeout and
+    poll, and expose start/send/read_until_prompt, text/status_bar and
+    the turn stats; backends with supports_snapshots also have snapshot()/restore().
+    """
+    if backend == "frotz":
+        return GameSession(**options)
+    if backend == "zmachine":
+        from zmachine_session import ZMachineSession
+
+        return ZMachineSession(**options)
+    raise ValueError(f"Unknown game backend: {backend!r} (expected one of {', '.join(GAME_BACKENDS)})")
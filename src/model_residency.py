@@ -0,0 +1,100 @@
+import time
+
+from deadline import BackgroundCall
+
+DEFAULT_KEEP_ALIVE = "15m"
+# Ping a model idle for this long so the server's keep_alive timer never runs out.
+DEFAULT_PING_INTERVAL_SEC = 300.0
+# load_duration above this means the server had to (re)load the model.
+COLD_LOAD_THRESHOLD_SEC = 1.0
+
+
+def _seconds(nanoseconds):
+    return (nanoseconds or 0) / 1e9
+
+
+class ModelResidency:
+    """
+    Keeps the chat and embedding models resident on the Ollama server:
+    preloads both with an explicit keep_alive, pings whichever sat idle for
+    ping_interval (from a background thread, so the loop never waits on it),
+    and logs every cold load seen in a response's load_duration.
+    """
+
+    def __init__(
+        self,
+        client,
+        chat_model,
+        embed_model,
+        keep_alive=DEFAULT_KEEP_ALIVE,
+        ping_interval=DEFAULT_PING_INTERVAL_SEC,
+        cold_threshold=COLD_LOAD_THRESHOLD_SEC,
+    ):
+        self.client = client
+        self.chat_model = chat_model
+        self.embed_model = embed_model
+        self.keep_alive = keep_alive
+        self.ping_interval = ping_interval
+        self.cold_threshold = cold_threshold
+        self.last_used = {chat_model: None, embed_model: None}
+        self.cold_loads = []
+        self.pings = 0
+        self._pending = {}
+
+    def _load(self, model, label):
+        # Counts as use right away, so keep_warm() does not ping a model that is loading.
+        self.last_used[model] = time.monotonic()
+        # An empty generate / a one-word embed loads the model without real work.
+        if model == self.embed_model:
+            response = self.client.embed(model=model, input="ping", keep_alive=self.keep_alive)
+        else:
+            response = self.client.generate(model=model, prompt="", keep_alive=self.keep_alive)
+        self.observe(model, response, label)
+        return response
+
+    def preload(self):
+        """Load both models (blocking); returns {model: load seconds}."""
+        loads = {}
+        for model in self.last_used:
+            started = time.perf_counter()
+            self._load(model, "preload")
+            loads[model] = time.perf_counter() - started
+        self._check_resident()
+        return loads
+
+    def _check_resident(self):
+        try:
+            loaded = {entry.model for entry in self.client.ps().models}
+        except Exception as exc:
+            print(f"Model residency: unable to list loaded models: {exc}")
+            return
+        missing = [model for model in self.last_used if model not in loaded and f"{model}:latest" not in loaded]
+        if missing:
+            print(
+                f"Model residency: {', '.join(missing)} not resident after preload; "
+                "the server may unload one model for the other (see OLLAMA_MAX_LOADED_MODELS)."
+            )
+
+    def observe(self, model, response, label="call"):
+        """Record a finished call; responses that carry load_duration reveal cold loads."""
+        self.last_used[model] = time.monotonic()
+        load = _seconds(getattr(response, "load_duration", None))
+        if load >= self.cold_threshold:
+            self.cold_loads.append((model, label, load))
+            print(f"Model residency: cold load of {model} ({label}) took {load:.1f}s")
+
+    def keep_warm(self):
+        """Ping models idle for ping_interval; returns at once, the pings run in the background."""
+        now = time.monotonic()
+        for model, last_used in self.last_used.items():
+            if last_used is not None and now - last_used < self.ping_interval:
+                continue
+            pending = self._pending.get(model)
+            if pending is not None and not pending.done:
+                continue
+            self.pings += 1
+            self._pending[model] = BackgroundCall(lambda model=model: self._load(model, "keep-warm ping"))
+
+    def summary(self):
+        total = sum(load for _, _, load in self.cold_loads)
+        return f"Model residency: {len(self.cold_loads)} cold loads ({total:.1f}s), {self.pings} keep-warm pings"
@@ -0,0 +1,84 @@
+import base64
+import json
+import os
+import tempfile
+from array import array
+
+BUNDLE_FORMAT = "pllmdered-playback"
+BUNDLE_VERSION = 1
+
+
+def encode_vector(vector):
+    """Pack an embedding as base64 little-endian float32."""
+    if vector is None:
+        return None
+    packed = array("f", vector)
+    if packed.itemsize != 4:
+        raise ValueError("float32 array support is required")
+    return base64.b64encode(packed.tobytes()).decode("ascii")
+
+
+def decode_vector(encoded):
+    if not encoded:
+        return None
+    packed = array("f")
+    packed.frombytes(base64.b64decode(encoded))
+    return packed.tolist()
+
+
+def write_playback_bundle(path, steps, metadata=None):
+    payload = {"format": BUNDLE_FORMAT, "version": BUNDLE_VERSION}
+    payload.update(metadata or {})
+    payload["steps"] = steps
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".bundle-", suffix=".tmp", dir=directory)
+    with os.fdopen(fd, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle, ensure_ascii=True, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+class PlaybackBundle:
+    """Precomputed commentary and video choices, looked up per walkthrough step."""
+
+    def __init__(self, steps, metadata=None):
+        self.metadata = metadata or {}
+        self.steps = steps
+        self.by_key = {}
+        self.by_index = {}
+        for step in steps:
+            if step.get("key"):
+                self.by_key.setdefault(step["key"], step)
+            if step.get("step") is not None:
+                self.by_index[step["step"]] = step
+
+    def __len__(self):
+        return len(self.steps)
+
+    def find(self, step_index, cmd, passage_key=None):
+        """Match on the passage hash first, then on the step index if its command agrees."""
+        if passage_key and passage_key in self.by_key:
+            return self.by_key[passage_key]
+        step = self.by_index.get(step_index)
+        if step and step.get("cmd") == cmd:
+            return step
+        return None
+
+
+def load_playback_bundle(path):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except Exception as exc:
+        print(f"Unable to read playback bundle {path}: {exc}")
+        return None
+    if not isinstance(data, dict) or data.get("format") != BUNDLE_FORMAT:
+        print(f"Not a playback bundle: {path}")
+        return None
+    if data.get("version") != BUNDLE_VERSION:
+        print(f"Unsupported playback bundle version {data.get('version')}: {path}")
+        return None
+    steps = [step for step in data.pop("steps", []) if isinstance(step, dict)]
+    return PlaybackBundle(steps, data)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Precompute commentary, embeddings and video choices for the whole walkthrough."""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import ollama
+
+import faketerm
+from commentary_cache import CommentaryCache, commentary_cache_key
+from playback_bundle import encode_vector, write_playback_bundle
+
+DEFAULT_JOBS = 2
+
+
+def load_walkthrough_passages(raw_output_path, commands):
+    """
+    Pair each walkthrough step with its recorded game passage.
+    Passages are deduplicated by hash, so repeated outputs (e.g. WAIT) leave
+    later steps without a passage; faketerm then matches them by hash instead.
+    """
+    raw_map = faketerm.load_raw_output(raw_output_path)
+    passages = []
+    for key, text in raw_map.items():
+        prev_output, sep, cmd = text.rpartition(faketerm.NEXT_MOVE_SEPARATOR)
+        if not sep:
+            continue
+        passages.append({"key": key, "prev_output": prev_output, "cmd": cmd.strip()})
+
+    steps = []
+    cursor = 0
+    for step_index, raw_cmd in enumerate(commands):
+        cmd = faketerm.enhance_game_command(raw_cmd)
+        passage = None
+        if cursor < len(passages) and passages[cursor]["cmd"] == cmd:
+            passage = passages[cursor]
+            cursor += 1
+        steps.append({"step": step_index, "cmd": cmd, "passage": passage})
+    return steps
+
+
+def generate_commentary(prompt, model, options):
+    response = ollama.chat(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        options=options or None,
+    )
+    return (response.message.content or "").strip()
+
+
+def process_step(step, model, options, cached_commentary):
+    passage = step["passage"]
+    started = time.perf_counter()
+    commentary = cached_commentary
+    if commentary is None:
+        prompt = faketerm.build_prompt(passage["prev_output"], step["cmd"])
+        commentary = generate_commentary(prompt, model, options)
+    vector, norm = faketerm.embed_commentary_text(commentary)
+    return commentary, vector, norm, time.perf_counter() - started
+
+
+def build_bundle(steps, catalog, model, options, jobs, cache=None):
+    todo = [step for step in steps if step["passage"]]
+    cached = {}
+    if cache is not None:
+        for step in todo:
+            prompt = faketerm.build_prompt(step["passage"]["prev_output"], step["cmd"])
+            step["cache_key"] = commentary_cache_key(model, prompt, options)
+            cached[step["step"]] = cache.get(step["cache_key"])
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = {
+            step["step"]: pool.submit(process_step, step, model, options, cached.get(step["step"]))
+            for step in todo
+        }
+        for idx, step in enumerate(todo, start=1):
+            try:
+                results[step["step"]] = futures[step["step"]].result()
+            except Exception as exc:
+                print(f"Step {step['step']} ({step['cmd']}) failed: {exc}", file=sys.stderr)
+                continue
+            elapsed = results[step["step"]][3]
+            print(f"Commented {idx}/{len(todo)}: step {step['step']} {step['cmd']} ({elapsed:.1f}s)")
+
+    # Video choices depend on the recent-clip history, so replay them in walkthrough order.
+    recent = []
+    last_video = None
+    bundle_steps = []
+    for step in steps:
+        entry = {"step": step["step"], "cmd": step["cmd"]}
+        result = results.get(step["step"])
+        if step["passage"] and result:
+            commentary, vector, norm, _ = result
+            entry["key"] = step["passage"]["key"]
+            entry["commentary"] = commentary
+            entry["embedding"] = encode_vector(vector)
+            video = None
+            if vector is not None:
+                video = faketerm.select_best_video(vector, norm, catalog, recent, last_video)
+            if video:
+                entry["video"] = video["filename"]
+                faketerm.record_video_choice(video["filename"], len(catalog), recent)
+                last_video = video["filename"]
+            if cache is not None and cached.get(step["step"]) is None:
+                cache.add(step["cache_key"], commentary)
+        bundle_steps.append(entry)
+    return bundle_steps
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build a playback bundle (commentary + embedding + video per walkthrough step)."
+    )
+    parser.add_argument(
+        "-i",
+        "--input",
+        default=faketerm.RAW_OUTPUT_PATH,
+        help="Game passages JSON (game-raw-output.json)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=faketerm.PLAYBACK_BUNDLE_PATH,
+        help="Output bundle path",
+    )
+    parser.add_argument("-m", "--model", default=faketerm.LLM_MODEL, help="Ollama chat model")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help="Concurrent requests sent to the Ollama server",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore and do not update the commentary cache",
+    )
+    args = parser.parse_args()
+
+    steps = load_walkthrough_passages(args.input, faketerm.plundered_hearts_commands)
+    with_passage = sum(1 for step in steps if step["passage"])
+    if not with_passage:
+        print(f"No game passages found in {args.input}", file=sys.stderr)
+        return 1
+    print(f"{with_passage}/{len(steps)} walkthrough steps have a recorded passage.")
+
+    catalog = faketerm.load_video_embeddings(faketerm.VIDEO_EMBEDDINGS_PATH)
+    if not catalog:
+        print(f"No video embeddings found in {faketerm.VIDEO_EMBEDDINGS_PATH}", file=sys.stderr)
+    cache = None
+    if not args.no_cache:
+        cache = CommentaryCache(faketerm.COMMENTARY_CACHE_PATH, fresh_chance=0.0)
+
+    started = time.perf_counter()
+    bundle_steps = build_bundle(steps, catalog, args.model, faketerm.LLM_OPTIONS, args.jobs, cache)
+    metadata = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "llm_model": args.model,
+        "llm_options": faketerm.LLM_OPTIONS,
+        "embed_model": faketerm.VIDEO_EMBED_MODEL,
+        "source": os.path.basename(args.input),
+    }
+    write_playback_bundle(args.output, bundle_steps, metadata)
+    commented = sum(1 for step in bundle_steps if step.get("commentary"))
+    print(
+        f"Wrote {args.output}: {commented}/{len(bundle_steps)} steps "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Benchmark the C64 renderer headless on recorded game passages: screen writes,
+full vs incremental compositing, and type_to_renderer throughput per
+output_scale / fit_to_display setting.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import faketerm
+from c64renderer import C64_COLS, C64_ROWS, C64_STATUS_ROWS, C64Renderer
+from c64screen import ScreenModel
+
+DEFAULT_PASSAGES = 40
+DEFAULT_OUTPUT_SCALES = "1,2"
+DEFAULT_SCALE_FILTERS = "smooth,nearest"
+# Window the fit_to_display runs scale into (the installation window).
+DEFAULT_FIT_WINDOW = "x".join(str(value) for value in faketerm.C64_WINDOW_SIZE)
+
+
+def load_passages(path, limit):
+    texts = []
+    for text in faketerm.load_raw_output(path).values():
+        output, sep, cmd = text.rpartition(faketerm.NEXT_MOVE_SEPARATOR)
+        if not sep:
+            continue
+        texts.append(output.strip() + "\n\n>> " + cmd.strip() + "\n")
+        if limit and len(texts) >= limit:
+            break
+    return texts
+
+
+class LegacyGrid:
+    """The former list-of-lists screen buffer: per-character loop, pop(0) scrolling, per-row colors."""
+
+    def __init__(self, cols, rows, default_fg=(202, 202, 202), default_bg=(64, 49, 141)):
+        self.cols = cols
+        self.rows = rows
+        self.default_fg = default_fg
+        self.default_bg = default_bg
+        self.buffer = [[" "] * cols for _ in range(rows)]
+        self.row_fg_colors = [default_fg] * rows
+        self.row_bg_colors = [default_bg] * rows
+        self.cursor_x = 0
+        self.cursor_y = 0
+
+    def _newline(self):
+        self.cursor_x = 0
+        self.cursor_y += 1
+        if self.cursor_y >= self.rows:
+            self.buffer.pop(0)
+            self.buffer.append([" "] * self.cols)
+            self.row_fg_colors.pop(0)
+            self.row_bg_colors.pop(0)
+            self.row_fg_colors.append(self.default_fg)
+            self.row_bg_colors.append(self.default_bg)
+            self.cursor_y = self.rows - 1
+
+    def _set_row_style(self, row_index, fg_color=None, bg_color=None):
+        if fg_color is not None:
+            self.row_fg_colors[row_index] = fg_color
+        if bg_color is not None:
+            self.row_bg_colors[row_index] = bg_color
+
+    def write(self, text, fg_color=None, bg_color=None):
+        for ch in text:
+            if ch == "\n":
+                self._newline()
+                if fg_color is not None or bg_color is not None:
+                    self._set_row_style(self.cursor_y, fg_color, bg_color)
+                continue
+            if fg_color is not None or bg_color is not None:
+                self._set_row_style(self.cursor_y, fg_color, bg_color)
+            sanitized = ch
+            if not sanitized.isprintable() or sanitized == "\r":
+                sanitized = " "
+            self.buffer[self.cursor_y][self.cursor_x] = sanitized.upper()
+            self.cursor_x += 1
+            if self.cursor_x >= self.cols:
+                self._newline()
+                if fg_color is not None or bg_color is not None:
+                    self._set_row_style(self.cursor_y, fg_color, bg_color)
+
+
+def time_writes(grid, passages, repeat, word_mode, colors=(None, None)):
+    """
+    Chars/s writing the passages whole or in typing chunks, in the given (fg, bg) colors,
+    publishing after each chunk like the render_frame that follows it in type_to_renderer.
+    """
+    pieces = [faketerm._split_typing_chunks(text, word_mode=True) if word_mode else [text] for text in passages]
+    chars = sum(len(text) for text in passages) * repeat
+    fg_color, bg_color = colors
+    publish = getattr(grid, "publish", lambda: None)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for chunks in pieces:
+            for chunk in chunks:
+                grid.write(chunk, fg_color, bg_color)
+                publish()
+    return chars / (time.perf_counter() - started)
+
+
+class TimedRenderer:
+    """Renderer wrapper for type_to_renderer that times each render_frame and, optionally, its Python allocations."""
+
+    def __init__(self, renderer, trace=False):
+        self.renderer = renderer
+        self.trace = trace
+        self.frame_times = []
+        self.frame_allocations = []
+
+    def write(self, text, fg_color=None, bg_color=None):
+        self.renderer.write(text, fg_color=fg_color, bg_color=bg_color)
+
+    def render_frame(self, show_cursor=False):
+        if self.trace:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        self.renderer.render_frame(show_cursor=show_cursor)
+        self.frame_times.append(time.perf_counter() - started)
+        if self.trace:
+            self.frame_allocations.append(tracemalloc.get_traced_memory()[1] - before)
+
+
+def type_passages(renderer, passages):
+    """Type passages word by word the way faketerm does, without the typing delays or key sounds."""
+    for passage in passages:
+        faketerm.type_to_renderer(
+            renderer, passage, base_delay=0.0, min_delay=0.0, max_delay=0.0, beep=False, word_mode=True
+        )
+
+
+def run_setting(passages, scale, output_scale, fit_to_display, window_size, scale_filter):
+    """Frames/s, chars/s and p50/p95 frame time for one setting, then a traced pass for allocations."""
+    options = dict(fps=0, scale=scale, output_scale=output_scale, scale_filter=scale_filter, headless=True)
+    if fit_to_display:
+        options.update(fit_to_display=True, window_size=window_size)
+    renderer = C64Renderer(**options)
+    timed = TimedRenderer(renderer)
+    started = time.perf_counter()
+    type_passages(timed, passages)
+    wall = time.perf_counter() - started
+    size = renderer.window.get_size()
+
+    # tracemalloc slows everything down, so allocations come from a separate pass.
+    renderer.clear()
+    traced = TimedRenderer(renderer, trace=True)
+    tracemalloc.start()
+    try:
+        type_passages(traced, passages)
+    finally:
+        tracemalloc.stop()
+    renderer.close()
+
+    frames = len(timed.frame_times)
+    percentiles = statistics.quantiles(timed.frame_times, n=100)
+    return {
+        "size": size,
+        "frames": frames,
+        "fps": frames / wall,
+        "chars_per_sec": sum(len(text) for text in passages) / wall,
+        "p50_ms": percentiles[49] * 1000.0,
+        "p95_ms": percentiles[94] * 1000.0,
+        "alloc_kib": statistics.mean(traced.frame_allocations) / 1024.0,
+    }
+
+
+def parse_size(text):
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height)
+
+
+def replay(renderer, passages):
+    """Type passages chunk by chunk, with the two frames per chunk that type_to_renderer renders."""
+    frames = 0
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    for passage in passages:
+        chunks = faketerm._split_typing_chunks(passage, word_mode=True)
+        for idx, chunk in enumerate(chunks):
+            renderer.render_frame(show_cursor=True)
+            renderer.write(chunk)
+            renderer.render_frame(show_cursor=idx + 1 < len(chunks))
+            frames += 2
+    return frames, time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark C64Renderer frame compositing (SDL dummy driver).")
+    parser.add_argument("-i", "--input", default=faketerm.RAW_OUTPUT_PATH, help="Game passages JSON")
+    parser.add_argument("-n", "--passages", type=int, default=DEFAULT_PASSAGES, help="Passages to replay (0 = all)")
+    parser.add_argument("--scale", type=int, default=2, help="Renderer scale")
+    parser.add_argument(
+        "--output-scales", default=DEFAULT_OUTPUT_SCALES, help="Comma separated output_scale values to measure"
+    )
+    parser.add_argument(
+        "--scale-filters", default=DEFAULT_SCALE_FILTERS, help="Comma separated scale filters to measure"
+    )
+    parser.add_argument(
+        "--fit-window", default=DEFAULT_FIT_WINDOW, help="Window size (WxH) for the fit_to_display runs"
+    )
+    parser.add_argument("--write-repeat", type=int, default=20, help="Passes over the passages for the write benchmark")
+    args = parser.parse_args()
+    output_scales = [max(1, int(value)) for value in args.output_scales.split(",") if value.strip()]
+    scale_filters = [value.strip() for value in args.scale_filters.split(",") if value.strip()]
+    fit_window = parse_size(args.fit_window)
+
+    passages = load_passages(args.input, args.passages)
+    if not passages:
+        print(f"No game passages found in {args.input}", file=sys.stderr)
+        return 1
+    print(f"Replaying {len(passages)} passages ({sum(len(text) for text in passages)} chars), scale {args.scale}")
+
+    rows = C64_ROWS - C64_STATUS_ROWS
+    ai_colors = (faketerm.AI_COMMENT_FG, faketerm.AI_COMMENT_BG)
+    for label, word_mode, colors in (
+        ("whole passages", False, (None, None)),
+        ("word chunks", True, (None, None)),
+        ("colored chunks", True, ai_colors),
+    ):
+        legacy = time_writes(LegacyGrid(C64_COLS, rows), passages, args.write_repeat, word_mode, colors)
+        model = time_writes(ScreenModel(C64_COLS, rows), passages, args.write_repeat, word_mode, colors)
+        print(
+            f"write, {label:<15} legacy {legacy / 1e6:6.2f} M chars/s   "
+            f"ScreenModel {model / 1e6:6.2f} M chars/s   ({model / legacy:.1f}x)"
+        )
+
+    results = {}
+    for label, incremental in (("full", False), ("incremental", True)):
+        renderer = C64Renderer(
+            fps=0, scale=args.scale, output_scale=output_scales[0], incremental=incremental, headless=True
+        )
+        frames, wall, cpu = replay(renderer, passages)
+        results[label] = (frames, wall, cpu)
+        print(
+            f"{label:<12} {frames} frames  {frames / wall:8.1f} fps  "
+            f"{cpu / frames * 1000.0:6.2f} ms CPU/frame  "
+            f"{renderer.frames_composed} composed, {renderer.rows_drawn} rows drawn"
+        )
+        renderer.close()
+    full_cpu = results["full"][2] / results["full"][0]
+    inc_cpu = results["incremental"][2] / results["incremental"][0]
+    print(f"CPU per frame: {full_cpu / inc_cpu:.1f}x less with incremental compositing")
+
+    print()
+    print("type_to_renderer, no typing delays:")
+    print(f"{'output_scale':>12} {'fit':>4} {'filter':>8} {'window':>10} {'fps':>8} {'chars/s':>9} {'p50 ms':>7} {'p95 ms':>7} {'KiB/frame':>10}")
+    for output_scale in output_scales:
+        for fit_to_display in (False, True):
+            for scale_filter in scale_filters:
+                result = run_setting(passages, args.scale, output_scale, fit_to_display, fit_window, scale_filter)
+                width, height = result["size"]
+                print(
+                    f"{output_scale:>12} {'yes' if fit_to_display else 'no':>4} {scale_filter:>8} "
+                    f"{f'{width}x{height}':>10} "
+                    f"{result['fps']:8.1f} {result['chars_per_sec']:9.0f} {result['p50_ms']:7.2f} "
+                    f"{result['p95_ms']:7.2f} {result['alloc_kib']:10.1f}"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
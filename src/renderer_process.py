@@ -0,0 +1,152 @@
+import multiprocessing
+import time
+
+import pygame
+
+from c64renderer import C64_BLUE, C64_COLS, C64_LIGHT_BLUE, C64_LIGHT_GRAY, C64_ROWS, C64_STATUS_ROWS, C64Renderer
+from c64screen import (
+    CMD_PREWARM_COLOR,
+    CMD_STATUS_COLOR,
+    CMD_STATUS_TEXT,
+    ScreenModel,
+    pack_color,
+    unpack_color,
+)
+from clock import RealClock
+
+RENDERER_PROCESS_FPS = 50
+RENDERER_START_TIMEOUT_SEC = 15.0
+COMMAND_RING_WAIT_SEC = 0.1
+
+
+def _apply_command(renderer, op, payload):
+    if op == CMD_STATUS_TEXT:
+        renderer.set_status_bar(payload.decode("latin-1"))
+    elif op == CMD_STATUS_COLOR:
+        renderer.set_status_bar_color(unpack_color(payload))
+    elif op == CMD_PREWARM_COLOR:
+        renderer.prewarm_colors([unpack_color(payload)])
+
+
+def _run_renderer(shm_name, cols, rows, fps, options):
+    """Renderer process: draw the shared grid on a fixed frame clock until asked to quit."""
+    screen = ScreenModel.attach(shm_name, cols, rows)
+    renderer = None
+    try:
+        renderer = C64Renderer(fps=fps, screen=screen, **options)
+        screen.set_ready()
+        while not screen.quit_requested:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    screen.request_quit()
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                    screen.request_quit()
+            for op, payload in screen.pop_commands():
+                _apply_command(renderer, op, payload)
+            renderer.render_frame(show_cursor=screen.show_cursor)
+    except Exception as exc:
+        print(f"C64 renderer process failed: {exc}")
+    finally:
+        screen.request_quit()
+        # Drop our own reference so the shared buffer can be released.
+        if renderer is not None:
+            renderer.screen = None
+            renderer.close()
+        screen.close()
+
+
+class RendererClient:
+    """
+    C64Renderer front end for faketerm that drives a renderer in its own process.
+    Writes go straight into the shared character grid; status bar changes go
+    through the command ring. The display keeps its own 50 fps clock, so LLM
+    or game stalls on this side no longer freeze it.
+    """
+
+    def __init__(self, fps=RENDERER_PROCESS_FPS, start_timeout=RENDERER_START_TIMEOUT_SEC, clock=None, **options):
+        self.fps = fps
+        # Paces render_frame on this side only; the renderer process always draws in real time.
+        self.clock = clock or RealClock()
+        self.status_text = ""
+        self.status_bar_bg = C64_LIGHT_BLUE
+        self.content_rows = C64_ROWS - C64_STATUS_ROWS
+        self.screen = ScreenModel.create_shared(
+            C64_COLS, self.content_rows, default_fg=C64_LIGHT_GRAY, default_bg=C64_BLUE
+        )
+        # spawn (not fork) so the child gets a clean pygame/SDL state on every platform.
+        context = multiprocessing.get_context("spawn")
+        self.process = context.Process(
+            target=_run_renderer,
+            args=(self.screen.shm.name, C64_COLS, self.content_rows, fps, options),
+            daemon=True,
+        )
+        self.process.start()
+        self._last_frame = self.clock.now()
+        deadline = time.monotonic() + start_timeout
+        while not self.screen.ready:
+            if not self.process.is_alive() or self.screen.quit_requested or time.monotonic() > deadline:
+                self.close()
+                raise RuntimeError("renderer process did not start")
+            time.sleep(0.01)
+
+    @property
+    def cursor_x(self):
+        return self.screen.cursor_x
+
+    @property
+    def cursor_y(self):
+        return self.screen.cursor_y
+
+    @property
+    def quit_requested(self):
+        """True once the window was closed / Escape was pressed, or the renderer died."""
+        return self.screen is None or self.screen.quit_requested or not self.process.is_alive()
+
+    def _push(self, op, payload):
+        deadline = time.monotonic() + COMMAND_RING_WAIT_SEC
+        while not self.screen.push_command(op, payload):
+            if time.monotonic() > deadline or self.quit_requested:
+                print("C64 renderer command ring full, dropping a command.")
+                return
+            time.sleep(0.001)
+
+    def write(self, text, fg_color=None, bg_color=None):
+        self.screen.write(text, fg_color=fg_color, bg_color=bg_color)
+
+    def clear(self):
+        self.screen.clear()
+
+    def set_status_bar(self, text):
+        text = (text or "").strip().upper()
+        if text != self.status_text:
+            self.status_text = text
+            self._push(CMD_STATUS_TEXT, text.encode("latin-1", "replace"))
+
+    def set_status_bar_color(self, color):
+        if color and color != self.status_bar_bg:
+            self.status_bar_bg = color
+            self._push(CMD_STATUS_COLOR, pack_color(color))
+
+    def prewarm_colors(self, colors):
+        for color in colors:
+            if color is not None:
+                self._push(CMD_PREWARM_COLOR, pack_color(color))
+
+    def render_frame(self, show_cursor=False):
+        """Publish this frame's writes and the cursor state and keep the caller's pacing; the renderer process draws."""
+        self.screen.publish()
+        self.screen.set_show_cursor(show_cursor)
+        wait = self._last_frame + 1.0 / self.fps - self.clock.now()
+        if wait > 0:
+            self.clock.sleep(wait)
+        self._last_frame = self.clock.now()
+
+    def close(self):
+        if self.screen is None:
+            return
+        self.screen.request_quit()
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.screen.close(unlink=True)
+        self.screen = None
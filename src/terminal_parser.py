@@ -0,0 +1,185 @@
+import re
+
+# Paging prompts: the game waits for RETURN after each. The first one is dropped from the text.
+MORE_MARKER = "***MORE***"
+CONTINUE_MARKER = "[Press RETURN or ENTER to continue.]"
+PAGING_MARKERS = (MORE_MARKER, CONTINUE_MARKER)
+# Cursor moves that start a new line of text; other CSI sequences are dropped.
+LINE_BREAKING_CSI = "HfABCD"
+# Longest escape kept waiting for the rest of it across chunks; past that it is plain text.
+MAX_PENDING_CHARS = 32
+
+# Next character that is not plain text.
+_special = re.compile(r"[\x1b\[\r\n]")
+_csi_params = re.compile(r"[0-9;?]*")
+# Bare cursor directives like [24d, left over when the ESC got lost.
+_cursor_directive = re.compile(r"\[\d{1,3}d")
+_cursor_directive_prefix = re.compile(r"\[\d{0,3}\Z")
+_status_bar = re.compile(r"Score:\s*(\d+).*Moves:\s*(\d+)", re.IGNORECASE)
+
+
+def parse_status_bar(line):
+    """{"text", "title", "score", "moves"} for a title/score bar line, else None."""
+    stripped = line.strip()
+    match = _status_bar.search(stripped)
+    if not match:
+        return None
+    return {
+        "text": stripped,
+        "title": stripped[: match.start()].strip(),
+        "score": int(match.group(1)),
+        "moves": int(match.group(2)),
+    }
+
+
+def passage_text(lines):
+    """Join clean lines into one passage: runs of blank lines collapsed, outer whitespace stripped."""
+    kept = []
+    previous_blank = True
+    for line in lines:
+        blank = not line.strip()
+        if blank and previous_blank:
+            continue
+        kept.append(line)
+        previous_blank = blank
+    return "\n".join(kept).strip()
+
+
+class TerminalParser:
+    """
+    Streaming parser for frotz terminal output, fed chunk by chunk.
+    feed() returns the events completed by the chunk, in order:
+      ("line", text)       a clean line of game text (escapes removed)
+      ("status", fields)   a title/score bar, see parse_status_bar()
+      ("page", marker)     a paging prompt that wants RETURN
+    Status bars and number-only lines are not emitted as text. An escape
+    split across chunks is held back until the rest of it arrives.
+    """
+
+    def __init__(self):
+        self.line = ""
+        self._pending = ""
+        self._scanned = 0
+
+    def feed(self, chunk):
+        events = []
+        data = self._pending + chunk if self._pending else chunk
+        self._pending = ""
+        line = self.line
+        pos = 0
+        end = len(data)
+        while pos < end:
+            match = _special.search(data, pos)
+            if match is None:
+                line += data[pos:]
+                break
+            index = match.start()
+            if index > pos:
+                line += data[pos:index]
+            char = data[index]
+            if char == "\n":
+                line = self._end_line(line, events)
+                pos = index + 1
+                continue
+            if char == "\r":
+                if index + 1 == end:
+                    self._pending = "\r"
+                    break
+                line = self._end_line(line, events)
+                pos = index + (2 if data[index + 1] == "\n" else 1)
+                continue
+            if char == "[":
+                directive = _cursor_directive.match(data, index)
+                if directive:
+                    pos = directive.end()
+                    continue
+                if _cursor_directive_prefix.match(data, index) and end - index < MAX_PENDING_CHARS:
+                    self._pending = data[index:]
+                    break
+                line += "["
+                pos = index + 1
+                continue
+            # ESC
+            if index + 1 == end:
+                self._pending = data[index:]
+                break
+            kind = data[index + 1]
+            if kind == "[":
+                final = _csi_params.match(data, index + 2).end()
+                if final == end:
+                    if end - index < MAX_PENDING_CHARS:
+                        self._pending = data[index:]
+                        break
+                elif data[final].isascii() and data[final].isalpha():
+                    if data[final] in LINE_BREAKING_CSI:
+                        line = self._end_line(line, events)
+                    pos = final + 1
+                    continue
+            elif kind == "(":
+                if index + 2 == end:
+                    self._pending = data[index:]
+                    break
+                if data[index + 2] in "AB":
+                    pos = index + 3
+                    continue
+            # Not an escape this parser knows: keep it as text, like the regex cleanup did.
+            line += "\x1b"
+            pos = index + 1
+        self.line = line
+        self._check_markers(events)
+        return events
+
+    def flush(self):
+        """End of the output: emit the unfinished line; a held-back partial escape is kept as text."""
+        events = []
+        pending = self._pending
+        self._pending = ""
+        if pending == "\r":
+            self.line = self._end_line(self.line, events)
+        else:
+            self.line += pending
+            self._check_markers(events)
+        if self.line:
+            self.line = self._end_line(self.line, events)
+        return events
+
+    def _check_markers(self, events):
+        # Only the text added since the last check, plus enough to catch a marker split across chunks.
+        start = max(0, self._scanned - len(CONTINUE_MARKER) + 1)
+        for marker in PAGING_MARKERS:
+            found = self.line.find(marker, start)
+            while found != -1:
+                events.append(("page", marker))
+                if marker == MORE_MARKER:
+                    self.line = self.line[:found] + self.line[found + len(marker) :]
+                    found = self.line.find(marker, found)
+                else:
+                    found = self.line.find(marker, found + len(marker))
+        self._scanned = len(self.line)
+
+    def _end_line(self, line, events):
+        self.line = line
+        self._check_markers(events)
+        line = self.line
+        self.line = ""
+        self._scanned = 0
+        status = parse_status_bar(line)
+        if status is not None:
+            events.append(("status", status))
+        elif not line.strip().isdigit():
+            events.append(("line", line))
+        return ""
+
+    def parse(self, text):
+        """Parse a whole output at once: (clean lines, last status bar or None, paging markers)."""
+        lines = []
+        status = None
+        pages = []
+        for kind, value in self.feed(text) + self.flush():
+            if kind == "line":
+                lines.append(value)
+            elif kind == "status":
+                status = value
+            else:
+                pages.append(value)
+        return lines, status, pages
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming TerminalParser against the former regex clean_output
+on the recorded passages, replayed as frotz terminal output (status bar,
+cursor moves, charset switches, paging prompts) and cut into read-sized chunks.
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+
+import faketerm
+from terminal_parser import MORE_MARKER, TerminalParser, passage_text
+
+DEFAULT_CHUNK_SIZE = 256
+DEFAULT_ROUNDS = 20
+
+ansi_escape = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+cursor_directives = re.compile(r'\[\d{1,3}d')
+charset_switch = re.compile(r'\x1b\([A-B]')
+status_bar_re = re.compile(r".*Score:\s*\d+.*Moves:\s*\d+", re.IGNORECASE)
+line_breaking_escapes = re.compile(r'\x1b\[[0-9;]*([HJfABCD])')
+
+
+def legacy_clean_output(text):
+    """The former faketerm cleanup: four regex passes over the whole output, then two line passes."""
+    status_bar = ""
+
+    def replace_with_newline(match):
+        return '\n' if match.group(1) in ['H', 'f', 'A', 'B', 'C', 'D'] else ''
+
+    text = line_breaking_escapes.sub(replace_with_newline, text)
+    text = charset_switch.sub('', text)
+    text = cursor_directives.sub('', text)
+    text = ansi_escape.sub('', text)
+    filtered = []
+    for line in text.strip().splitlines():
+        stripped = line.strip()
+        if status_bar_re.search(stripped):
+            status_bar = stripped
+            continue
+        if stripped.isdigit():
+            continue
+        filtered.append(line)
+    clean_lines = []
+    for i, line in enumerate(filtered):
+        if line.strip() == '' and (i == 0 or filtered[i - 1].strip() == ''):
+            continue
+        clean_lines.append(line)
+    return '\n'.join(clean_lines).strip(), status_bar
+
+
+def terminal_output(passage, moves, rng):
+    """Dress a clean passage up as frotz would print it: status bar redraw, CRLF, paging."""
+    status = f"\x1b[1;1H\x1b[7m Plundered Hearts        Score: {moves // 7}   Moves: {moves}\x1b[0m\x1b(B\x1b[24;1H"
+    lines = passage.split("\n")
+    if len(lines) > 6:
+        cut = rng.randrange(3, len(lines) - 2)
+        # A bare [24d: with its ESC, the regex passes would leave the ESC behind in the text.
+        lines[cut] += "\r\n" + MORE_MARKER + "[24d"
+    return status + "\r\n".join(lines)
+
+
+def chunked(text, size, rng):
+    chunks = []
+    pos = 0
+    while pos < len(text):
+        step = rng.randint(1, size * 2) if size else len(text)
+        chunks.append(text[pos : pos + step])
+        pos += step
+    return chunks
+
+
+def parse_chunks(chunks):
+    parser = TerminalParser()
+    lines = []
+    status = None
+    for chunk in chunks:
+        for kind, value in parser.feed(chunk):
+            if kind == "line":
+                lines.append(value)
+            elif kind == "status":
+                status = value
+    for kind, value in parser.flush():
+        if kind == "line":
+            lines.append(value)
+        elif kind == "status":
+            status = value
+    return passage_text(lines), status
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming terminal parser vs regex clean_output.")
+    parser.add_argument("-i", "--input", default=faketerm.RAW_OUTPUT_PATH, help="Game passages JSON")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Mean read size (0 = whole output)")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="Passes over all passages")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    passages = [text for text in faketerm.load_raw_output(args.input).values() if text.strip()]
+    if not passages:
+        print(f"No passages found in {args.input}", file=sys.stderr)
+        return 1
+    outputs = [terminal_output(text, moves, rng) for moves, text in enumerate(passages)]
+    reads = [chunked(output, args.chunk_size, rng) for output in outputs]
+
+    mismatches = 0
+    for output, chunks in zip(outputs, reads):
+        expected, expected_status = legacy_clean_output(output.replace(MORE_MARKER, ""))
+        text, status = parse_chunks(chunks)
+        if text != expected or (status or {}).get("text", "") != expected_status:
+            mismatches += 1
+    print(f"{len(outputs)} passages, {sum(map(len, outputs)) / 1024:.0f} KiB, {sum(map(len, reads))} chunks")
+    print(f"Parity with clean_output: {len(outputs) - mismatches}/{len(outputs)} identical")
+
+    # The regex cleanup needs the whole output, so it is timed on the joined text (what it saw per turn).
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        for output in outputs:
+            legacy_clean_output(output)
+    legacy = (time.perf_counter() - started) / (args.rounds * len(outputs))
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        for chunks in reads:
+            parse_chunks(chunks)
+    streaming = (time.perf_counter() - started) / (args.rounds * len(outputs))
+    print(f"clean_output (whole text): {legacy * 1e6:8.1f} us/passage")
+    print(f"TerminalParser (chunked):  {streaming * 1e6:8.1f} us/passage ({legacy / streaming:.2f}x)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,256 @@
+import json
+import os
+
+import numpy as np
+
+CATALOG_FORMAT = "pllmdered-video-catalog"
+CATALOG_VERSION = 1
+CATALOG_DTYPES = ("float32", "float16")
+
+
+def normalize_rows(matrix):
+    """Return float32 rows scaled to unit length, plus the original norms."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1)
+    safe = np.where(norms > 0.0, norms, 1.0).astype(np.float32)
+    return matrix / safe[:, None], norms
+
+
+class VideoCatalog:
+    """
+    Interview clips with a pre-normalized float32 embedding matrix, one row per
+    clip, so a cosine ranking is a single matrix-vector product.
+    """
+
+    def __init__(self, entries, matrix, model=None):
+        self.entries = entries
+        self.matrix = matrix
+        self.model = model
+        self._index = {entry["filename"]: idx for idx, entry in enumerate(entries)}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __getitem__(self, idx):
+        return self.entries[idx]
+
+    @property
+    def dim(self):
+        return int(self.matrix.shape[1]) if self.matrix.ndim == 2 else 0
+
+    def find(self, filename):
+        idx = self._index.get(filename)
+        return None if idx is None else self.entries[idx]
+
+    def scores(self, vector):
+        """Cosine similarity of vector against every clip, or None on a dimension mismatch."""
+        query = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if query.shape[0] != self.dim:
+            return None
+        norm = float(np.linalg.norm(query))
+        if norm <= 0.0:
+            return None
+        # float16 catalogs are upcast here; numpy has no fast half-precision matmul.
+        return np.dot(self.matrix, query / norm).astype(np.float32, copy=False)
+
+    def _mask_for(self, names):
+        mask = np.zeros(len(self.entries), dtype=bool)
+        for name in names:
+            idx = self._index.get(name)
+            if idx is not None:
+                mask[idx] = True
+        return mask
+
+    def top_indices(self, scores, k=1, allowed=None):
+        """Indices of the k best scores among allowed rows, best first."""
+        if allowed is not None:
+            if not allowed.any():
+                return []
+            scores = np.where(allowed, scores, -np.inf)
+            k = min(k, int(allowed.sum()))
+        k = min(k, scores.shape[0])
+        if k <= 0:
+            return []
+        if k < scores.shape[0]:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(scores.shape[0])
+        return candidates[np.argsort(-scores[candidates], kind="stable")].tolist()
+
+    def select(self, vector, recent, last_video):
+        """
+        Best clip for vector, skipping last_video and the recently played clips.
+        When every clip was played recently, the history is cleared.
+        """
+        if not self.entries or vector is None:
+            return None
+        scores = self.scores(vector)
+        if scores is None:
+            return None
+        allowed = ~self._mask_for([last_video]) if last_video else np.ones(len(self.entries), dtype=bool)
+        best = self.top_indices(scores, 1, allowed & ~self._mask_for(recent))
+        if not best and recent:
+            recent.clear()
+            best = self.top_indices(scores, 1, allowed)
+        if not best:
+            best = self.top_indices(scores, 1)
+        return self.entries[best[0]] if best else None
+
+
+def _parse_duration(raw):
+    if raw is None:
+        return None
+    try:
+        return float(raw)
+    except (TypeError, ValueError):
+        return None
+
+
+def catalog_from_items(items):
+    entries = []
+    vectors = []
+    dim = None
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        filename = item.get("filename")
+        embedding = item.get("embedding")
+        if not filename or not isinstance(embedding, list) or not embedding:
+            continue
+        if dim is None:
+            dim = len(embedding)
+        if len(embedding) != dim:
+            print(f"Skipping {filename}: embedding size {len(embedding)} != {dim}")
+            continue
+        entries.append(
+            {
+                "filename": filename,
+                "sequence_title": item.get("sequence_title"),
+                "duration_sec": _parse_duration(item.get("duration_sec")),
+            }
+        )
+        vectors.append(embedding)
+    if not entries:
+        return VideoCatalog([], np.zeros((0, 0), dtype=np.float32))
+    matrix, norms = normalize_rows(vectors)
+    keep = norms > 0.0
+    if not keep.all():
+        entries = [entry for entry, ok in zip(entries, keep) if ok]
+        matrix = matrix[keep]
+    return VideoCatalog(entries, np.ascontiguousarray(matrix))
+
+
+def load_video_catalog(path):
+    if is_binary_catalog_path(path):
+        try:
+            return load_binary_catalog(path)
+        except Exception as exc:
+            print(f"Unable to open binary catalog {path}: {exc}")
+            return VideoCatalog([], np.zeros((0, 0), dtype=np.float32))
+    if not os.path.exists(path):
+        return VideoCatalog([], np.zeros((0, 0), dtype=np.float32))
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        if not isinstance(data, list):
+            data = []
+    except Exception:
+        data = []
+    return catalog_from_items(data)
+
+
+def binary_catalog_paths(path):
+    """Vector block (.npy) and metadata sidecar (.meta.json) paths for a catalog path."""
+    base = path
+    for suffix in (".meta.json", ".npy", ".json"):
+        if base.lower().endswith(suffix):
+            base = base[: -len(suffix)]
+            break
+    return base + ".npy", base + ".meta.json"
+
+
+def is_binary_catalog_path(path):
+    lower = path.lower()
+    return lower.endswith(".npy") or lower.endswith(".meta.json")
+
+
+def load_catalog_metadata(path):
+    _, meta_path = binary_catalog_paths(path)
+    with open(meta_path, "r", encoding="utf-8") as handle:
+        meta = json.load(handle)
+    if not isinstance(meta, dict) or meta.get("format") != CATALOG_FORMAT:
+        raise ValueError(f"Not a video catalog sidecar: {meta_path}")
+    if meta.get("version") != CATALOG_VERSION:
+        raise ValueError(f"Unsupported video catalog version {meta.get('version')}: {meta_path}")
+    return meta
+
+
+def write_catalog_metadata(path, meta):
+    _, meta_path = binary_catalog_paths(path)
+    tmp_path = meta_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(meta, handle, ensure_ascii=True, indent=2)
+    os.replace(tmp_path, meta_path)
+
+
+def write_binary_catalog(path, items, model=None, dtype="float32"):
+    """
+    Write JSON-style catalog items as a normalized vector block plus a sidecar.
+    The sidecar keeps each clip's original norm so the JSON can be rebuilt.
+    """
+    if dtype not in CATALOG_DTYPES:
+        raise ValueError(f"dtype must be one of {CATALOG_DTYPES}")
+    catalog = catalog_from_items(items)
+    norms_by_name = {}
+    for item in items:
+        if isinstance(item, dict) and isinstance(item.get("embedding"), list):
+            norms_by_name[item.get("filename")] = float(np.linalg.norm(np.asarray(item["embedding"], dtype=np.float64)))
+    npy_path, _ = binary_catalog_paths(path)
+    os.makedirs(os.path.dirname(os.path.abspath(npy_path)), exist_ok=True)
+    tmp_path = npy_path + ".tmp"
+    with open(tmp_path, "wb") as handle:
+        np.save(handle, catalog.matrix.astype(dtype))
+    os.replace(tmp_path, npy_path)
+    meta = {
+        "format": CATALOG_FORMAT,
+        "version": CATALOG_VERSION,
+        "model": model,
+        "dim": catalog.dim,
+        "dtype": dtype,
+        "count": len(catalog),
+        "normalized": True,
+        "vectors": os.path.basename(npy_path),
+        "entries": [
+            dict(entry, norm=norms_by_name.get(entry["filename"], 1.0))
+            for entry in catalog.entries
+        ],
+    }
+    write_catalog_metadata(path, meta)
+    return len(catalog)
+
+
+def load_binary_catalog(path):
+    """Open a binary catalog; the vector block is memory-mapped, not read."""
+    npy_path, _ = binary_catalog_paths(path)
+    meta = load_catalog_metadata(path)
+    matrix = np.load(npy_path, mmap_mode="r")
+    entries = meta.get("entries") or []
+    if matrix.ndim != 2 or matrix.shape[0] != len(entries):
+        raise ValueError(f"Catalog {npy_path} has {matrix.shape} vectors for {len(entries)} entries")
+    return VideoCatalog(entries, matrix, model=meta.get("model"))
+
+
+def catalog_to_items(catalog):
+    """Rebuild the JSON item list (raw embeddings) from a loaded catalog."""
+    items = []
+    for entry, row in zip(catalog.entries, catalog.matrix):
+        vector = np.asarray(row, dtype=np.float64) * float(entry.get("norm") or 1.0)
+        item = {"filename": entry["filename"], "embedding": vector.tolist()}
+        item["sequence_title"] = entry.get("sequence_title")
+        if entry.get("duration_sec") is not None:
+            item["duration_sec"] = entry["duration_sec"]
+        items.append(item)
+    return items
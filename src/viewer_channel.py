@@ -0,0 +1,61 @@
+import os
+import socket
+import time
+
+DEFAULT_UDP_ADDRESS = ("127.0.0.1", 47731)
+# The journal is renamed to <journal>.1 past this size, so llm_out/ stays at two files.
+DEFAULT_JOURNAL_MAX_BYTES = 64 * 1024
+
+
+class VideoRequestChannel:
+    """
+    Sends clip requests to the Godot viewer. Each request is a line
+    "<id>\\t<filename>": sent as a UDP datagram to the viewer (no polling
+    latency) and appended to a journal file that the viewer tails from its
+    last read offset, in case the datagram is lost or the viewer was busy.
+    Ids are microsecond timestamps, increasing across restarts, so the viewer
+    plays each request once whichever path delivers it first.
+    """
+
+    def __init__(self, journal_path, udp_address=DEFAULT_UDP_ADDRESS, journal_max_bytes=DEFAULT_JOURNAL_MAX_BYTES):
+        self.journal_path = journal_path
+        self.udp_address = udp_address
+        self.journal_max_bytes = journal_max_bytes
+        self._last_id = 0
+        self._socket = None
+        if udp_address:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._socket.setblocking(False)
+
+    def _next_id(self):
+        self._last_id = max(self._last_id + 1, time.time_ns() // 1000)
+        return self._last_id
+
+    def send(self, filename):
+        filename = (filename or "").strip()
+        if not filename:
+            return None
+        line = f"{self._next_id()}\t{filename}\n"
+        if self._socket is not None:
+            try:
+                self._socket.sendto(line.encode("utf-8"), self.udp_address)
+            except OSError as exc:
+                # Nobody listening is fine: the journal still has the request.
+                print(f"Unable to send video request over UDP: {exc}")
+        self._append_journal(line)
+        return line
+
+    def _append_journal(self, line):
+        try:
+            os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+            if os.path.exists(self.journal_path) and os.path.getsize(self.journal_path) >= self.journal_max_bytes:
+                os.replace(self.journal_path, self.journal_path + ".1")
+            with open(self.journal_path, "a", encoding="utf-8", newline="\n") as handle:
+                handle.write(line)
+        except OSError as exc:
+            print(f"Unable to write video request journal: {exc}")
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Play the walkthrough headless, as fast as the game answers: no renderer,
+no typing delays, no LLM. Every cleaned passage is kept with its step
+index and command, and written as the game corpus
+(assets/game-raw-output.json, the ENABLE_RAW_OUTPUT format) plus an
+ordered step list (assets/game-steps.json). Only frotz, the reference,
+writes those two: another backend's default run gets its own suffix
+(game-raw-output-zmachine.json). Variants (other story files or
+walkthroughs) run in parallel processes.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import faketerm
+from game_session import GAME_BACKENDS, make_game_session
+from zmachine_session import STORY_PATH
+
+# The committed corpus comes from frotz; another backend only replaces it once backend_conformance.py agrees.
+REFERENCE_BACKEND = "frotz"
+DEFAULT_BACKEND = REFERENCE_BACKEND
+DEFAULT_JOBS = os.cpu_count() or 1
+CORPUS_DIR = os.path.dirname(faketerm.RAW_OUTPUT_PATH)
+# faketerm's prompt context: the last passages shown before a command.
+CONTEXT_PASSAGES = 3
+
+
+def load_commands(path):
+    """Walkthrough file: one command per line, blank lines and # comments skipped."""
+    with open(path, "r", encoding="utf-8") as handle:
+        lines = [line.strip() for line in handle]
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def open_session(backend, story_path, seed=None, timeout=faketerm.GAME_TURN_TIMEOUT_SEC, frotz="frotz"):
+    if backend == "zmachine":
+        return make_game_session(backend, story_path=story_path, seed=seed, turn_timeout=timeout)
+    return make_game_session(backend, command=f"{frotz} -p {story_path}", seed=seed, turn_timeout=timeout)
+
+
+def play_walkthrough(session, commands, start_step=0, stop_text=None):
+    """
+    Send commands[start_step:] to a game at its prompt, the way faketerm
+    does, stopping early once a passage contains stop_text. Returns the
+    steps ({"step", "cmd", "passage", "status"}, passage being the text
+    shown at the prompt before cmd) and the text after the last command.
+    """
+    steps = []
+    for index in range(start_step, len(commands)):
+        if not session.alive or not session.at_prompt:
+            break
+        if stop_text and steps and stop_text in session.text:
+            break
+        cmd = faketerm.enhance_game_command(commands[index])
+        steps.append({"step": index, "cmd": cmd, "passage": session.text, "status": session.status_bar})
+        session.send(" " + cmd)
+    return steps, session.text
+
+
+def corpus_entries(intro, steps):
+    """{sha: recent passages + NEXT_MOVE_SEPARATOR + cmd}, the entries faketerm's ENABLE_RAW_OUTPUT records."""
+    data = {}
+    recent = [intro] if intro else []
+    pending = bool(recent)
+    for step in steps:
+        if step["passage"]:
+            recent = (recent + [step["passage"]])[-CONTEXT_PASSAGES:]
+            pending = True
+        if pending:
+            faketerm.update_raw_output(data, "\n".join(recent) + faketerm.NEXT_MOVE_SEPARATOR + step["cmd"])
+            pending = False
+    return data
+
+
+def run_variant(variant, backend, seed, timeout, frotz):
+    """Play one variant in this process; returns its steps and timing (picklable, for the worker pool)."""
+    started = time.perf_counter()
+    session = open_session(backend, variant["story"], seed, timeout, frotz)
+    try:
+        session.start()
+        intro = session.text if session.at_intro else ""
+        if session.at_intro:
+            session.send("")
+        steps, ending = play_walkthrough(session, variant["commands"])
+        stats = session.stats_summary()
+    finally:
+        session.close()
+    return {
+        "name": variant["name"],
+        "story": os.path.basename(variant["story"]),
+        "backend": backend,
+        "seed": seed,
+        "intro": intro,
+        "steps": steps,
+        "ending": ending,
+        "commands": len(variant["commands"]),
+        "complete": len(steps) == len(variant["commands"]),
+        "seconds": time.perf_counter() - started,
+        "stats": stats,
+    }
+
+
+def corpus_paths(output_dir, name):
+    suffix = f"-{name}" if name else ""
+    return (
+        os.path.join(output_dir, f"game-raw-output{suffix}.json"),
+        os.path.join(output_dir, f"game-steps{suffix}.json"),
+    )
+
+
+def write_variant(result, output_dir):
+    raw_path, steps_path = corpus_paths(output_dir, result["name"])
+    faketerm.write_raw_output(raw_path, corpus_entries(result["intro"], result["steps"]))
+    payload = {key: value for key, value in result.items() if key not in ("seconds", "stats")}
+    with open(steps_path, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle, ensure_ascii=True, indent=1)
+    return raw_path, steps_path
+
+
+def parse_variant(spec):
+    """NAME=STORY[,WALKTHROUGH]: the walkthrough defaults to faketerm's plundered_hearts_commands."""
+    name, sep, rest = spec.partition("=")
+    if not sep or not name or not rest:
+        raise argparse.ArgumentTypeError(f"expected NAME=STORY[,WALKTHROUGH], got {spec!r}")
+    story, _, walkthrough = rest.partition(",")
+    commands = load_commands(walkthrough) if walkthrough else list(faketerm.plundered_hearts_commands)
+    return {"name": name, "story": story, "commands": commands}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate the game corpus by playing the walkthrough headless.")
+    parser.add_argument(
+        "--variant",
+        action="append",
+        type=parse_variant,
+        default=[],
+        help=(
+            "NAME=STORY[,WALKTHROUGH] (repeatable); default: the ROM and faketerm's walkthrough, "
+            "no name suffix with frotz, the backend name otherwise"
+        ),
+    )
+    parser.add_argument("--backend", choices=GAME_BACKENDS, default=DEFAULT_BACKEND, help="Game backend")
+    parser.add_argument("--seed", type=int, default=faketerm.GAME_RANDOM_SEED, help="Random seed for the game")
+    parser.add_argument("--timeout", type=float, default=faketerm.GAME_TURN_TIMEOUT_SEC, help="Per-read timeout")
+    parser.add_argument("--frotz", default="frotz", help="frotz executable for the frotz backend")
+    parser.add_argument("-o", "--output-dir", default=CORPUS_DIR, help="Where the corpus files are written")
+    parser.add_argument("-j", "--jobs", type=int, default=DEFAULT_JOBS, help="Worker processes")
+    args = parser.parse_args()
+
+    default_name = "" if args.backend == REFERENCE_BACKEND else args.backend
+    variants = args.variant or [
+        {"name": default_name, "story": STORY_PATH, "commands": list(faketerm.plundered_hearts_commands)}
+    ]
+    for variant in variants:
+        if not os.path.exists(variant["story"]):
+            print(f"Story file not found: {variant['story']} (run src/get_game.py)", file=sys.stderr)
+            return 1
+    if args.backend == "frotz" and shutil.which(args.frotz) is None:
+        print(f"{args.frotz} was not found on PATH.", file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+    options = (args.backend, args.seed, args.timeout, args.frotz)
+    jobs = max(1, min(args.jobs, len(variants)))
+    if jobs == 1:
+        results = [run_variant(variant, *options) for variant in variants]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(run_variant, variants, *[[option] * len(variants) for option in options]))
+
+    failed = 0
+    for result in results:
+        raw_path, steps_path = write_variant(result, args.output_dir)
+        label = result["name"] or "default"
+        print(f"{label}: {len(result['steps'])}/{result['commands']} steps in {result['seconds']:.2f}s -> {raw_path}, {steps_path}")
+        print(f"  {result['stats']}")
+        if not result["complete"]:
+            failed += 1
+            print("  The game stopped before the end of the walkthrough.")
+    print(f"{len(results)} variants in {time.perf_counter() - started:.2f}s on {jobs} processes")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,40 @@
+import time
+
+from deadline import BackgroundCall
+
+WARM_UP_TIMEOUT_SEC = 30.0
+
+
+def _timed(func):
+    def run():
+        started = time.perf_counter()
+        result = func()
+        return result, time.perf_counter() - started
+
+    return run
+
+
+def run_warm_up(tasks, poll=None, timeout=WARM_UP_TIMEOUT_SEC):
+    """
+    Run the (name, func) loaders in parallel background threads and wait for
+    all of them, calling poll() meanwhile. Returns ({name: result}, {name: seconds});
+    loaders that fail or are still running at the timeout are left out, and the
+    caller loads those lazily as before.
+    """
+    started = time.perf_counter()
+    calls = [(name, BackgroundCall(_timed(func))) for name, func in tasks]
+    deadline = time.monotonic() + timeout
+    results = {}
+    timings = {}
+    for name, call in calls:
+        if not call.wait(deadline, poll):
+            call.cancel()
+            print(f"Warm-up: {name} still loading after {timeout:.0f}s, not waiting for it.")
+            continue
+        if call.error is not None:
+            print(f"Warm-up: {name} failed: {call.error}")
+            continue
+        results[name], timings[name] = call.result
+    details = ", ".join(f"{name} {seconds * 1000.0:.0f} ms" for name, seconds in timings.items())
+    print(f"Warm-up done in {(time.perf_counter() - started) * 1000.0:.0f} ms ({details or 'nothing loaded'})")
+    return results, timings
@@ -0,0 +1,1079 @@
+import time
+
+# dumb frotz's default screen; the recorded passages are wrapped at this width.
+SCREEN_WIDTH = 75
+SCREEN_HEIGHT = 24
+# frotz's status line: "Score:" starts this many columns from the right edge, "Moves:" this many.
+STATUS_SCORE_COLUMN = 30
+STATUS_MOVES_COLUMN = 14
+INTERPRETER_NUMBER = 6
+INTERPRETER_VERSION = ord("F")
+# dumb frotz's prompt for the name of a save file.
+FILENAME_PROMPT = "Please enter a filename [{}]: "
+DEFAULT_SAVE_NAME = "story.qzl"
+
+A0 = "abcdefghijklmnopqrstuvwxyz"
+A1 = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+# Z-chars 6..31 of A2; 6 is the 10-bit ZSCII escape, 7 a newline.
+A2 = "\0\n0123456789.,!?_#'\"/\\-:()"
+# ZSCII 155..223 with the default Unicode translation table.
+EXTRA_CHARACTERS = "äöüÄÖÜß»«ëïÿËÏáéíóúýÁÉÍÓÚÝàèìòùÀÈÌÒÙâêîôûÂÊÎÔÛåÅøØãñõÃÑÕæÆçÇþðÞÐ£œŒ¡¿"
+
+
+class ZMachineError(Exception):
+    pass
+
+
+def _signed(value):
+    return value - 0x10000 if value & 0x8000 else value
+
+
+def _iff_chunk(name, data):
+    chunk = name + len(data).to_bytes(4, "big") + bytes(data)
+    return chunk + b"\x00" if len(data) & 1 else chunk
+
+
+def zscii_to_text(code):
+    if code == 13:
+        return "\n"
+    if 32 <= code <= 126:
+        return chr(code)
+    if 155 <= code < 155 + len(EXTRA_CHARACTERS):
+        return EXTRA_CHARACTERS[code - 155]
+    return ""
+
+
+def text_to_zscii(char):
+    if char == "\n":
+        return 13
+    code = ord(char)
+    if 32 <= code <= 126:
+        return code
+    index = EXTRA_CHARACTERS.find(char)
+    return 155 + index if index != -1 else ord("?")
+
+
+class ZMachine:
+    """
+    Version 3 Z-machine interpreter. run() executes until the game asks for
+    a line of input (then returns "input"; answer with send_input()) or
+    quits ("quit"). Lower-window text is word-wrapped the way frotz does it
+    and collected as lines; take_output() hands them over. The random
+    generator is frotz's, so both give the same numbers for the same seed.
+    snapshot()/restore_snapshot() copy the whole machine state in memory.
+    The save and restore opcodes ask for a file name like dumb frotz does
+    (answer it with send_input()) and use Quetzal files, so saves are
+    interchangeable with frotz's.
+    """
+
+    def __init__(
+        self,
+        story,
+        seed=None,
+        screen_width=SCREEN_WIDTH,
+        screen_height=SCREEN_HEIGHT,
+        save_name=DEFAULT_SAVE_NAME,
+    ):
+        self.story = bytes(story)
+        if not self.story or self.story[0] != 3:
+            raise ZMachineError(f"Only version 3 story files are supported (got version {self.story[0] if self.story else None})")
+        self.seed = seed
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.save_name = save_name
+        self.static_base = self._story_word(0x0E)
+        self.dictionary = self._story_word(0x08)
+        self.objects = self._story_word(0x0A)
+        self.globals = self._story_word(0x0C)
+        self.abbreviations = self._story_word(0x18)
+        self.file_length = self._story_word(0x1A) * 2 or len(self.story)
+        self._string_cache = {}
+        self._long_ops = {
+            1: self._op_je, 2: self._op_jl, 3: self._op_jg, 4: self._op_dec_chk, 5: self._op_inc_chk,
+            6: self._op_jin, 7: self._op_test, 8: self._op_or, 9: self._op_and, 10: self._op_test_attr,
+            11: self._op_set_attr, 12: self._op_clear_attr, 13: self._op_store, 14: self._op_insert_obj,
+            15: self._op_loadw, 16: self._op_loadb, 17: self._op_get_prop, 18: self._op_get_prop_addr,
+            19: self._op_get_next_prop, 20: self._op_add, 21: self._op_sub, 22: self._op_mul,
+            23: self._op_div, 24: self._op_mod,
+        }
+        self._short_ops = {
+            0: self._op_jz, 1: self._op_get_sibling, 2: self._op_get_child, 3: self._op_get_parent,
+            4: self._op_get_prop_len, 5: self._op_inc, 6: self._op_dec, 7: self._op_print_addr,
+            9: self._op_remove_obj, 10: self._op_print_obj, 11: self._op_ret, 12: self._op_jump,
+            13: self._op_print_paddr, 14: self._op_load, 15: self._op_not,
+        }
+        self._zero_ops = {
+            0: self._op_rtrue, 1: self._op_rfalse, 2: self._op_print, 3: self._op_print_ret, 4: self._op_nop,
+            5: self._op_save, 6: self._op_restore, 7: self._op_restart, 8: self._op_ret_popped,
+            9: self._op_pop, 10: self._op_quit, 11: self._op_new_line, 12: self._op_show_status,
+            13: self._op_verify,
+        }
+        self._var_ops = {
+            0: self._op_call, 1: self._op_storew, 2: self._op_storeb, 3: self._op_put_prop, 4: self._op_sread,
+            5: self._op_print_char, 6: self._op_print_num, 7: self._op_random, 8: self._op_push, 9: self._op_pull,
+            10: self._op_split_window, 11: self._op_set_window, 19: self._op_output_stream,
+            20: self._op_input_stream, 21: self._op_sound_effect,
+        }
+        self._load_dictionary()
+        self.mem = bytearray(self.story)
+        self.restart()
+
+    # -- state ---------------------------------------------------------------
+
+    def _story_word(self, addr):
+        return (self.story[addr] << 8) | self.story[addr + 1]
+
+    def restart(self):
+        # In place: run() holds on to the memory object.
+        flags2 = self.mem[0x11] & 0x03
+        self.mem[:] = self.story
+        self._write_header(flags2)
+        self.pc = self._story_word(0x06)
+        self.stack = []
+        self.locals = []
+        # Caller frames: [return pc, store variable, locals, evaluation stack, argument count].
+        self.frames = []
+        self.state = "running"
+        self._read_buffers = None
+        self._file_action = None
+        self._seed_random(0)
+        self._word = ""
+        self._previous_char = ""
+        self._line = ""
+        self._lines = []
+        self.upper_lines = []
+        self.upper_height = 0
+        self.window = 0
+        self._memory_streams = []
+        self.status_line = ""
+
+    def _write_header(self, flags2):
+        # Interpreter fields; the transcript and fixed-pitch bits of Flags 2 survive restart and restore.
+        self.mem[0x01] = (self.mem[0x01] & ~0x70) | 0x20  # status line on, screen splitting, fixed pitch
+        self.mem[0x11] = (self.mem[0x11] & ~0x03) | flags2
+        self.mem[0x1E] = INTERPRETER_NUMBER
+        self.mem[0x1F] = INTERPRETER_VERSION
+        self.mem[0x20] = self.screen_height
+        self.mem[0x21] = self.screen_width
+        self.mem[0x32] = 1
+        self.mem[0x33] = 0
+
+    def snapshot(self):
+        """The whole machine state, for restore_snapshot(); dynamic memory, stacks, pc, random generator."""
+        return (
+            bytes(self.mem[: self.static_base]),
+            self.pc,
+            list(self.stack),
+            list(self.locals),
+            [[frame[0], frame[1], list(frame[2]), list(frame[3]), frame[4]] for frame in self.frames],
+            self.state,
+            self._read_buffers,
+            self._file_action,
+            (self._random_state, self._random_interval, self._random_counter),
+            self.status_line,
+        )
+
+    def restore_snapshot(self, snapshot):
+        (
+            memory,
+            self.pc,
+            stack,
+            locals_,
+            frames,
+            self.state,
+            self._read_buffers,
+            self._file_action,
+            random_state,
+            self.status_line,
+        ) = snapshot
+        self.mem[: len(memory)] = memory
+        self.stack = list(stack)
+        self.locals = list(locals_)
+        self.frames = [[frame[0], frame[1], list(frame[2]), list(frame[3]), frame[4]] for frame in frames]
+        self._random_state, self._random_interval, self._random_counter = random_state
+        self._word = ""
+        self._previous_char = ""
+        self._line = ""
+        self._lines = []
+        self.upper_lines = []
+        self._memory_streams = []
+
+    # -- save files (Quetzal) ------------------------------------------------
+
+    def _quetzal(self):
+        """The machine as a Quetzal save file. Written from the save opcode: pc is on its branch data."""
+        mem = self.mem
+        header = bytes(mem[0x02:0x04]) + bytes(mem[0x12:0x18]) + bytes(mem[0x1C:0x1E]) + self.pc.to_bytes(3, "big")
+
+        # Dynamic memory XORed with the story file; runs of unchanged bytes as (0, length - 1).
+        cmem = bytearray()
+        run = 0
+        story = self.story
+        for index in range(self.static_base):
+            byte = mem[index] ^ story[index]
+            if not byte:
+                run += 1
+                continue
+            while run > 0x100:
+                cmem += b"\x00\xff"
+                run -= 0x100
+            if run:
+                cmem += bytes((0, run - 1))
+                run = 0
+            cmem.append(byte)
+
+        # One frame per routine, the main one first: how it was called, then its locals and stack.
+        calls = [(0, 0, 0)] + [(frame[0], frame[1], frame[4]) for frame in self.frames]
+        routines = [(frame[2], frame[3]) for frame in self.frames] + [(self.locals, self.stack)]
+        stks = bytearray()
+        for (return_pc, store_var, nargs), (locals_, stack) in zip(calls, routines):
+            stks += return_pc.to_bytes(3, "big")
+            stks += bytes((len(locals_), store_var, (1 << nargs) - 1))
+            stks += len(stack).to_bytes(2, "big")
+            for value in locals_ + stack:
+                stks += value.to_bytes(2, "big")
+
+        form = b"IFZS" + _iff_chunk(b"IFhd", header) + _iff_chunk(b"CMem", cmem) + _iff_chunk(b"Stks", stks)
+        return b"FORM" + len(form).to_bytes(4, "big") + form
+
+    def _load_quetzal(self, data):
+        """Load a Quetzal save file of this story; False, machine untouched, if it is not one."""
+        if data[:4] != b"FORM" or data[8:12] != b"IFZS":
+            return False
+        chunks = {}
+        pos = 12
+        end = min(len(data), 8 + int.from_bytes(data[4:8], "big"))
+        while pos + 8 <= end:
+            size = int.from_bytes(data[pos + 4 : pos + 8], "big")
+            chunks.setdefault(data[pos : pos + 4], data[pos + 8 : pos + 8 + size])
+            pos += 8 + size + (size & 1)
+
+        header = chunks.get(b"IFhd", b"")
+        mem = self.mem
+        if len(header) < 13 or header[:10] != bytes(mem[0x02:0x04]) + bytes(mem[0x12:0x18]) + bytes(mem[0x1C:0x1E]):
+            return False
+        memory = self._saved_memory(chunks)
+        if memory is None or b"Stks" not in chunks:
+            return False
+
+        calls = []
+        routines = []
+        stks = chunks[b"Stks"]
+        pos = 0
+        while pos + 8 <= len(stks):
+            count = stks[pos + 3] & 0x0F
+            depth = int.from_bytes(stks[pos + 6 : pos + 8], "big")
+            words = [int.from_bytes(stks[index : index + 2], "big") for index in range(pos + 8, pos + 8 + 2 * (count + depth), 2)]
+            calls.append((int.from_bytes(stks[pos : pos + 3], "big"), stks[pos + 4], (stks[pos + 5] + 1).bit_length() - 1))
+            routines.append((words[:count], words[count:]))
+            pos += 8 + 2 * (count + depth)
+        if not routines:
+            return False
+
+        flags2 = mem[0x11] & 0x03
+        mem[: self.static_base] = memory
+        self._write_header(flags2)
+        self.pc = int.from_bytes(header[10:13], "big")
+        self.frames = [
+            [return_pc, store_var, locals_, stack, nargs]
+            for (return_pc, store_var, nargs), (locals_, stack) in zip(calls[1:], routines)
+        ]
+        self.locals, self.stack = routines[-1]
+        # Like frotz after a restore in version 3: no upper window until the game splits it again.
+        self.upper_height = 0
+        self.upper_lines = []
+        return True
+
+    def _saved_memory(self, chunks):
+        if b"UMem" in chunks:
+            memory = bytearray(chunks[b"UMem"])
+            return memory if len(memory) == self.static_base else None
+        if b"CMem" not in chunks:
+            return None
+        memory = bytearray(self.story[: self.static_base])
+        cmem = chunks[b"CMem"]
+        index = 0
+        pos = 0
+        while pos < len(cmem):
+            byte = cmem[pos]
+            pos += 1
+            if byte == 0:
+                if pos == len(cmem):
+                    break
+                index += cmem[pos] + 1
+                pos += 1
+                continue
+            if index >= len(memory):
+                return None
+            memory[index] ^= byte
+            index += 1
+        return memory
+
+    # -- memory and variables ------------------------------------------------
+
+    def _word_at(self, addr):
+        mem = self.mem
+        return (mem[addr] << 8) | mem[addr + 1]
+
+    def _set_word(self, addr, value):
+        if addr >= self.static_base:
+            raise ZMachineError(f"Write to static memory at {addr:#06x}")
+        self.mem[addr] = (value >> 8) & 0xFF
+        self.mem[addr + 1] = value & 0xFF
+
+    def _set_byte(self, addr, value):
+        if addr >= self.static_base:
+            raise ZMachineError(f"Write to static memory at {addr:#06x}")
+        self.mem[addr] = value & 0xFF
+
+    def _read_var(self, var):
+        if var == 0:
+            if not self.stack:
+                raise ZMachineError(f"Stack underflow at {self.pc:#06x}")
+            return self.stack.pop()
+        if var < 16:
+            return self.locals[var - 1]
+        return self._word_at(self.globals + 2 * (var - 16))
+
+    def _write_var(self, var, value):
+        value &= 0xFFFF
+        if var == 0:
+            self.stack.append(value)
+        elif var < 16:
+            self.locals[var - 1] = value
+        else:
+            self._set_word(self.globals + 2 * (var - 16), value)
+
+    # Indirect variable references (inc, dec, load, store, pull...) use the stack top in place.
+    def _peek_var(self, var):
+        if var == 0:
+            if not self.stack:
+                raise ZMachineError(f"Stack underflow at {self.pc:#06x}")
+            return self.stack[-1]
+        return self._read_var(var)
+
+    def _poke_var(self, var, value):
+        if var == 0:
+            if not self.stack:
+                raise ZMachineError(f"Stack underflow at {self.pc:#06x}")
+            self.stack[-1] = value & 0xFFFF
+        else:
+            self._write_var(var, value)
+
+    def _fetch(self):
+        value = self.mem[self.pc]
+        self.pc += 1
+        return value
+
+    def _store(self, value):
+        self._write_var(self._fetch(), value)
+
+    def _branch(self, condition):
+        mem = self.mem
+        first = mem[self.pc]
+        self.pc += 1
+        if first & 0x40:
+            offset = first & 0x3F
+        else:
+            offset = ((first & 0x3F) << 8) | mem[self.pc]
+            self.pc += 1
+            if offset & 0x2000:
+                offset -= 0x4000
+        if bool(condition) != bool(first & 0x80):
+            return
+        if offset == 0 or offset == 1:
+            self._return(offset)
+        else:
+            self.pc += offset - 2
+
+    # -- execution -----------------------------------------------------------
+
+    def run(self, max_steps=None):
+        """Execute until input is needed, the game quits, or max_steps instructions ran; returns the state."""
+        if self.state == "input":
+            raise ZMachineError("The game is waiting for input: call send_input() first")
+        mem = self.mem
+        steps = 0
+        while self.state == "running":
+            if max_steps is not None and steps >= max_steps:
+                break
+            steps += 1
+            pc = self.pc
+            opcode = mem[pc]
+            pc += 1
+            if opcode < 0x80:
+                # Long form: always 2OP, operand types in bits 6 and 5.
+                a = mem[pc]
+                b = mem[pc + 1]
+                self.pc = pc + 2
+                if opcode & 0x40:
+                    a = self._read_var(a)
+                if opcode & 0x20:
+                    b = self._read_var(b)
+                handler = self._long_ops.get(opcode & 0x1F)
+                if handler is None:
+                    self._illegal(opcode)
+                handler([a, b])
+            elif opcode < 0xC0:
+                kind = (opcode >> 4) & 0x03
+                if kind == 3:
+                    self.pc = pc
+                    handler = self._zero_ops.get(opcode & 0x0F)
+                    if handler is None:
+                        self._illegal(opcode)
+                    handler()
+                    continue
+                if kind == 0:
+                    operand = (mem[pc] << 8) | mem[pc + 1]
+                    self.pc = pc + 2
+                else:
+                    operand = mem[pc]
+                    self.pc = pc + 1
+                    if kind == 2:
+                        operand = self._read_var(operand)
+                handler = self._short_ops.get(opcode & 0x0F)
+                if handler is None:
+                    self._illegal(opcode)
+                handler(operand)
+            else:
+                types = mem[pc]
+                pc += 1
+                operands = []
+                for shift in (6, 4, 2, 0):
+                    kind = (types >> shift) & 0x03
+                    if kind == 3:
+                        break
+                    if kind == 0:
+                        operands.append((mem[pc] << 8) | mem[pc + 1])
+                        pc += 2
+                    else:
+                        value = mem[pc]
+                        pc += 1
+                        if kind == 2:
+                            # Operands are read in order: a stack operand pops as it is decoded.
+                            self.pc = pc
+                            value = self._read_var(value)
+                        operands.append(value)
+                self.pc = pc
+                if opcode < 0xE0:
+                    handler = self._long_ops.get(opcode & 0x1F)
+                else:
+                    handler = self._var_ops.get(opcode & 0x1F)
+                if handler is None:
+                    self._illegal(opcode)
+                handler(operands)
+        return self.state
+
+    def _illegal(self, opcode):
+        raise ZMachineError(f"Illegal opcode {opcode:#04x} at {self.pc:#06x}")
+
+    def _call(self, routine, args, store_var):
+        if routine == 0:
+            self._write_var(store_var, 0)
+            return
+        addr = routine * 2
+        count = self.mem[addr]
+        locals_ = [self._word_at(addr + 1 + 2 * index) for index in range(count)]
+        locals_[: len(args)] = args[:count]
+        self.frames.append([self.pc, store_var, self.locals, self.stack, len(args)])
+        self.locals = locals_
+        self.stack = []
+        self.pc = addr + 1 + 2 * count
+
+    def _return(self, value):
+        if not self.frames:
+            raise ZMachineError("Return from the main routine")
+        self.pc, store_var, self.locals, self.stack, _ = self.frames.pop()
+        self._write_var(store_var, value)
+
+    # -- text ----------------------------------------------------------------
+
+    def decode_string(self, addr):
+        """(text, address after the string) for the Z-encoded string at addr."""
+        cached = self._string_cache.get(addr)
+        if cached is not None:
+            return cached
+        mem = self.mem
+        zchars = []
+        pos = addr
+        while True:
+            word = (mem[pos] << 8) | mem[pos + 1]
+            pos += 2
+            zchars.extend(((word >> 10) & 0x1F, (word >> 5) & 0x1F, word & 0x1F))
+            if word & 0x8000:
+                break
+        text = self._zchars_to_text(zchars)
+        if addr >= self.static_base:
+            self._string_cache[addr] = (text, pos)
+        return text, pos
+
+    def _zchars_to_text(self, zchars):
+        out = []
+        alphabet = 0
+        index = 0
+        count = len(zchars)
+        while index < count:
+            zchar = zchars[index]
+            index += 1
+            if zchar == 0:
+                out.append(" ")
+            elif zchar <= 3:
+                if index >= count:
+                    break
+                entry = self.abbreviations + 2 * (32 * (zchar - 1) + zchars[index])
+                out.append(self.decode_string(self._word_at(entry) * 2)[0])
+                index += 1
+            elif zchar == 4:
+                alphabet = 1
+                continue
+            elif zchar == 5:
+                alphabet = 2
+                continue
+            elif alphabet == 2 and zchar == 6:
+                if index + 1 >= count:
+                    break
+                out.append(zscii_to_text((zchars[index] << 5) | zchars[index + 1]))
+                index += 2
+            elif alphabet == 0:
+                out.append(A0[zchar - 6])
+            elif alphabet == 1:
+                out.append(A1[zchar - 6])
+            else:
+                out.append(A2[zchar - 6])
+            alphabet = 0
+        return "".join(out)
+
+    def _encode_word(self, word):
+        zchars = []
+        for char in word:
+            if char in A0:
+                zchars.append(A0.index(char) + 6)
+            elif char in A2[2:]:
+                zchars.extend((5, A2.index(char) + 6))
+            else:
+                code = text_to_zscii(char)
+                zchars.extend((5, 6, code >> 5, code & 0x1F))
+            if len(zchars) >= 6:
+                break
+        zchars = (zchars + [5] * 6)[:6]
+        first = (zchars[0] << 10) | (zchars[1] << 5) | zchars[2]
+        second = (zchars[3] << 10) | (zchars[4] << 5) | zchars[5] | 0x8000
+        return bytes((first >> 8, first & 0xFF, second >> 8, second & 0xFF))
+
+    def _load_dictionary(self):
+        mem = self.story
+        count = mem[self.dictionary]
+        self.separators = {zscii_to_text(code) for code in mem[self.dictionary + 1 : self.dictionary + 1 + count]}
+        header = self.dictionary + 1 + count
+        entry_length = mem[header]
+        entries = _signed(self._story_word(header + 1))
+        start = header + 3
+        self.words = {}
+        for index in range(abs(entries)):
+            addr = start + index * entry_length
+            self.words.setdefault(bytes(mem[addr : addr + 4]), addr)
+
+    def _print(self, text):
+        if self._memory_streams:
+            table, chars = self._memory_streams[-1]
+            chars.extend(text_to_zscii(char) for char in text)
+            return
+        if self.window == 1:
+            rows = text.split("\n")
+            if not self.upper_lines:
+                self.upper_lines.append("")
+            self.upper_lines[-1] += rows[0]
+            self.upper_lines.extend(rows[1:])
+            return
+        for char in text:
+            if char == "\n":
+                self._flush_word()
+                self._end_line()
+            else:
+                # frotz buffers words: a space starts a new word, and a line may break after a hyphen.
+                if char == " " or (self._previous_char == "-" and char != "-"):
+                    self._flush_word()
+                self._word += char
+            self._previous_char = char
+
+    def _flush_word(self):
+        word = self._word
+        if not word:
+            return
+        self._word = ""
+        if len(self._line) + len(word) > self.screen_width:
+            if word[0] == " ":
+                word = word[1:]
+            self._end_line()
+        self._line += word
+
+    def _end_line(self):
+        self._lines.append(self._line.rstrip(" "))
+        self._line = ""
+
+    def take_output(self):
+        """Lines printed since the last call, plus the unfinished line (the prompt) if any."""
+        self._flush_word()
+        lines = self._lines
+        self._lines = []
+        if self._line:
+            lines.append(self._line.rstrip(" "))
+        return lines
+
+    def status_text(self):
+        """The status line as frotz draws it: location, then score and moves near the right edge."""
+        location = self._read_var(16)
+        score = _signed(self._read_var(17))
+        moves = _signed(self._read_var(18))
+        line = " " + (self.object_name(location) if location else "")
+        if self.mem[0x01] & 0x02:
+            # Time games keep hours in the score global and minutes in the moves one.
+            hours = (score + 11) % 12 + 1
+            line = line.ljust(self.screen_width - 20) + f"Time: {hours:2d}:{moves:02d} {'pm' if score >= 12 else 'am'}"
+        else:
+            line = line.ljust(self.screen_width - STATUS_SCORE_COLUMN) + f"Score: {score}"
+            line = line.ljust(self.screen_width - STATUS_MOVES_COLUMN) + f"Moves: {moves}"
+        return line.ljust(self.screen_width)
+
+    # -- objects -------------------------------------------------------------
+
+    def _object_addr(self, obj):
+        return self.objects + 62 + (obj - 1) * 9
+
+    def object_name(self, obj):
+        props = self._word_at(self._object_addr(obj) + 7)
+        if not self.mem[props]:
+            return ""
+        return self.decode_string(props + 1)[0]
+
+    def _first_property(self, obj):
+        props = self._word_at(self._object_addr(obj) + 7)
+        return props + 1 + 2 * self.mem[props]
+
+    def _find_property(self, obj, prop):
+        """Address of the size byte of prop on obj, or None."""
+        mem = self.mem
+        addr = self._first_property(obj)
+        while True:
+            size = mem[addr]
+            number = size & 0x1F
+            if number == prop:
+                return addr
+            if number < prop:
+                return None
+            addr += 2 + (size >> 5)
+
+    def _remove_object(self, obj):
+        addr = self._object_addr(obj)
+        mem = self.mem
+        parent = mem[addr + 4]
+        if not parent:
+            return
+        parent_addr = self._object_addr(parent)
+        sibling = mem[addr + 5]
+        if mem[parent_addr + 6] == obj:
+            self._set_byte(parent_addr + 6, sibling)
+        else:
+            child = mem[parent_addr + 6]
+            while child:
+                child_addr = self._object_addr(child)
+                if mem[child_addr + 5] == obj:
+                    self._set_byte(child_addr + 5, sibling)
+                    break
+                child = mem[child_addr + 5]
+        self._set_byte(addr + 4, 0)
+        self._set_byte(addr + 5, 0)
+
+    # -- random (frotz's generator) ------------------------------------------
+
+    def _seed_random(self, value):
+        if value == 0:
+            seed = self.seed if self.seed is not None else time.time_ns()
+            self._random_state = seed & 0xFFFFFFFF
+            self._random_interval = 0
+            self._random_counter = 0
+        elif value < 1000:
+            self._random_counter = 0
+            self._random_interval = value
+        else:
+            self._random_state = value & 0xFFFFFFFF
+            self._random_interval = 0
+
+    def _random(self, limit):
+        if self._random_interval:
+            result = self._random_counter
+            self._random_counter += 1
+            if self._random_counter == self._random_interval:
+                self._random_counter = 0
+        else:
+            self._random_state = (0x015A4E35 * self._random_state + 1) & 0xFFFFFFFF
+            result = (self._random_state >> 16) & 0x7FFF
+        return result % limit + 1
+
+    # -- input ---------------------------------------------------------------
+
+    def send_input(self, text):
+        """Answer the pending read (or file name prompt) with one line and resume (call run() next)."""
+        if self.state != "input":
+            raise ZMachineError("The game is not waiting for input")
+        # The prompt line was already handed out; the typed line is not echoed.
+        self._word = ""
+        self._previous_char = ""
+        self._line = ""
+        if self._file_action:
+            action = self._file_action
+            self._file_action = None
+            self.state = "running"
+            self._use_save_file(action, text.strip() or self.save_name)
+            return
+        text_buffer, parse_buffer = self._read_buffers
+        self._read_buffers = None
+        limit = max(0, self.mem[text_buffer] - 1)
+        text = "".join(char for char in text.lower() if char != "\n")[:limit]
+        codes = [text_to_zscii(char) for char in text]
+        for index, code in enumerate(codes):
+            self._set_byte(text_buffer + 1 + index, code)
+        self._set_byte(text_buffer + 1 + len(codes), 0)
+        self._tokenize(text, text_buffer, parse_buffer)
+        self.state = "running"
+
+    def _use_save_file(self, action, path):
+        # Version 3 save and restore branch on success. A restored game goes on from its save opcode.
+        if action == "save":
+            try:
+                with open(path, "wb") as handle:
+                    handle.write(self._quetzal())
+                done = True
+            except OSError:
+                done = False
+        else:
+            try:
+                with open(path, "rb") as handle:
+                    done = self._load_quetzal(handle.read())
+            except OSError:
+                done = False
+        self._branch(done)
+
+    def _tokenize(self, text, text_buffer, parse_buffer):
+        tokens = []
+        start = None
+        for index, char in enumerate(text):
+            if char == " " or char in self.separators:
+                if start is not None:
+                    tokens.append((start, text[start:index]))
+                    start = None
+                if char != " ":
+                    tokens.append((index, char))
+            elif start is None:
+                start = index
+        if start is not None:
+            tokens.append((start, text[start:]))
+        tokens = tokens[: self.mem[parse_buffer]]
+        self._set_byte(parse_buffer + 1, len(tokens))
+        for index, (position, word) in enumerate(tokens):
+            entry = parse_buffer + 2 + 4 * index
+            self._set_word(entry, self.words.get(self._encode_word(word), 0))
+            self._set_byte(entry + 2, len(word))
+            self._set_byte(entry + 3, position + 1)
+
+    # -- 2OP -----------------------------------------------------------------
+
+    def _op_je(self, ops):
+        first = ops[0]
+        self._branch(any(first == other for other in ops[1:]))
+
+    def _op_jl(self, ops):
+        self._branch(_signed(ops[0]) < _signed(ops[1]))
+
+    def _op_jg(self, ops):
+        self._branch(_signed(ops[0]) > _signed(ops[1]))
+
+    def _op_dec_chk(self, ops):
+        value = (_signed(self._peek_var(ops[0])) - 1) & 0xFFFF
+        self._poke_var(ops[0], value)
+        self._branch(_signed(value) < _signed(ops[1]))
+
+    def _op_inc_chk(self, ops):
+        value = (_signed(self._peek_var(ops[0])) + 1) & 0xFFFF
+        self._poke_var(ops[0], value)
+        self._branch(_signed(value) > _signed(ops[1]))
+
+    def _op_jin(self, ops):
+        self._branch(ops[0] and self.mem[self._object_addr(ops[0]) + 4] == ops[1])
+
+    def _op_test(self, ops):
+        self._branch(ops[0] & ops[1] == ops[1])
+
+    def _op_or(self, ops):
+        self._store(ops[0] | ops[1])
+
+    def _op_and(self, ops):
+        self._store(ops[0] & ops[1])
+
+    def _op_test_attr(self, ops):
+        obj, attr = ops
+        self._branch(obj and self.mem[self._object_addr(obj) + attr // 8] & (0x80 >> (attr % 8)))
+
+    def _op_set_attr(self, ops):
+        obj, attr = ops
+        if obj:
+            addr = self._object_addr(obj) + attr // 8
+            self._set_byte(addr, self.mem[addr] | (0x80 >> (attr % 8)))
+
+    def _op_clear_attr(self, ops):
+        obj, attr = ops
+        if obj:
+            addr = self._object_addr(obj) + attr // 8
+            self._set_byte(addr, self.mem[addr] & ~(0x80 >> (attr % 8)))
+
+    def _op_store(self, ops):
+        self._poke_var(ops[0], ops[1])
+
+    def _op_insert_obj(self, ops):
+        obj, destination = ops
+        if not obj or not destination:
+            return
+        self._remove_object(obj)
+        addr = self._object_addr(obj)
+        destination_addr = self._object_addr(destination)
+        self._set_byte(addr + 4, destination)
+        self._set_byte(addr + 5, self.mem[destination_addr + 6])
+        self._set_byte(destination_addr + 6, obj)
+
+    def _op_loadw(self, ops):
+        self._store(self._word_at((ops[0] + 2 * ops[1]) & 0xFFFF))
+
+    def _op_loadb(self, ops):
+        self._store(self.mem[(ops[0] + ops[1]) & 0xFFFF])
+
+    def _op_get_prop(self, ops):
+        obj, prop = ops
+        addr = self._find_property(obj, prop) if obj else None
+        if addr is None:
+            self._store(self._word_at(self.objects + 2 * (prop - 1)))
+        elif self.mem[addr] >> 5 == 0:
+            self._store(self.mem[addr + 1])
+        else:
+            self._store(self._word_at(addr + 1))
+
+    def _op_get_prop_addr(self, ops):
+        obj, prop = ops
+        addr = self._find_property(obj, prop) if obj else None
+        self._store(0 if addr is None else addr + 1)
+
+    def _op_get_next_prop(self, ops):
+        obj, prop = ops
+        if not obj:
+            self._store(0)
+            return
+        if prop == 0:
+            addr = self._first_property(obj)
+        else:
+            addr = self._find_property(obj, prop)
+            if addr is None:
+                raise ZMachineError(f"get_next_prop: object {obj} has no property {prop}")
+            addr += 2 + (self.mem[addr] >> 5)
+        self._store(self.mem[addr] & 0x1F)
+
+    def _op_add(self, ops):
+        self._store(_signed(ops[0]) + _signed(ops[1]))
+
+    def _op_sub(self, ops):
+        self._store(_signed(ops[0]) - _signed(ops[1]))
+
+    def _op_mul(self, ops):
+        self._store(_signed(ops[0]) * _signed(ops[1]))
+
+    def _op_div(self, ops):
+        a, b = _signed(ops[0]), _signed(ops[1])
+        if b == 0:
+            raise ZMachineError("Division by zero")
+        quotient = abs(a) // abs(b)
+        self._store(quotient if (a < 0) == (b < 0) else -quotient)
+
+    def _op_mod(self, ops):
+        a, b = _signed(ops[0]), _signed(ops[1])
+        if b == 0:
+            raise ZMachineError("Division by zero")
+        remainder = abs(a) % abs(b)
+        self._store(-remainder if a < 0 else remainder)
+
+    # -- 1OP -----------------------------------------------------------------
+
+    def _op_jz(self, value):
+        self._branch(value == 0)
+
+    def _op_get_sibling(self, obj):
+        sibling = self.mem[self._object_addr(obj) + 5] if obj else 0
+        self._store(sibling)
+        self._branch(sibling)
+
+    def _op_get_child(self, obj):
+        child = self.mem[self._object_addr(obj) + 6] if obj else 0
+        self._store(child)
+        self._branch(child)
+
+    def _op_get_parent(self, obj):
+        self._store(self.mem[self._object_addr(obj) + 4] if obj else 0)
+
+    def _op_get_prop_len(self, addr):
+        self._store((self.mem[addr - 1] >> 5) + 1 if addr else 0)
+
+    def _op_inc(self, var):
+        self._poke_var(var, _signed(self._peek_var(var)) + 1)
+
+    def _op_dec(self, var):
+        self._poke_var(var, _signed(self._peek_var(var)) - 1)
+
+    def _op_print_addr(self, addr):
+        self._print(self.decode_string(addr)[0])
+
+    def _op_remove_obj(self, obj):
+        if obj:
+            self._remove_object(obj)
+
+    def _op_print_obj(self, obj):
+        self._print(self.object_name(obj))
+
+    def _op_ret(self, value):
+        self._return(value)
+
+    def _op_jump(self, offset):
+        self.pc += _signed(offset) - 2
+
+    def _op_print_paddr(self, addr):
+        self._print(self.decode_string(addr * 2)[0])
+
+    def _op_load(self, var):
+        self._store(self._peek_var(var))
+
+    def _op_not(self, value):
+        self._store(~value)
+
+    # -- 0OP -----------------------------------------------------------------
+
+    def _op_rtrue(self):
+        self._return(1)
+
+    def _op_rfalse(self):
+        self._return(0)
+
+    def _op_print(self):
+        text, self.pc = self.decode_string(self.pc)
+        self._print(text)
+
+    def _op_print_ret(self):
+        text, self.pc = self.decode_string(self.pc)
+        self._print(text + "\n")
+        self._return(1)
+
+    def _op_nop(self):
+        pass
+
+    def _op_save(self):
+        self._ask_file_name("save")
+
+    def _op_restore(self):
+        self._ask_file_name("restore")
+
+    def _ask_file_name(self, action):
+        # frotz asks before overwriting a save file; this one just replaces it.
+        self._print(FILENAME_PROMPT.format(self.save_name))
+        self._file_action = action
+        self.state = "input"
+
+    def _op_restart(self):
+        self._flush_word()
+        lines = self._lines + ([self._line] if self._line else [])
+        self.restart()
+        self._lines = lines
+
+    def _op_ret_popped(self):
+        self._return(self._read_var(0))
+
+    def _op_pop(self):
+        self._read_var(0)
+
+    def _op_quit(self):
+        self.state = "quit"
+
+    def _op_new_line(self):
+        self._print("\n")
+
+    def _op_show_status(self):
+        self.status_line = self.status_text()
+
+    def _op_verify(self):
+        total = sum(self.story[0x40 : self.file_length]) & 0xFFFF
+        self._branch(total == self._story_word(0x1C))
+
+    # -- VAR -----------------------------------------------------------------
+
+    def _op_call(self, ops):
+        self._call(ops[0], ops[1:], self._fetch())
+
+    def _op_storew(self, ops):
+        self._set_word((ops[0] + 2 * ops[1]) & 0xFFFF, ops[2])
+
+    def _op_storeb(self, ops):
+        self._set_byte((ops[0] + ops[1]) & 0xFFFF, ops[2])
+
+    def _op_put_prop(self, ops):
+        obj, prop, value = ops
+        addr = self._find_property(obj, prop)
+        if addr is None:
+            raise ZMachineError(f"put_prop: object {obj} has no property {prop}")
+        if self.mem[addr] >> 5 == 0:
+            self._set_byte(addr + 1, value)
+        else:
+            self._set_word(addr + 1, value)
+
+    def _op_sread(self, ops):
+        # Version 3 redraws the status line before every read.
+        self.status_line = self.status_text()
+        self._read_buffers = (ops[0], ops[1])
+        self.state = "input"
+
+    def _op_print_char(self, ops):
+        self._print(zscii_to_text(ops[0]))
+
+    def _op_print_num(self, ops):
+        self._print(str(_signed(ops[0])))
+
+    def _op_random(self, ops):
+        value = _signed(ops[0])
+        if value <= 0:
+            self._seed_random(-value)
+            self._store(0)
+        else:
+            self._store(self._random(value))
+
+    def _op_push(self, ops):
+        self.stack.append(ops[0])
+
+    def _op_pull(self, ops):
+        value = self._read_var(0)
+        self._poke_var(ops[0], value)
+
+    def _op_split_window(self, ops):
+        self.upper_height = ops[0]
+
+    def _op_set_window(self, ops):
+        self._flush_word()
+        self.window = ops[0]
+
+    def _op_output_stream(self, ops):
+        stream = _signed(ops[0])
+        if stream == 3:
+            self._memory_streams.append((ops[1], []))
+        elif stream == -3 and self._memory_streams:
+            table, chars = self._memory_streams.pop()
+            self._set_word(table, len(chars))
+            for index, code in enumerate(chars):
+                self._set_byte(table + 2 + index, code)
+
+    def _op_input_stream(self, ops):
+        pass
+
+    def _op_sound_effect(self, ops):
+        pass
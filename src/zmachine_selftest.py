@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Check the Z-machine interpreter against frotz on a small test story
+(assets/zmachine-test/selftest.z3, compiled from selftest.inf): play a
+fixed list of inputs with a fixed seed and compare, read by read, the
+text and the status line with frotz's transcript of the same inputs
+(selftest-frotz.txt, recorded with frotz_reference.c). It covers text
+decoding, the object tree, tokenising, the random generator and a
+Quetzal save/restore round trip, also checked on the dynamic memory.
+The frotz transcript is not wrapped, so the text is compared with its
+line breaks normalised; wrapping is only checked against SCREEN_WIDTH.
+"""
+
+import argparse
+import difflib
+import os
+import subprocess
+import tempfile
+
+from terminal_parser import parse_status_bar
+from zmachine import FILENAME_PROMPT, SCREEN_WIDTH, ZMachine
+
+TEST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "assets", "zmachine-test")
+STORY_PATH = os.path.join(TEST_DIR, "selftest.z3")
+REFERENCE_PATH = os.path.join(TEST_DIR, "selftest-frotz.txt")
+# frotz_reference.c ends the text of each read with this line.
+READ_SEPARATOR = "\n@@\n"
+SEED = 42
+FILE_PROMPT_START = FILENAME_PROMPT.split("[")[0]
+SAVE_FILE = "selftest.qzl"
+# (kind, line): "cmd" lines are read by the game, "file" lines answer its file name prompt
+# ({save} is the save file, {missing} a file that does not exist).
+INPUTS = [
+    ("cmd", "take"),
+    ("cmd", "examine the box, pepperoni xyzzy"),
+    ("cmd", "roll"),
+    ("cmd", "save"),
+    ("file", "{save}"),
+    ("cmd", "take"),
+    ("cmd", "take"),
+    ("cmd", "examine"),
+    ("cmd", "restore"),
+    ("file", "{save}"),
+    ("cmd", "roll"),
+    ("cmd", "restore"),
+    ("file", "{missing}"),
+    ("cmd", "restart"),
+    ("cmd", "quit"),
+]
+
+
+def save_files(directory):
+    return {"save": os.path.join(directory, SAVE_FILE), "missing": os.path.join(directory, "missing.qzl")}
+
+
+def normalise(lines):
+    """A read's text without its ">" prompt, each paragraph on one line with single spaces."""
+    lines = list(lines)
+    if lines and lines[-1].strip() == ">":
+        lines.pop()
+    paragraphs = "\n".join(lines).split("\n\n")
+    return "\n".join(" ".join(paragraph.split()) for paragraph in paragraphs if paragraph.strip())
+
+
+def status_fields(line):
+    status = parse_status_bar(line)
+    return (status["title"], status["score"], status["moves"]) if status else None
+
+
+def play(story, seed, directory):
+    """
+    [(text, status at the prompt that follows)] for the opening and each
+    command, the raw output lines, and the dynamic memory after SAVE and
+    after RESTORE. The file name prompt is dropped (a missing one shows up
+    in the comparison): the text of SAVE/RESTORE runs on to the next
+    command prompt, like in frotz's transcript.
+    """
+    machine = ZMachine(story, seed=seed)
+    files = save_files(directory)
+    reads = []
+    output = []
+    text = []
+    memory = {}
+    pending = list(INPUTS)
+    cmd = None
+    file_cmd = None
+    while True:
+        state = machine.run()
+        lines = machine.take_output()
+        output.extend(lines)
+        if pending and pending[0][0] == "file" and lines and lines[-1].startswith(FILE_PROMPT_START):
+            lines = lines[:-1]
+        text.extend(lines)
+        if pending and pending[0][0] == "file" and state == "input":
+            kind, line = pending.pop(0)
+            file_cmd = cmd
+            machine.send_input(line.format(**files))
+            continue
+        if file_cmd and state == "input":
+            memory.setdefault(file_cmd, bytes(machine.mem[: machine.static_base]))
+            file_cmd = None
+        status = status_fields(machine.status_line) if state == "input" else None
+        reads.append((normalise(text), status))
+        text = []
+        if state != "input" or not pending:
+            break
+        _, cmd = pending.pop(0)
+        machine.send_input(cmd)
+    return reads, output, memory
+
+
+def load_reference(path):
+    """The same [(text, status)] from frotz's transcript: each read's status is drawn after the next ">"."""
+    with open(path, "r", encoding="utf-8") as handle:
+        chunks = handle.read().split(READ_SEPARATOR)[:-1]
+    texts = []
+    statuses = []
+    for index, chunk in enumerate(chunks):
+        lines = chunk.split("\n")
+        if index:
+            prompt = lines.pop(0)
+            statuses.append(status_fields(prompt.lstrip(">")))
+        texts.append(normalise(lines))
+    statuses.append(None)
+    return list(zip(texts, statuses))
+
+
+def record_reference(binary, story_path, seed, path):
+    """Play the inputs with frotz_reference and write its transcript."""
+    with tempfile.TemporaryDirectory() as directory:
+        files = save_files(directory)
+        lines = []
+        for kind, line in INPUTS:
+            if kind == "file":
+                lines[-1] += "\t" + line.format(**files)
+            else:
+                lines.append(line)
+        result = subprocess.run(
+            [binary, "-w", str(SCREEN_WIDTH), "-s", str(seed), story_path],
+            input="\n".join(lines) + "\n",
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(result.stdout)
+    return result.stdout.count(READ_SEPARATOR)
+
+
+def describe(reads):
+    lines = []
+    for text, status in reads:
+        lines.extend(text.split("\n"))
+        lines.append(f"[{status}]")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the Z-machine interpreter against frotz on the test story.")
+    parser.add_argument("--record", metavar="FROTZ_REFERENCE", help="Re-record the frotz transcript with this binary")
+    args = parser.parse_args()
+
+    if args.record:
+        count = record_reference(args.record, STORY_PATH, SEED, REFERENCE_PATH)
+        print(f"{count} reads -> {REFERENCE_PATH}")
+        return 0
+
+    with open(STORY_PATH, "rb") as handle:
+        story = handle.read()
+    with tempfile.TemporaryDirectory() as directory:
+        reads, output, memory = play(story, SEED, directory)
+    with tempfile.TemporaryDirectory() as directory:
+        again, _, _ = play(story, SEED, directory)
+    with tempfile.TemporaryDirectory() as directory:
+        other_seed, _, _ = play(story, SEED + 1, directory)
+    reference = load_reference(REFERENCE_PATH)
+
+    failures = []
+    if reads != reference:
+        diff = difflib.unified_diff(describe(reference), describe(reads), "frotz", "zmachine", lineterm="")
+        failures.append("the reads differ from frotz's:\n" + "\n".join(diff))
+    too_long = [line for line in output if len(line) > SCREEN_WIDTH]
+    if too_long:
+        failures.append(f"{len(too_long)} lines wider than {SCREEN_WIDTH} columns, first: {too_long[0]!r}")
+    if again != reads:
+        failures.append(f"two runs with seed {SEED} differ")
+    if other_seed == reads:
+        failures.append(f"seeds {SEED} and {SEED + 1} give the same reads")
+    if "save" not in memory or "restore" not in memory:
+        failures.append("SAVE or RESTORE did not answer at the prompt")
+    elif memory["save"] != memory["restore"]:
+        changed = sum(1 for saved, restored in zip(memory["save"], memory["restore"]) if saved != restored)
+        failures.append(f"RESTORE left {changed} bytes of dynamic memory different from SAVE")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    print(f"{len(reads)} reads compared with frotz, {len(failures)} failures")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
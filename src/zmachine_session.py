@@ -0,0 +1,125 @@
+import os
+import time
+
+from game_session import INTRO_MARKER, GameSession
+from terminal_parser import CONTINUE_MARKER, TerminalParser, parse_status_bar, passage_text
+from zmachine import SCREEN_WIDTH, ZMachine
+
+STORY_PATH = os.path.join(os.path.dirname(__file__), "..", "roms", "PLUNDERE.z3")
+# Instructions run between two poll() calls / timeout checks.
+RUN_SLICE = 20000
+
+
+class ZMachineSession(GameSession):
+    """
+    In-process game backend: same interface as GameSession, on a ZMachine
+    instead of a frotz subprocess. No pipes, no terminal escapes, no MORE
+    paging; snapshot()/restore() copy the game state, and the text of the
+    last read, in memory.
+    """
+
+    supports_snapshots = True
+
+    def __init__(self, story_path=STORY_PATH, seed=None, screen_width=SCREEN_WIDTH, **options):
+        super().__init__(command=None, **options)
+        self.story_path = story_path
+        self.seed = seed
+        self.screen_width = screen_width
+        self.machine = None
+
+    def start(self):
+        with open(self.story_path, "rb") as handle:
+            self.machine = ZMachine(
+                handle.read(),
+                seed=self.seed,
+                screen_width=self.screen_width,
+                save_name=os.path.splitext(os.path.basename(self.story_path))[0] + ".qzl",
+            )
+        self.alive = True
+        return self.read_until_prompt()
+
+    def sendline(self, line=""):
+        self.at_prompt = False
+        self.at_intro = False
+        if self.alive and self.machine.state == "input":
+            self.machine.send_input(line)
+
+    def read_until_prompt(self, timeout=None, expect=None):
+        """
+        Run the game until it waits for a command (or shows the intro
+        screen), answering RETURN paging prompts the way frotz's reader does.
+        expect is not needed: the machine stops at every line it asks for.
+        Returns the output text.
+        """
+        timeout = self.turn_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        lines = []
+        pages = 0
+        timed_out = False
+        self.at_prompt = False
+        self.at_intro = False
+
+        while self.alive:
+            state = self.machine.run(RUN_SLICE)
+            if state == "running":
+                if time.monotonic() >= deadline:
+                    timed_out = True
+                    break
+                if self.poll:
+                    self.poll()
+                continue
+            new_lines = self.machine.take_output()
+            lines.extend(new_lines)
+            if state == "quit":
+                self.alive = False
+                break
+            if any(INTRO_MARKER in line for line in new_lines):
+                self.at_intro = True
+                break
+            if new_lines and CONTINUE_MARKER in new_lines[-1]:
+                pages += 1
+                self.machine.send_input("")
+                continue
+            self.at_prompt = True
+            break
+
+        output = "\n".join(lines)
+        # Same filtering as frotz output (number-only lines, status-like lines).
+        self.lines, status, _ = TerminalParser().parse(output)
+        self.text = passage_text(self.lines)
+        self.status_bar = status or self._machine_status()
+
+        waited = time.monotonic() - started
+        self.last_turn = {
+            "wait": waited,
+            "first_byte": waited,
+            "pages": pages,
+            "chars": len(output),
+            "timed_out": timed_out,
+        }
+        self.turns += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        if timed_out:
+            self.timeouts += 1
+        return output
+
+    def _machine_status(self):
+        return parse_status_bar(self.machine.status_line)
+
+    def snapshot(self):
+        return self.machine.snapshot(), list(self.lines), self.text, self.status_bar
+
+    def restore(self, snapshot):
+        """Put the game, and the text of its last read, back in a snapshot() state."""
+        machine_state, lines, self.text, self.status_bar = snapshot
+        self.machine.restore_snapshot(machine_state)
+        self.lines = list(lines)
+        self.alive = True
+        self.at_prompt = self.machine.state == "input"
+        self.at_intro = False
+
+    def close(self):
+        self.alive = False
+        self.machine = None